@@ -0,0 +1,102 @@
+"""In-memory calendar index — entries sorted by air/release timestamp.
+
+Each kind ("episodes", "movies") keeps two parallel lists: sorted epoch
+timestamps and the entries themselves.  Range queries bisect the key list,
+so answering ``from``/``to`` costs O(log n + k); replacing a fetched span
+is a single slice assignment.  Entries from different sources (service
+instances) are kept in separate lists, so one instance's refetch never
+drops another's entries; queries merge the per-source slices.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from bisect import bisect_left
+from itertools import repeat
+from operator import itemgetter
+from typing import Any, Iterable
+
+KINDS: tuple[str, ...] = ("episodes", "movies")
+
+
+class CalendarStore:
+    """Sorted, range-queryable calendar entries per kind and source."""
+
+    def __init__(self) -> None:
+        # kind -> source -> parallel sorted keys / entries
+        self._keys: dict[str, dict[str, list[float]]] = {kind: {} for kind in KINDS}
+        self._items: dict[str, dict[str, list[dict[str, Any]]]] = {
+            kind: {} for kind in KINDS
+        }
+
+    def __len__(self) -> int:
+        return sum(
+            len(keys) for sources in self._keys.values() for keys in sources.values()
+        )
+
+    def replace(
+        self,
+        kind: str,
+        start: float,
+        end: float,
+        entries: Iterable[tuple[float, dict[str, Any]]],
+        source: str = "",
+    ) -> None:
+        """Replace *source*'s entries in ``[start, end)`` with *entries*.
+
+        *entries* are ``(timestamp, entry)`` pairs; timestamps outside the
+        span are clamped into it so the list stays sorted.
+        """
+        last = math.nextafter(end, start)
+        fresh = sorted(
+            ((min(max(ts, start), last), entry) for ts, entry in entries),
+            key=lambda pair: pair[0],
+        )
+        keys = self._keys[kind].setdefault(source, [])
+        items = self._items[kind].setdefault(source, [])
+        lo, hi = bisect_left(keys, start), bisect_left(keys, end)
+        keys[lo:hi] = [ts for ts, _ in fresh]
+        items[lo:hi] = [entry for _, entry in fresh]
+
+    def prune(self, before: float) -> None:
+        """Drop entries dated before *before*."""
+        for kind in KINDS:
+            for source, keys in self._keys[kind].items():
+                cut = bisect_left(keys, before)
+                del keys[:cut]
+                del self._items[kind][source][:cut]
+
+    def range(self, kind: str, start: float, end: float) -> list[dict[str, Any]]:
+        """Return *kind* entries in ``[start, end)``, first occurrence per id.
+
+        Ids are per source, so equal ids from two sources are both kept.
+        """
+        slices = []
+        for source, keys in self._keys[kind].items():
+            lo, hi = bisect_left(keys, start), bisect_left(keys, end)
+            if lo < hi:
+                items = self._items[kind][source]
+                slices.append(zip(keys[lo:hi], repeat(source), items[lo:hi]))
+        merged = slices[0] if len(slices) == 1 else heapq.merge(
+            *slices, key=itemgetter(0)
+        )
+        seen: set[Any] = set()
+        result: list[dict[str, Any]] = []
+        for _, source, entry in merged:
+            key = entry.get("id")
+            if key is not None:
+                if (source, key) in seen:
+                    continue
+                seen.add((source, key))
+            result.append(entry)
+        return result
+
+    def query(
+        self,
+        start: float,
+        end: float,
+        kinds: Iterable[str] = KINDS,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Return ``{kind: entries}`` for each requested kind in ``[start, end)``."""
+        return {kind: self.range(kind, start, end) for kind in kinds}
@@ -4,46 +4,283 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Any
+from contextlib import nullcontext
+from typing import Any, Awaitable, Callable
 
+from app.config import instance_service
+from app.metrics import record_collect
+from app.services.deadline import deadline
+from app.services.limiter import Priority, request_priority
 from app.ws.hub import ConnectionHub
 
 logger = logging.getLogger(__name__)
 
 
+class SubResource:
+    """One independently refreshed, cached piece of a collector's snapshot.
+
+    *fetch* returns the parsed value; *interval* is seconds between fetches,
+    or a callable returning it so cadence can follow the data (e.g. faster
+    while work is in progress).  A failed fetch keeps the previous value and
+    is retried after the next interval; :attr:`updated_at` only moves on
+    success, so :meth:`age` reports how stale the cached value is.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[Any]],
+        interval: float | Callable[[], float],
+        default: Any = None,
+    ) -> None:
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        self.value = default
+        self.fetched_at: float | None = None
+        self.updated_at: float | None = None
+
+    @property
+    def period(self) -> float:
+        """Seconds between fetches right now."""
+        return self.interval() if callable(self.interval) else self.interval
+
+    def due_in(self, now: float) -> float:
+        """Seconds until the next fetch is due (<= 0 means due now)."""
+        if self.fetched_at is None:
+            return 0.0
+        return self.fetched_at + self.period - now
+
+    def age(self, now: float) -> float | None:
+        """Seconds since the last successful fetch, or ``None`` if never."""
+        if self.updated_at is None:
+            return None
+        return now - self.updated_at
+
+    def invalidate(self) -> None:
+        """Make the resource due on the next cycle."""
+        self.fetched_at = None
+
+    async def refresh(self) -> None:
+        """Fetch and cache a new value; failures keep the old one."""
+        self.fetched_at = time.monotonic()
+        try:
+            self.value = await self.fetch()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.debug("Failed to refresh %s", self.name, exc_info=True)
+            return
+        self.updated_at = time.monotonic()
+
+
 class BaseCollector(ABC):
     """Periodically collects data from services and broadcasts via the hub.
 
     Subclasses must implement :meth:`collect` which gathers data from one
     or more service clients and broadcasts results through the hub.
+
+    Push sources (notification sockets, webhooks) can cut the wait short
+    with :meth:`request_refresh`; bursts of requests within
+    :attr:`refresh_debounce` seconds coalesce into a single cycle.  While
+    every registered push source reports itself connected, the loop polls at
+    the slower *push_interval* as a reconciliation fallback.
+
+    Collectors whose snapshot combines data that changes at different rates
+    can declare :class:`SubResource` s with :meth:`add_resource`; each cycle
+    then refetches only the due ones (:meth:`refresh_resources`), and the
+    loop wakes when the next one falls due.
+
+    A service type may have several instances (clients keyed ``"sonarr"``,
+    ``"sonarr:4k"``, ...).  :meth:`poll_instances` polls all of them
+    concurrently, with at most :attr:`max_fan_out` requests of one cycle in
+    flight, so adding an instance doesn't lengthen the cycle.
     """
 
+    #: Short name used in logs and metric labels (matches the hub message type).
+    name: str = "unknown"
+
+    #: Seconds to wait after a refresh request so bursts coalesce.
+    refresh_debounce: float = 0.25
+
+    #: Lane for this collector's upstream requests when a service is busy.
+    priority: Priority = Priority.REALTIME
+
+    #: Instance polls one cycle runs concurrently, across all service types.
+    max_fan_out: int = 4
+
     def __init__(
         self,
         hub: ConnectionHub,
         clients: dict[str, Any],
         interval: float,
+        push_interval: float | None = None,
     ) -> None:
         self.hub = hub
         self.clients = clients
         self.interval = interval
+        self.push_interval = push_interval
         self._task: asyncio.Task[None] | None = None
+        self._wake = asyncio.Event()
+        self._push_sources: dict[str, bool] = {}
+        self.resources: dict[str, SubResource] = {}
+        self._fan_out = asyncio.Semaphore(self.max_fan_out)
 
     @abstractmethod
     async def collect(self) -> None:
         """Gather data from services and broadcast via the hub."""
 
+    async def run_once(self) -> None:
+        """Run a single :meth:`collect` cycle, recording duration and errors.
+
+        Upstream requests made by the cycle share a deadline of one
+        :attr:`interval`: timeouts shrink and retries stop as it runs out,
+        so a slow service can't stretch the cycle past its next start.
+        Collectors with no interval (benchmarks drive them back-to-back)
+        run without one.  Exceptions are logged and counted, never
+        propagated, so one bad cycle doesn't kill the loop.
+        """
+        start = time.perf_counter()
+        failed = False
+        token = request_priority.set(self.priority)
+        try:
+            with deadline(self.interval) if self.interval > 0 else nullcontext():
+                await self.collect()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            failed = True
+            logger.exception("Error in %s.collect()", type(self).__name__)
+        finally:
+            request_priority.reset(token)
+            record_collect(self.name, time.perf_counter() - start, failed=failed)
+
+    # -- Instances -----------------------------------------------------------
+
+    def instances(self, service: str) -> dict[str, Any]:
+        """Return ``{key: client}`` for every instance of *service*."""
+        return {
+            key: client
+            for key, client in self.clients.items()
+            if instance_service(key) == service
+        }
+
+    async def poll_instances(
+        self,
+        service: str,
+        poll: Callable[[str, Any], Awaitable[Any]],
+    ) -> dict[str, Any]:
+        """Run *poll(key, client)* for every instance of *service* concurrently.
+
+        Returns ``{key: result}`` in configuration order.  Polls share the
+        collector's fan-out bound, so several calls made with
+        ``asyncio.gather`` are bounded together.
+        """
+        async def bounded(key: str, client: Any) -> Any:
+            async with self._fan_out:
+                return await poll(key, client)
+
+        instances = self.instances(service)
+        results = await asyncio.gather(
+            *(bounded(key, client) for key, client in instances.items())
+        )
+        return dict(zip(instances, results))
+
+    # -- Sub-resources -------------------------------------------------------
+
+    def add_resource(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[Any]],
+        interval: float | Callable[[], float],
+        default: Any = None,
+    ) -> SubResource:
+        """Declare a sub-resource with its own cadence and cache."""
+        resource = SubResource(f"{self.name}.{name}", fetch, interval, default)
+        self.resources[name] = resource
+        return resource
+
+    async def refresh_resources(self) -> None:
+        """Concurrently refetch every sub-resource that is due.
+
+        Refetches share the :attr:`max_fan_out` bound.
+        """
+        async def bounded(resource: SubResource) -> None:
+            async with self._fan_out:
+                await resource.refresh()
+
+        now = time.monotonic()
+        due = [r for r in self.resources.values() if r.due_in(now) <= 0]
+        if due:
+            await asyncio.gather(*(bounded(r) for r in due))
+
+    def resource_ages(self) -> dict[str, float | None]:
+        """Seconds since each sub-resource last refreshed successfully."""
+        now = time.monotonic()
+        ages = {}
+        for name, resource in self.resources.items():
+            age = resource.age(now)
+            ages[name] = round(age, 1) if age is not None else None
+        return ages
+
+    # -- Push-driven refresh -------------------------------------------------
+
+    def request_refresh(self) -> None:
+        """Run the next cycle now instead of waiting for the interval.
+
+        Every sub-resource is invalidated so the cycle refetches them all.
+        """
+        for resource in self.resources.values():
+            resource.invalidate()
+        self._wake.set()
+
+    def set_push_connected(self, source: str, connected: bool) -> None:
+        """Record whether push source *source* is currently delivering events.
+
+        Losing a push source triggers an immediate refresh so polling
+        resumes at the normal interval without a stale gap.
+        """
+        was = self._push_sources.get(source)
+        self._push_sources[source] = connected
+        if was and not connected:
+            self.request_refresh()
+
+    @property
+    def current_interval(self) -> float:
+        """Polling interval in effect: slow while all push sources are up."""
+        if (
+            self.push_interval is not None
+            and self._push_sources
+            and all(self._push_sources.values())
+        ):
+            return self.push_interval
+        return self.interval
+
+    def _next_wait(self) -> float:
+        """Seconds to sleep: the interval, or until a sub-resource is due."""
+        wait = self.current_interval
+        if self.resources:
+            now = time.monotonic()
+            wait = min(wait, *(r.due_in(now) for r in self.resources.values()))
+        return max(wait, 0.0)
+
+    async def _sleep(self) -> None:
+        """Sleep until the next cycle is due or a refresh is requested."""
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=self._next_wait())
+        except asyncio.TimeoutError:
+            pass
+        else:
+            await asyncio.sleep(self.refresh_debounce)
+        self._wake.clear()
+
     async def _loop(self) -> None:
         """Run :meth:`collect` in an infinite loop with sleep intervals."""
         while True:
-            try:
-                await self.collect()
-            except asyncio.CancelledError:
-                raise
-            except Exception:
-                logger.exception("Error in %s.collect()", type(self).__name__)
-            await asyncio.sleep(self.interval)
+            await self.run_once()
+            await self._sleep()
 
     def start(self) -> None:
         """Create an asyncio task running the collection loop."""
@@ -2,83 +2,346 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import datetime, timedelta, timezone
+import time
+from datetime import date, datetime, timedelta, timezone
 from typing import Any
 
+from app.calendar_store import CalendarStore
 from app.collectors.base import BaseCollector
+from app.services.limiter import Priority
 
 logger = logging.getLogger(__name__)
 
+# Days covered by the broadcast calendar snapshot, starting today (UTC).
+WINDOW_DAYS = 7
+
+# Days kept in the calendar store for wider range queries.
+HORIZON_DAYS = 90
+
+# Seconds before a cached day inside the window is refetched without an
+# invalidation.  Today is always refetched: that's where hasFile flips on
+# import.
+BUCKET_MAX_AGE = 3600
+
+# Same, for days beyond the window — they change rarely.
+FAR_MAX_AGE = 6 * 3600
+
+# Days beyond the window fetched per cycle, so filling the horizon is spread
+# over several cycles instead of one large upstream call.
+FILL_CHUNK_DAYS = 14
+
+# Seconds between full refreshes of the Sonarr seriesId -> title cache.
+SERIES_CACHE_TTL = 6 * 3600
+
+# Minimum seconds between cache refreshes caused by an unknown seriesId.
+SERIES_MISS_COOLDOWN = 60
+
+DAY_SECONDS = 86400
+
+# Episode/movie fields holding the dates an event's entries sit on.
+EVENT_DATE_FIELDS = (
+    "airDateUtc", "digitalRelease", "physicalRelease", "inCinemas", "releaseDate",
+)
+
+
+def midnight(day: date) -> float:
+    """Epoch seconds at 00:00 UTC on *day*."""
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp()
+
+
+def _instants(*values: Any) -> list[datetime]:
+    """Parse ISO date/datetime strings as UTC instants, skipping blanks."""
+    instants = []
+    for value in values:
+        if not isinstance(value, str) or len(value) < 10:
+            continue
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        instants.append(parsed.astimezone(timezone.utc))
+    return instants
+
+
+def event_days(payload: Any) -> list[date] | None:
+    """UTC days touched by a Sonarr/Radarr event, or ``None`` if it has no date.
+
+    *payload* is a SignalR message body (``resource``) or a webhook body
+    (``episodes``, ``movie``).  The new date is all an event carries, so an
+    entry moved off a day is dropped there when that day next expires.
+    """
+    if not isinstance(payload, dict):
+        return None
+    resources = [payload.get(key) for key in ("resource", "movie")]
+    episodes = payload.get("episodes")
+    if isinstance(episodes, list):
+        resources.extend(episodes)
+    days = {
+        instant.date()
+        for resource in resources
+        if isinstance(resource, dict)
+        for instant in _instants(*(resource.get(f) for f in EVENT_DATE_FIELDS))
+    }
+    return sorted(days) or None
+
 
 class CalendarCollector(BaseCollector):
-    """Gathers upcoming episodes and movie releases for the next 7 days."""
+    """Gathers upcoming episodes and movie releases.
+
+    Entries live in a :class:`~app.calendar_store.CalendarStore` covering
+    :data:`HORIZON_DAYS`, which answers arbitrary range queries; the
+    broadcast snapshot is its first :data:`WINDOW_DAYS`.
+
+    Fetches are tracked per UTC day.  Each cycle only refetches days that
+    are missing (newly entered the horizon), invalidated by a push/webhook
+    event, past their max age, or today; days beyond the window are filled
+    at most :data:`FILL_CHUNK_DAYS` per cycle.  Contiguous due days are
+    fetched with a single ranged call.  Sonarr calendar calls skip
+    ``includeSeries`` — series titles come from a ``seriesId`` cache
+    refreshed every :data:`SERIES_CACHE_TTL` seconds.
+
+    Every Sonarr and Radarr instance is synced concurrently with its own
+    day cache and store source; entries are tagged with their ``instance``.
+    """
+
+    name = "calendar"
+    priority = Priority.BACKGROUND
+
+    # Episode/movie change events arrive in bursts (e.g. a series refresh).
+    refresh_debounce = 2.0
+
+    def __init__(
+        self, *args: Any, store: CalendarStore | None = None, **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.store = store if store is not None else CalendarStore()
+        # instance -> day -> monotonic time of its last fetch
+        self._fetched_at: dict[str, dict[date, float]] = {}
+        # Sonarr instance -> seriesId -> title, and when it was last loaded
+        self._series_titles: dict[str, dict[int, str]] = {}
+        self._series_fetched_at: dict[str, float] = {}
 
     async def collect(self) -> None:
-        """Poll Sonarr and Radarr calendars and broadcast results."""
-        episodes = await self._poll_sonarr_calendar()
-        movies = await self._poll_radarr_calendar()
-
-        await self.hub.broadcast("calendar", {
-            "episodes": episodes,
-            "movies": movies,
-        })
-
-    def _date_range(self) -> tuple[str, str]:
-        """Return ISO date strings for today and 7 days from now."""
-        now = datetime.now(timezone.utc)
-        start = now.strftime("%Y-%m-%d")
-        end = (now + timedelta(days=7)).strftime("%Y-%m-%d")
-        return start, end
-
-    async def _poll_sonarr_calendar(self) -> list[dict[str, Any]]:
-        """Fetch upcoming episodes from Sonarr."""
-        client = self.clients.get("sonarr")
-        if client is None:
-            return []
-        try:
-            start, end = self._date_range()
-            entries = await client.get_calendar(start=start, end=end)
+        """Sync every Sonarr/Radarr calendar and broadcast the next 7 days."""
+        start = midnight(datetime.now(timezone.utc).date())
+        self.store.prune(start)
+        await asyncio.gather(
+            self.poll_instances("sonarr", self._poll_sonarr_calendar),
+            self.poll_instances("radarr", self._poll_radarr_calendar),
+        )
+
+        await self.hub.broadcast(
+            "calendar", self.store.query(start, start + WINDOW_DAYS * DAY_SECONDS)
+        )
+
+    def request_refresh(
+        self, days: list[date] | None = None, instance: str | None = None
+    ) -> None:
+        """Invalidate *days* (default: all), then schedule an immediate cycle.
+
+        See :meth:`invalidate` for *instance*.
+        """
+        self.invalidate(days, instance)
+        super().request_refresh()
+
+    def invalidate(
+        self, days: list[date] | None = None, instance: str | None = None
+    ) -> None:
+        """Mark *days* (or every cached day) as needing a refetch.
+
+        With a known *instance*, only that instance's days are marked; an
+        unknown one (e.g. a misconfigured webhook) marks every instance.
+        Stored entries stay queryable until the refetch replaces them.
+        """
+        if instance in self._fetched_at:
+            caches = [self._fetched_at[instance]]
+        else:
+            caches = list(self._fetched_at.values())
+        for fetched in caches:
+            for day in list(fetched) if days is None else days:
+                fetched.pop(day, None)
+
+    def _horizon(self) -> list[date]:
+        """Return the UTC dates kept in the store, starting today."""
+        today = datetime.now(timezone.utc).date()
+        return [today + timedelta(days=i) for i in range(HORIZON_DAYS)]
+
+    @staticmethod
+    def _runs(days: list[date]) -> list[list[date]]:
+        """Group sorted *days* into runs of consecutive dates."""
+        runs: list[list[date]] = []
+        for day in days:
+            if runs and day - runs[-1][-1] == timedelta(days=1):
+                runs[-1].append(day)
+            else:
+                runs.append([day])
+        return runs
+
+    def _due(self, key: str) -> list[date]:
+        """Return the days instance *key* should refetch this cycle."""
+        horizon = self._horizon()
+        fetched = self._fetched_at.setdefault(key, {})
+        for day in [d for d in fetched if d < horizon[0]]:
+            del fetched[day]
+
+        now = time.monotonic()
+        near = horizon[:WINDOW_DAYS]
+        due = [
+            d for d in near
+            if d not in fetched or d == near[0] or now - fetched[d] > BUCKET_MAX_AGE
+        ]
+        far = [
+            d for d in horizon[WINDOW_DAYS:]
+            if d not in fetched or now - fetched[d] > FAR_MAX_AGE
+        ]
+        return due + far[:FILL_CHUNK_DAYS]
+
+    async def _sync(
+        self,
+        key: str,
+        kind: str,
+        fetch: Any,
+        parse: Any,
+        when: Any,
+    ) -> None:
+        """Refetch due days for instance *key* into the store's *kind* entries.
+
+        *fetch(start, end)* returns raw entries, *parse(entry)* slims one,
+        and *when(entry)* returns the UTC instants an entry falls on.
+        """
+        for run in self._runs(self._due(key)):
+            entries = await fetch(
+                run[0].isoformat(), (run[-1] + timedelta(days=1)).isoformat()
+            )
             if not isinstance(entries, list):
-                return []
-            return [
-                {
-                    "series": ep.get("series", {}).get("title", "")
-                    if isinstance(ep.get("series"), dict)
-                    else str(ep.get("seriesTitle", "")),
-                    "title": ep.get("title", ""),
-                    "airDate": ep.get("airDateUtc", ep.get("airDate", "")),
-                    "season": ep.get("seasonNumber", 0),
-                    "episode": ep.get("episodeNumber", 0),
-                    "hasFile": ep.get("hasFile", False),
-                }
-                for ep in entries
-            ]
+                raise ValueError(f"unexpected {key} calendar payload")
+            days = set(run)
+            fresh = []
+            for entry in entries:
+                # Trust upstream's range filter: entries dated outside the run
+                # (e.g. a movie matched on another release type) go to day one.
+                instant = next((i for i in when(entry) if i.date() in days), None)
+                ts = instant.timestamp() if instant else midnight(run[0])
+                item = parse(entry)
+                item["instance"] = key
+                fresh.append((ts, item))
+            self.store.replace(
+                kind, midnight(run[0]), midnight(run[-1]) + DAY_SECONDS, fresh,
+                source=key,
+            )
+            fetched_at = time.monotonic()
+            for day in run:
+                self._fetched_at[key][day] = fetched_at
+
+    # -- Sonarr ----------------------------------------------------------------
+
+    async def _refresh_series_titles(
+        self, key: str, client: Any, *, force: bool = False
+    ) -> None:
+        """Reload instance *key*'s seriesId -> title cache when stale (or *force*d)."""
+        now = time.monotonic()
+        fetched_at = self._series_fetched_at.get(key)
+        if fetched_at is not None:
+            age = now - fetched_at
+            if age < (SERIES_MISS_COOLDOWN if force else SERIES_CACHE_TTL):
+                return
+        self._series_fetched_at[key] = now
+        try:
+            series = await client.get_series()
         except Exception:
-            logger.debug("Failed to poll Sonarr calendar")
-            return []
-
-    async def _poll_radarr_calendar(self) -> list[dict[str, Any]]:
-        """Fetch upcoming movies from Radarr."""
-        client = self.clients.get("radarr")
-        if client is None:
-            return []
+            logger.debug("Failed to refresh %s series titles", key)
+            return
+        if isinstance(series, list):
+            self._series_titles[key] = {
+                s["id"]: s.get("title", "")
+                for s in series
+                if isinstance(s, dict) and "id" in s
+            }
+
+    def _parse_episode(self, ep: dict[str, Any], key: str = "sonarr") -> dict[str, Any]:
+        series = ep.get("series")
+        if isinstance(series, dict):
+            title = series.get("title", "")
+        else:
+            title = self._series_titles.get(key, {}).get(
+                ep.get("seriesId"), str(ep.get("seriesTitle", ""))
+            )
+        return {
+            "id": ep.get("id"),
+            "seriesId": ep.get("seriesId"),
+            "series": title,
+            "title": ep.get("title", ""),
+            "airDate": ep.get("airDateUtc", ep.get("airDate", "")),
+            "season": ep.get("seasonNumber", 0),
+            "episode": ep.get("episodeNumber", 0),
+            "hasFile": ep.get("hasFile", False),
+        }
+
+    async def _poll_sonarr_calendar(self, key: str, client: Any) -> None:
+        """Sync upcoming episodes from one Sonarr instance into the store."""
         try:
-            start, end = self._date_range()
-            entries = await client.get_calendar(start=start, end=end)
-            if not isinstance(entries, list):
-                return []
-            return [
-                {
-                    "title": movie.get("title", ""),
-                    "releaseDate": movie.get(
-                        "digitalRelease",
-                        movie.get("physicalRelease", movie.get("inCinemas", "")),
-                    ),
-                    "hasFile": movie.get("hasFile", False),
-                }
-                for movie in entries
-            ]
+            await self._refresh_series_titles(key, client)
+            missing: list[dict[str, Any]] = []
+
+            async def fetch(start: str, end: str) -> Any:
+                return await client.get_calendar(
+                    start=start, end=end, include_series=False
+                )
+
+            def parse(ep: dict[str, Any]) -> dict[str, Any]:
+                parsed = self._parse_episode(ep, key)
+                if not parsed["series"] and parsed["seriesId"] is not None:
+                    missing.append(parsed)
+                return parsed
+
+            await self._sync(
+                key,
+                "episodes",
+                fetch,
+                parse,
+                lambda ep: _instants(ep.get("airDateUtc"), ep.get("airDate")),
+            )
+            if missing:
+                # A series added since the last cache refresh.
+                await self._refresh_series_titles(key, client, force=True)
+                titles = self._series_titles.get(key, {})
+                for ep in missing:
+                    ep["series"] = titles.get(ep["seriesId"], "")
+        except Exception:
+            logger.debug("Failed to poll %s calendar", key)
+
+    # -- Radarr ----------------------------------------------------------------
+
+    @staticmethod
+    def _parse_movie(movie: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "id": movie.get("id"),
+            "title": movie.get("title", ""),
+            "releaseDate": movie.get(
+                "digitalRelease",
+                movie.get("physicalRelease", movie.get("inCinemas", "")),
+            ),
+            "hasFile": movie.get("hasFile", False),
+        }
+
+    async def _poll_radarr_calendar(self, key: str, client: Any) -> None:
+        """Sync upcoming movies from one Radarr instance into the store."""
+        try:
+            async def fetch(start: str, end: str) -> Any:
+                return await client.get_calendar(start=start, end=end)
+
+            await self._sync(
+                key,
+                "movies",
+                fetch,
+                self._parse_movie,
+                lambda m: _instants(
+                    m.get("digitalRelease"), m.get("physicalRelease"), m.get("inCinemas")
+                ),
+            )
         except Exception:
-            logger.debug("Failed to poll Radarr calendar")
-            return []
+            logger.debug("Failed to poll %s calendar", key)
@@ -2,77 +2,256 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import math
+import re
+import time
 from typing import Any
 
 from app.collectors.base import BaseCollector
 
 logger = logging.getLogger(__name__)
 
+# SABnzbd reports sizes in binary units.
+_SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+_SIZE_RE = re.compile(r"^\s*([\d.]+)\s*([KMGT]?)(?:I?B)?(?:/S)?\s*$", re.IGNORECASE)
+
+# Time constant (seconds) of the speed EWMA — roughly a 30s memory.
+SPEED_EWMA_TAU = 30.0
+
+# Seconds between fetches of the SABnzbd slots past the first page.
+SAB_BACKLOG_INTERVAL = 30
+
+
+def parse_size(value: Any) -> int | None:
+    """Parse ``"1.2 GB"``, ``"800 MB"``, ``"10.5 M"`` or ``"10.5 MB/s"`` into bytes."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if not isinstance(value, str):
+        return None
+    m = _SIZE_RE.match(value)
+    if m is None:
+        return None
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2).upper()])
+
+
+def parse_duration(value: Any) -> int | None:
+    """Parse SABnzbd ``[D:]H:MM:SS`` time-left strings into seconds."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parts = [int(p) for p in value.split(":")]
+    except ValueError:
+        return None
+    seconds = 0
+    for part, scale in zip(reversed(parts), (1, 60, 3600, 86400)):
+        seconds += part * scale
+    return seconds
+
+
+def _mb_to_bytes(value: Any) -> int | None:
+    """Convert SABnzbd's numeric ``mb``/``mbleft`` strings to bytes."""
+    try:
+        return int(float(value) * 1024 * 1024)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_slot(slot: dict[str, Any]) -> dict[str, Any]:
+    """One SABnzbd queue slot, with numeric twins of its display strings."""
+    return {
+        "id": slot.get("nzo_id"),
+        "name": slot.get("filename", ""),
+        "percentage": slot.get("percentage", ""),
+        "sizeleft": slot.get("sizeleft", ""),
+        "status": slot.get("status", ""),
+        "timeleft": slot.get("timeleft", ""),
+        "sizeleft_bytes": _mb_to_bytes(slot.get("mbleft"))
+        or parse_size(slot.get("sizeleft")),
+        "size_bytes": _mb_to_bytes(slot.get("mb"))
+        or parse_size(slot.get("size")),
+        "timeleft_s": parse_duration(slot.get("timeleft")),
+    }
+
+
+def _empty_sabnzbd() -> dict[str, Any]:
+    return {
+        "speed": "",
+        "sizeleft": "",
+        "timeleft": "",
+        "speed_bps": 0,
+        "sizeleft_bytes": 0,
+        "timeleft_s": None,
+        "speed_ewma_bps": 0,
+        "eta_ewma_s": None,
+        "total_items": 0,
+        "items": [],
+    }
+
 
 class DownloadsCollector(BaseCollector):
     """Gathers download activity from SABnzbd, Sonarr, and Radarr.
 
-    Gracefully handles missing services by returning empty data.
+    Gracefully handles missing services by returning empty data.  Every
+    instance of each service is polled concurrently.  ``sabnzbd`` holds the
+    first SABnzbd instance and ``sabnzbd_instances`` all of them by key;
+    the *arr queues merge every instance, each record tagged with its
+    ``instance``.
+
+    Snapshots carry only the first :attr:`sab_item_limit` SABnzbd slots.
+    When a queue is longer, the rest is fetched as a ``<instance>.backlog``
+    sub-resource every :data:`SAB_BACKLOG_INTERVAL` seconds and handed to
+    the hub's list index only, so ``/api/downloads`` can page through the
+    whole queue without every snapshot carrying it.
     """
 
+    name = "downloads"
+
+    #: SABnzbd slots fetched per cycle (the first page); 0 fetches totals only.
+    sab_item_limit: int = 50
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # SABnzbd instance -> speed EWMA and the monotonic time of its sample
+        self._speed_ewma: dict[str, float] = {}
+        self._speed_at: dict[str, float] = {}
+        # SABnzbd instance -> queue length seen by the last first-page poll
+        self._sab_totals: dict[str, int] = {}
+        for key, client in self.instances("sabnzbd").items():
+            self._add_backlog_resource(key, client)
+
+    def _add_backlog_resource(self, key: str, client: Any) -> None:
+        async def backlog() -> list[dict[str, Any]]:
+            if not self._has_backlog(key):
+                return []
+            # Not hedged: this page is far slower than the first one.
+            result = await client.get_queue(start=self.sab_item_limit, hedge=False)
+            return [_parse_slot(slot) for slot in result.get("queue", {}).get("slots", [])]
+
+        self.add_resource(f"{key}.backlog", backlog, SAB_BACKLOG_INTERVAL, default=[])
+
+    def _has_backlog(self, key: str) -> bool:
+        """Whether instance *key*'s queue runs past the first page."""
+        return 0 < self.sab_item_limit < self._sab_totals.get(key, 0)
+
     async def collect(self) -> None:
-        """Poll download queues and broadcast results."""
-        sabnzbd_data = await self._poll_sabnzbd()
-        sonarr_queue = await self._poll_arr_queue("sonarr")
-        radarr_queue = await self._poll_arr_queue("radarr")
-
-        await self.hub.broadcast("downloads", {
-            "sabnzbd": sabnzbd_data,
-            "sonarr_queue": sonarr_queue,
-            "radarr_queue": radarr_queue,
-        })
-
-    async def _poll_sabnzbd(self) -> dict[str, Any]:
-        """Fetch SABnzbd queue, return structured data."""
-        client = self.clients.get("sabnzbd")
-        if client is None:
-            return {"speed": "", "sizeleft": "", "timeleft": "", "items": []}
+        """Poll every download queue concurrently and broadcast results."""
+        sabnzbd, sonarr, radarr = await asyncio.gather(
+            self.poll_instances("sabnzbd", self._poll_sabnzbd),
+            self.poll_instances("sonarr", self._poll_arr_queue),
+            self.poll_instances("radarr", self._poll_arr_queue),
+        )
+        for key, sab in sabnzbd.items():
+            self._sab_totals[key] = sab["total_items"]
+            resource = self.resources.get(f"{key}.backlog")
+            # A queue that just outgrew the first page shouldn't wait a
+            # whole backlog interval to be fully indexed.
+            if resource is not None and self._has_backlog(key) and not resource.value:
+                resource.invalidate()
+        await self.refresh_resources()
+
+        data = {
+            "sabnzbd": next(iter(sabnzbd.values()), None) or _empty_sabnzbd(),
+            "sabnzbd_instances": sabnzbd,
+            "sonarr_queue": [rec for queue in sonarr.values() for rec in queue],
+            "radarr_queue": [rec for queue in radarr.values() for rec in queue],
+        }
+        await self.hub.broadcast("downloads", data, index_data=self._index_view(data))
+
+    def _index_view(self, data: dict[str, Any]) -> dict[str, Any] | None:
+        """*data* with each SABnzbd queue extended by its backlog, if any."""
+        full = {}
+        for key, sab in data["sabnzbd_instances"].items():
+            resource = self.resources.get(f"{key}.backlog")
+            if resource is None or not resource.value or not self._has_backlog(key):
+                continue
+            # The backlog lags the first page; skip slots that moved up.
+            seen = {item["id"] for item in sab["items"]}
+            rest = [item for item in resource.value if item["id"] not in seen]
+            full[key] = {**sab, "items": sab["items"] + rest}
+        if not full:
+            return None
+        return {**data, "sabnzbd_instances": {**data["sabnzbd_instances"], **full}}
+
+    async def _poll_sabnzbd(self, key: str, client: Any) -> dict[str, Any]:
+        """Fetch the first page of the SABnzbd queue, parsed to numbers once.
+
+        Human-readable strings are kept for display; ``*_bytes``, ``*_bps``
+        and ``*_s`` fields carry the same values as numbers, plus an
+        EWMA-smoothed speed and the ETA derived from it.
+        """
         try:
-            result = await client.get_queue()
+            if self.sab_item_limit:
+                result = await client.get_queue(start=0, limit=self.sab_item_limit)
+            else:
+                result = await client.get_queue(aggregates_only=True)
             queue = result.get("queue", {})
-            items = [
-                {
-                    "name": slot.get("filename", ""),
-                    "percentage": slot.get("percentage", ""),
-                    "sizeleft": slot.get("sizeleft", ""),
-                    "status": slot.get("status", ""),
-                    "timeleft": slot.get("timeleft", ""),
-                }
-                for slot in queue.get("slots", [])
-            ]
+            slots = queue.get("slots", [])
+            items = [_parse_slot(slot) for slot in slots]
+
+            kbpersec = queue.get("kbpersec")
+            try:
+                speed_bps = int(float(kbpersec) * 1024)
+            except (TypeError, ValueError):
+                speed_bps = parse_size(queue.get("speed")) or 0
+            sizeleft_bytes = (
+                _mb_to_bytes(queue.get("mbleft"))
+                or parse_size(queue.get("sizeleft"))
+                or 0
+            )
+            speed_ewma = self._smooth_speed(key, speed_bps)
+            eta_ewma = (
+                int(sizeleft_bytes / speed_ewma) if speed_ewma > 0 else None
+            )
+            total = queue.get("noofslots_total", queue.get("noofslots", len(slots)))
+
             return {
                 "speed": queue.get("speed", ""),
                 "sizeleft": queue.get("sizeleft", ""),
                 "timeleft": queue.get("timeleft", ""),
+                "speed_bps": speed_bps,
+                "sizeleft_bytes": sizeleft_bytes,
+                "timeleft_s": parse_duration(queue.get("timeleft")),
+                "speed_ewma_bps": int(speed_ewma),
+                "eta_ewma_s": eta_ewma,
+                "total_items": int(total),
                 "items": items,
             }
         except Exception:
-            logger.debug("Failed to poll SABnzbd queue")
-            return {"speed": "", "sizeleft": "", "timeleft": "", "items": []}
+            logger.debug("Failed to poll %s queue", key)
+            return _empty_sabnzbd()
 
-    async def _poll_arr_queue(self, name: str) -> list[dict[str, Any]]:
-        """Fetch Sonarr or Radarr import queue."""
-        client = self.clients.get(name)
-        if client is None:
-            return []
+    def _smooth_speed(self, key: str, speed_bps: float) -> float:
+        """Fold *speed_bps* into instance *key*'s speed EWMA and return it."""
+        now = time.monotonic()
+        ewma = self._speed_ewma.get(key)
+        last = self._speed_at.get(key)
+        if ewma is None or last is None:
+            ewma = float(speed_bps)
+        else:
+            alpha = 1 - math.exp(-(now - last) / SPEED_EWMA_TAU)
+            ewma += alpha * (speed_bps - ewma)
+        self._speed_ewma[key] = ewma
+        self._speed_at[key] = now
+        return ewma
+
+    async def _poll_arr_queue(self, key: str, client: Any) -> list[dict[str, Any]]:
+        """Fetch one Sonarr or Radarr instance's import queue."""
         try:
             result = await client.get_queue()
             records = result.get("records", [])
             return [
                 {
+                    "id": rec.get("id"),
                     "title": rec.get("title", ""),
                     "status": rec.get("status", ""),
                     "sizeleft": rec.get("sizeleft", 0),
                     "size": rec.get("size", 0),
+                    "instance": key,
                 }
                 for rec in records
             ]
         except Exception:
-            logger.debug("Failed to poll %s queue", name)
+            logger.debug("Failed to poll %s queue", key)
             return []
@@ -5,42 +5,150 @@ from __future__ import annotations
 import asyncio
 import logging
 import time
+from datetime import datetime, timezone
 from typing import Any
 
 from app.collectors.base import BaseCollector
+from app.services.limiter import Priority
 
 logger = logging.getLogger(__name__)
 
+# Seconds between full ``get_system_status()`` calls (version, etc.) per
+# service.  In between, liveness comes from data-path traffic or ``ping()``.
+STATUS_INTERVAL = 600
+
+# Seconds a single service check may take before it is reported offline.
+CHECK_TIMEOUT = 5.0
+
+
+def _stamp(value: Any) -> float | None:
+    """Return *value* if it is a recorded timestamp/latency, else ``None``."""
+    return float(value) if isinstance(value, (int, float)) else None
+
 
 class HealthCollector(BaseCollector):
     """Checks the health of every configured service concurrently.
 
     Broadcasts a ``health`` message with the status of each service.
+    Checks are tiered, cheapest first:
+
+    * **passive** — a successful request by any collector within the last
+      interval (and no failure since) proves the service is up; nothing is
+      sent.
+    * **probe** — otherwise ``client.ping()``, the cheapest endpoint the
+      service has (``/ping`` for the *arr apps).
+    * **status** — ``get_system_status()`` runs every
+      :data:`STATUS_INTERVAL` seconds per service to refresh the version,
+      and doubles as that cycle's probe.
+
+    Results are published per service as each check completes, so one slow
+    or hung service (bounded by :data:`CHECK_TIMEOUT`) never holds back the
+    others.  Every entry carries ``checked_at``; services still being
+    checked keep their previous entry.
     """
 
+    name = "health"
+    priority = Priority.HEALTH
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._versions: dict[str, str] = {}
+        self._status_at: dict[str, float] = {}
+        self._results: dict[str, dict[str, Any]] = {}
+
     async def collect(self) -> None:
-        """Poll all service clients and broadcast results."""
-        tasks = [
-            self._check_service(name, client)
-            for name, client in self.clients.items()
-        ]
-        results = await asyncio.gather(*tasks)
-        await self.hub.broadcast("health", {"services": results})
+        """Check all service clients, broadcasting as each result arrives."""
+        now = time.monotonic()
+        probes = []
+        passive_found = False
+        for name, client in self.clients.items():
+            passive = None
+            if not self._status_due(name, now):
+                passive = self._passive_result(name, client, now)
+            if passive is None:
+                probes.append(self._timed_check(name, client))
+            else:
+                self._record(passive)
+                passive_found = True
+
+        if passive_found or not probes:
+            await self._publish()
+        for check in asyncio.as_completed(probes):
+            self._record(await check)
+            await self._publish()
+
+    def _record(self, result: dict[str, Any]) -> None:
+        result["checked_at"] = datetime.now(timezone.utc).isoformat()
+        self._results[result["name"]] = result
+
+    async def _publish(self) -> None:
+        """Broadcast the merged per-service results in client order."""
+        await self.hub.broadcast("health", {
+            "services": [
+                self._results[name] for name in self.clients if name in self._results
+            ],
+        })
+
+    def _status_due(self, name: str, now: float) -> bool:
+        last_status = self._status_at.get(name)
+        return last_status is None or now - last_status >= STATUS_INTERVAL
+
+    async def _timed_check(self, name: str, client: Any) -> dict[str, Any]:
+        """Run :meth:`_check_service` bounded by :data:`CHECK_TIMEOUT`."""
+        status_due = self._status_due(name, time.monotonic())
+        try:
+            return await asyncio.wait_for(
+                self._check_service(name, client), timeout=CHECK_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.debug("Service %s timed out after %ss", name, CHECK_TIMEOUT)
+            return {
+                "name": name,
+                "status": "offline",
+                "version": self._versions.get(name, ""),
+                "response_ms": int(CHECK_TIMEOUT * 1000),
+                "source": "status" if status_due else "probe",
+            }
+
+    def _passive_result(
+        self, name: str, client: Any, now: float
+    ) -> dict[str, Any] | None:
+        """Online result from recent data-path traffic, if there is any."""
+        success = _stamp(getattr(client, "last_success", None))
+        if success is None or now - success > self.interval:
+            return None
+        failure = _stamp(getattr(client, "last_failure", None))
+        if failure is not None and failure >= success:
+            return None
+        latency = _stamp(getattr(client, "last_latency", None))
+        return {
+            "name": name,
+            "status": "online",
+            "version": self._versions.get(name, ""),
+            "response_ms": int(latency * 1000) if latency is not None else 0,
+            "source": "passive",
+        }
 
     async def _check_service(
         self, name: str, client: Any
     ) -> dict[str, Any]:
-        """Call ``get_system_status()`` on a single client and time it."""
+        """Actively check one service: full status when due, else ``ping()``."""
+        status_due = self._status_due(name, time.monotonic())
         start = time.monotonic()
         try:
-            response = await client.get_system_status()
+            if status_due:
+                response = await client.get_system_status()
+                self._status_at[name] = time.monotonic()
+                self._versions[name] = self._extract_version(response)
+            else:
+                await client.ping()
             elapsed_ms = int((time.monotonic() - start) * 1000)
-            version = self._extract_version(response)
             return {
                 "name": name,
                 "status": "online",
-                "version": version,
+                "version": self._versions.get(name, ""),
                 "response_ms": elapsed_ms,
+                "source": "status" if status_due else "probe",
             }
         except Exception:
             elapsed_ms = int((time.monotonic() - start) * 1000)
@@ -48,8 +156,9 @@ class HealthCollector(BaseCollector):
             return {
                 "name": name,
                 "status": "offline",
-                "version": "",
+                "version": self._versions.get(name, ""),
                 "response_ms": elapsed_ms,
+                "source": "status" if status_due else "probe",
             }
 
     @staticmethod
@@ -0,0 +1,144 @@
+"""Push ingestion — turns Sonarr/Radarr SignalR events into collector refreshes."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from app.collectors.base import BaseCollector
+from app.collectors.calendar import event_days
+from app.config import instance_service
+
+logger = logging.getLogger(__name__)
+
+# Reconnect backoff for the SignalR connection (seconds).
+_RECONNECT_MIN = 1.0
+_RECONNECT_MAX = 60.0
+
+# SignalR resource name -> collectors whose snapshot it affects.
+ARR_EVENT_TARGETS: dict[str, tuple[str, ...]] = {
+    "queue": ("downloads",),
+    "queue/status": ("downloads",),
+    "queue/details": ("downloads",),
+    "episode": ("calendar",),
+    "episodefile": ("calendar",),
+    "series": ("calendar",),
+    "movie": ("calendar",),
+    "moviefile": ("calendar",),
+    "calendar": ("calendar",),
+}
+
+# Completed commands that change queue state (imports, scans, grabs).
+_QUEUE_COMMANDS = frozenset({
+    "DownloadedEpisodesScan",
+    "DownloadedMoviesScan",
+    "ProcessMonitoredDownloads",
+    "RefreshMonitoredDownloads",
+    "EpisodeSearch",
+    "SeasonSearch",
+    "SeriesSearch",
+    "MoviesSearch",
+})
+
+
+def arr_event_targets(message: dict[str, Any]) -> tuple[str, ...]:
+    """Return the collector names affected by one SignalR message."""
+    name = message.get("name", "")
+    if name == "command":
+        resource = (message.get("body") or {}).get("resource") or {}
+        if (
+            resource.get("status") == "completed"
+            and resource.get("name") in _QUEUE_COMMANDS
+        ):
+            return ("downloads",)
+        return ()
+    return ARR_EVENT_TARGETS.get(name, ())
+
+
+class ArrPushListener:
+    """Keeps a SignalR subscription open per *arr client (every instance).
+
+    Each event requests a refresh of the affected collectors, which
+    debounce and coalesce bursts on their own; the calendar only refetches
+    the days the event's episode or movie falls on.  Connection state is
+    reported to those collectors so they can poll slowly while push is up
+    and fall back to their normal interval when it drops.
+    """
+
+    services: tuple[str, ...] = ("sonarr", "radarr")
+
+    def __init__(
+        self,
+        clients: dict[str, Any],
+        collectors: dict[str, BaseCollector],
+    ) -> None:
+        self.clients = clients
+        self.collectors = collectors
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def _set_connected(self, service: str, connected: bool) -> None:
+        """Report push state to every collector *arr events can refresh."""
+        for name in ("downloads", "calendar"):
+            collector = self.collectors.get(name)
+            if collector is not None:
+                collector.set_push_connected(service, connected)
+                if connected:
+                    # Catch up on anything missed while disconnected.
+                    collector.request_refresh()
+
+    def dispatch(self, message: dict[str, Any], instance: str | None = None) -> None:
+        """Request refreshes for every collector affected by *message*.
+
+        *instance* is the client key the message came from.
+        """
+        for name in arr_event_targets(message):
+            collector = self.collectors.get(name)
+            if collector is None:
+                continue
+            if name == "calendar":
+                collector.request_refresh(
+                    days=event_days(message.get("body")), instance=instance
+                )
+            else:
+                collector.request_refresh()
+
+    async def _listen(self, service: str, client: Any) -> None:
+        """Consume *client*'s events forever, reconnecting with backoff."""
+        delay = _RECONNECT_MIN
+
+        def connected() -> None:
+            nonlocal delay
+            delay = _RECONNECT_MIN
+            self._set_connected(service, True)
+
+        while True:
+            try:
+                async for message in client.listen_events(on_connect=connected):
+                    self.dispatch(message, service)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.debug("%s SignalR connection failed", service, exc_info=True)
+            self._set_connected(service, False)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _RECONNECT_MAX)
+
+    def start(self) -> None:
+        """Start one listener task per configured *arr instance."""
+        for key, client in self.clients.items():
+            if instance_service(key) in self.services and hasattr(
+                client, "listen_events"
+            ):
+                self._tasks.append(asyncio.create_task(self._listen(key, client)))
+
+    async def stop(self) -> None:
+        """Cancel all listener tasks."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
@@ -1,47 +1,89 @@
-"""Streaming collector — polls Plex for active sessions."""
+"""Streaming collector — Plex sessions via push notifications plus polling."""
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
 from app.collectors.base import BaseCollector
+from app.session_history import SessionHistory
 
 logger = logging.getLogger(__name__)
 
+# Reconnect backoff for the Plex notification socket (seconds).
+_RECONNECT_MIN = 1.0
+_RECONNECT_MAX = 60.0
+
 
 class StreamingCollector(BaseCollector):
-    """Gathers active Plex streaming sessions and transcode info."""
+    """Gathers active Plex streaming sessions and transcode info.
+
+    When Plex is configured the collector also subscribes to the server's
+    notification WebSocket.  ``playing`` events for known sessions update
+    the snapshot in place (state changes, stops); events for unknown
+    sessions and transcode start/end trigger an immediate session refresh.
+    While the socket is connected, polling drops to ``push_interval`` as a
+    reconciliation fallback.
+
+    Every Plex instance is polled concurrently and gets its own socket;
+    sessions are tagged with their ``instance``, and ``instances`` carries
+    per-instance counts keyed by instance.
+
+    With a *history*, every published session list is also handed to the
+    :class:`~app.session_history.SessionHistory` to log plays.
+    """
+
+    name = "streaming"
+
+    def __init__(
+        self, *args: Any, history: SessionHistory | None = None, **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.history = history
+        # instance -> sessionKey -> parsed session
+        self._sessions: dict[str, dict[str, dict[str, Any]]] = {}
+        self._listeners: list[asyncio.Task[None]] = []
 
     async def collect(self) -> None:
-        """Poll Plex sessions and broadcast results."""
-        plex = self.clients.get("plex")
-        if plex is None:
-            await self.hub.broadcast("streaming", {
-                "stream_count": 0,
-                "transcode_count": 0,
-                "sessions": [],
-            })
-            return
+        """Poll every Plex instance's sessions and broadcast results."""
+        await self.poll_instances("plex", self._poll_sessions)
+        await self._publish()
 
+    async def _poll_sessions(self, key: str, plex: Any) -> None:
+        """Replace instance *key*'s session map with its current sessions."""
         try:
             sessions = await plex.get_sessions()
-            parsed = [self._parse_session(s) for s in sessions]
-            transcode_count = sum(
-                1 for s in parsed if s["decision"] == "transcode"
-            )
-            await self.hub.broadcast("streaming", {
-                "stream_count": len(parsed),
-                "transcode_count": transcode_count,
-                "sessions": parsed,
-            })
+            parsed = [{**self._parse_session(s), "instance": key} for s in sessions]
+            self._sessions[key] = {
+                str(s["sessionKey"]) if s["sessionKey"] is not None else f"#{i}": s
+                for i, s in enumerate(parsed)
+            }
         except Exception:
-            logger.debug("Failed to poll Plex sessions")
-            await self.hub.broadcast("streaming", {
-                "stream_count": 0,
-                "transcode_count": 0,
-                "sessions": [],
-            })
+            logger.debug("Failed to poll %s sessions", key)
+            self._sessions[key] = {}
+
+    async def _publish(self) -> None:
+        """Broadcast the current session maps."""
+        parsed: list[dict[str, Any]] = []
+        instances: dict[str, dict[str, int]] = {}
+        for key, sessions in self._sessions.items():
+            values = list(sessions.values())
+            parsed.extend(values)
+            instances[key] = {
+                "stream_count": len(values),
+                "transcode_count": sum(
+                    1 for s in values if s["decision"] == "transcode"
+                ),
+            }
+        await self.hub.broadcast("streaming", {
+            "stream_count": len(parsed),
+            "transcode_count": sum(i["transcode_count"] for i in instances.values()),
+            "sessions": parsed,
+            "instances": instances,
+        })
+        if self.history is not None:
+            self.history.observe(parsed)
 
     @staticmethod
     def _parse_session(session: dict[str, Any]) -> dict[str, Any]:
@@ -59,10 +101,85 @@ class StreamingCollector(BaseCollector):
             decision = "transcode"
 
         return {
+            "sessionKey": session.get("sessionKey"),
             "user": session.get("User", {}).get("title", ""),
             "title": session.get("title", ""),
             "grandparentTitle": session.get("grandparentTitle", ""),
             "parentIndex": session.get("parentIndex"),
             "index": session.get("index"),
+            "state": session.get("Player", {}).get("state", ""),
             "decision": decision,
         }
+
+    # -- Push notifications --------------------------------------------------
+
+    async def handle_notification(
+        self, container: dict[str, Any], instance: str = "plex"
+    ) -> None:
+        """Apply one Plex ``NotificationContainer`` from *instance* to the snapshot."""
+        kind = container.get("type", "")
+        if kind == "playing":
+            changed = False
+            sessions = self._sessions.setdefault(instance, {})
+            for note in container.get("PlaySessionStateNotification", []):
+                key = str(note.get("sessionKey", ""))
+                state = note.get("state", "")
+                session = sessions.get(key)
+                if session is None:
+                    if state != "stopped":
+                        # A stream we haven't seen yet — fetch its details.
+                        self.request_refresh()
+                elif state == "stopped":
+                    del sessions[key]
+                    changed = True
+                elif session.get("state") != state:
+                    # Replace, don't mutate: the last snapshot still holds it.
+                    sessions[key] = {**session, "state": state}
+                    changed = True
+            if changed:
+                await self._publish()
+        elif kind in ("transcodeSession.start", "transcodeSession.end"):
+            # Playback decision changed for some session.
+            self.request_refresh()
+
+    async def _listen(self, key: str, plex: Any) -> None:
+        """Keep *plex*'s notification subscription open, reconnecting with backoff."""
+        delay = _RECONNECT_MIN
+
+        def connected() -> None:
+            nonlocal delay
+            delay = _RECONNECT_MIN
+            self.set_push_connected(key, True)
+            # Catch up on anything missed while disconnected.
+            self.request_refresh()
+
+        while True:
+            try:
+                async for container in plex.listen_notifications(on_connect=connected):
+                    await self.handle_notification(container, key)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.debug("%s notification socket failed", key, exc_info=True)
+            self.set_push_connected(key, False)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _RECONNECT_MAX)
+
+    def start(self) -> None:
+        """Start the poll loop and a push listener per Plex instance that has one."""
+        super().start()
+        for key, plex in self.instances("plex").items():
+            if hasattr(plex, "listen_notifications"):
+                self._listeners.append(asyncio.create_task(self._listen(key, plex)))
+
+    async def stop(self) -> None:
+        """Stop the push listeners and the poll loop."""
+        for listener in self._listeners:
+            listener.cancel()
+        for listener in self._listeners:
+            try:
+                await listener
+            except asyncio.CancelledError:
+                pass
+        self._listeners = []
+        await super().stop()
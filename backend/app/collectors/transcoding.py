@@ -3,67 +3,273 @@
 from __future__ import annotations
 
 import logging
+import time
+from collections import deque
 from typing import Any
 
 from app.collectors.base import BaseCollector
+from app.collectors.downloads import parse_duration
 
 logger = logging.getLogger(__name__)
 
+# Sub-resource cadences (seconds).  Worker progress moves every second while
+# transcoding; the staged queue and library statistics change slowly.
+NODES_ACTIVE_INTERVAL = 3
+STAGED_INTERVAL = 30
+STATISTICS_INTERVAL = 300
+
+# Seconds of node history behind the rolling throughput figures.
+THROUGHPUT_WINDOW = 900.0
+
+_GIB = 1024**3
+
+_EMPTY_STATS: dict[str, Any] = {
+    "total_files": 0,
+    "total_transcodes": 0,
+    "size_diff_bytes": 0,
+}
+
+# Broadcast field -> sub-resource it comes from (for per-field ages).
+_FIELD_RESOURCES: dict[str, str] = {
+    "nodes": "nodes",
+    "queue_size": "staged",
+    "total_files": "statistics",
+    "total_transcodes": "statistics",
+    "size_diff_bytes": "statistics",
+}
+
+_EMPTY_THROUGHPUT: dict[str, float] = {
+    "files_per_hour": 0.0,
+    "bytes_per_hour": 0.0,
+    "fps": 0.0,
+}
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class NodeThroughput:
+    """Rolling files/hour, bytes/hour and mean fps of one Tdarr node.
+
+    Each :meth:`update` credits the progress every worker made since the
+    previous one (a file going from 40% to 60% counts as 0.2 files and 20%
+    of its size), so throughput shows up while files are still running.
+    Per-update samples older than *window* seconds drop out of running sums.
+    """
+
+    def __init__(self, window: float = THROUGHPUT_WINDOW) -> None:
+        self.window = window
+        # (time, seconds covered, files, bytes, fps * seconds)
+        self._samples: deque[tuple[float, float, float, float, float]] = deque()
+        self._span = self._files = self._bytes = self._frames = 0.0
+        # (worker id, file) -> last seen percentage
+        self._progress: dict[tuple[str, str], float] = {}
+        self._updated: float | None = None
+
+    def update(self, workers: list[dict[str, Any]], now: float) -> None:
+        """Fold in the node's current *workers* as seen at *now*."""
+        files = size = 0.0
+        progress: dict[tuple[str, str], float] = {}
+        for worker in workers:
+            key = (worker["id"], worker["file"])
+            pct = worker["percentage"]
+            # Files already running when we first look earn no credit.
+            prev = self._progress.get(key, pct if self._updated is None else 0.0)
+            done = max(pct - prev, 0.0) / 100
+            files += done
+            size += done * (worker["size_bytes"] or 0)
+            progress[key] = pct
+        self._progress = progress
+
+        if self._updated is not None and now > self._updated:
+            span = now - self._updated
+            frames = span * sum(worker["fps"] for worker in workers)
+            self._samples.append((now, span, files, size, frames))
+            self._span += span
+            self._files += files
+            self._bytes += size
+            self._frames += frames
+        self._updated = now
+
+        while self._samples and self._samples[0][0] <= now - self.window:
+            _, span, files, size, frames = self._samples.popleft()
+            self._span -= span
+            self._files -= files
+            self._bytes -= size
+            self._frames -= frames
+
+    def summary(self) -> dict[str, float]:
+        """Rates over the window; zeros until two updates have been seen."""
+        if not self._samples or self._span <= 0:
+            return dict(_EMPTY_THROUGHPUT)
+        return {
+            "files_per_hour": max(self._files, 0.0) * 3600 / self._span,
+            "bytes_per_hour": max(self._bytes, 0.0) * 3600 / self._span,
+            "fps": max(self._frames, 0.0) / self._span,
+        }
+
 
 class TranscodingCollector(BaseCollector):
-    """Gathers Tdarr transcoding status, nodes, and queue info."""
+    """Gathers Tdarr transcoding status, nodes, and queue info.
+
+    Nodes, staged files and statistics are separate sub-resources: nodes
+    refresh every :data:`NODES_ACTIVE_INTERVAL` seconds while any worker is
+    busy (the collector interval otherwise), the staged count every
+    :data:`STAGED_INTERVAL` and statistics every :data:`STATISTICS_INTERVAL`.
+    Each broadcast merges the latest value of all three and reports the age
+    of every field under ``ages``.
+
+    Every Tdarr instance has its own three sub-resources, named
+    ``<instance>.<resource>``.  Nodes are tagged with their ``instance``,
+    counts are summed across instances (``instances`` has them per
+    instance), and ``ages`` reports the stalest instance.
+
+    Workers are flattened into compact records (see :meth:`_parse_worker`).
+    Every node fetch also updates that node's :class:`NodeThroughput`;
+    nodes carry their rolling ``throughput`` and the snapshot the sum.
+    """
+
+    name = "transcoding"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # (instance, node id) -> rolling throughput
+        self._throughput: dict[tuple[str, str], NodeThroughput] = {}
+        self._tdarr_keys = list(self.instances("tdarr"))
+        for key, tdarr in self.instances("tdarr").items():
+            self._add_instance_resources(key, tdarr)
+
+    def _add_instance_resources(self, key: str, tdarr: Any) -> None:
+        async def nodes() -> list[dict[str, Any]]:
+            parsed = self._parse_nodes(await tdarr.get_nodes())
+            return self._track_throughput(key, parsed, time.monotonic())
+
+        async def staged() -> int:
+            staged_raw = await tdarr.get_staged_files()
+            return len(staged_raw) if isinstance(staged_raw, list) else 0
+
+        async def statistics() -> dict[str, Any]:
+            return self._parse_statistics(await tdarr.get_statistics())
+
+        self.add_resource(
+            f"{key}.nodes", nodes, lambda: self._nodes_interval(key), default=[]
+        )
+        self.add_resource(f"{key}.staged", staged, STAGED_INTERVAL, default=0)
+        self.add_resource(
+            f"{key}.statistics", statistics, STATISTICS_INTERVAL,
+            default=dict(_EMPTY_STATS),
+        )
+
+    def _nodes_interval(self, key: str) -> float:
+        """Poll an instance's nodes fast only while one of its workers is running."""
+        nodes = self.resources[f"{key}.nodes"].value
+        if any(node["workers"] for node in nodes):
+            return min(NODES_ACTIVE_INTERVAL, self.interval)
+        return self.interval
 
     async def collect(self) -> None:
-        """Poll Tdarr for nodes, staged files, and statistics."""
-        tdarr = self.clients.get("tdarr")
-        if tdarr is None:
+        """Refresh due Tdarr sub-resources and broadcast the merged result."""
+        if not self._tdarr_keys:
             await self.hub.broadcast("transcoding", {
                 "nodes": [],
                 "queue_size": 0,
-                "total_files": 0,
-                "total_transcodes": 0,
-                "size_diff_bytes": 0,
+                **_EMPTY_STATS,
+                "throughput": dict(_EMPTY_THROUGHPUT),
             })
             return
 
-        try:
-            nodes_raw = await tdarr.get_nodes()
-            staged_raw = await tdarr.get_staged_files()
-            stats_raw = await tdarr.get_statistics()
+        await self.refresh_resources()
+        ages = self.resource_ages()
+        nodes: list[dict[str, Any]] = []
+        totals: dict[str, Any] = {"queue_size": 0, **_EMPTY_STATS}
+        instances: dict[str, dict[str, Any]] = {}
+        for key in self._tdarr_keys:
+            nodes.extend(self.resources[f"{key}.nodes"].value)
+            counts = {
+                "queue_size": self.resources[f"{key}.staged"].value,
+                **self.resources[f"{key}.statistics"].value,
+            }
+            for field, value in counts.items():
+                totals[field] += value
+            instances[key] = counts
 
-            nodes = self._parse_nodes(nodes_raw)
-            queue_size = len(staged_raw) if isinstance(staged_raw, list) else 0
-            stats = self._parse_statistics(stats_raw)
+        throughput = dict(_EMPTY_THROUGHPUT)
+        for node in nodes:
+            for field, value in node["throughput"].items():
+                throughput[field] += value
 
-            await self.hub.broadcast("transcoding", {
-                "nodes": nodes,
-                "queue_size": queue_size,
-                **stats,
-            })
-        except Exception:
-            logger.debug("Failed to poll Tdarr")
-            await self.hub.broadcast("transcoding", {
-                "nodes": [],
-                "queue_size": 0,
-                "total_files": 0,
-                "total_transcodes": 0,
-                "size_diff_bytes": 0,
-            })
+        await self.hub.broadcast("transcoding", {
+            "nodes": nodes,
+            **totals,
+            "throughput": throughput,
+            "ages": {
+                field: self._stalest(ages, res) for field, res in _FIELD_RESOURCES.items()
+            },
+            "instances": instances,
+        })
 
-    @staticmethod
-    def _parse_nodes(nodes_raw: Any) -> list[dict[str, Any]]:
+    def _stalest(self, ages: dict[str, float | None], resource: str) -> float | None:
+        """Largest age of *resource* across instances; ``None`` if any never loaded."""
+        values = [ages[f"{key}.{resource}"] for key in self._tdarr_keys]
+        if any(age is None for age in values):
+            return None
+        return max(values)  # type: ignore[type-var]
+
+    def _track_throughput(
+        self, key: str, nodes: list[dict[str, Any]], now: float
+    ) -> list[dict[str, Any]]:
+        """Update instance *key*'s node trackers; return nodes tagged with results."""
+        seen = set()
+        tagged = []
+        for node in nodes:
+            seen.add(node["id"])
+            tracker = self._throughput.get((key, node["id"]))
+            if tracker is None:
+                tracker = self._throughput[(key, node["id"])] = NodeThroughput()
+            tracker.update(node["workers"], now)
+            tagged.append({**node, "instance": key, "throughput": tracker.summary()})
+        for gone in [k for k in self._throughput if k[0] == key and k[1] not in seen]:
+            del self._throughput[gone]
+        return tagged
+
+    @classmethod
+    def _parse_nodes(cls, nodes_raw: Any) -> list[dict[str, Any]]:
         """Extract node info from Tdarr response."""
         if isinstance(nodes_raw, dict):
             return [
                 {
                     "id": node_id,
                     "name": node_data.get("nodeName", node_id),
-                    "workers": node_data.get("workers", {}),
+                    "workers": [
+                        cls._parse_worker(worker_id, worker)
+                        for worker_id, worker in (node_data.get("workers") or {}).items()
+                        if isinstance(worker, dict)
+                    ],
                 }
                 for node_id, node_data in nodes_raw.items()
             ]
         return []
 
+    @staticmethod
+    def _parse_worker(worker_id: str, worker: dict[str, Any]) -> dict[str, Any]:
+        """Flatten one Tdarr worker into the fields the dashboard shows."""
+        size_gb = worker.get("sourcefileSizeInGbytes")
+        return {
+            "id": worker_id,
+            "file": worker.get("file", ""),
+            "status": worker.get("status", ""),
+            "type": worker.get("workerType", ""),
+            "percentage": _number(worker.get("percentage")),
+            "fps": _number(worker.get("fps")),
+            "eta": worker.get("ETA", ""),
+            "eta_s": parse_duration(worker.get("ETA")),
+            "size_bytes": int(_number(size_gb) * _GIB) if size_gb is not None else None,
+        }
+
     @staticmethod
     def _parse_statistics(stats_raw: Any) -> dict[str, Any]:
         """Extract summary statistics from Tdarr response."""
@@ -73,8 +279,4 @@ class TranscodingCollector(BaseCollector):
                 "total_transcodes": stats_raw.get("totalTranscodeCount", 0),
                 "size_diff_bytes": stats_raw.get("sizeDiff", 0),
             }
-        return {
-            "total_files": 0,
-            "total_transcodes": 0,
-            "size_diff_bytes": 0,
-        }
+        return dict(_EMPTY_STATS)
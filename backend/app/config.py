@@ -3,7 +3,44 @@
 from __future__ import annotations
 
 from pydantic_settings import BaseSettings
-from pydantic import Field
+from pydantic import BaseModel, Field
+
+# Services whose clients authenticate with a token rather than an API key.
+_TOKEN_SERVICES = frozenset({"plex"})
+
+# Services that work without any credential.
+_KEYLESS_SERVICES = frozenset({"tdarr"})
+
+
+def instance_key(service: str, name: str = "") -> str:
+    """Client key for instance *name* of *service* (``"sonarr:4k"``).
+
+    The default instance, configured by the flat ``<service>_url``
+    settings, is keyed by the bare service name.
+    """
+    return f"{service}:{name}" if name else service
+
+
+def instance_service(key: str) -> str:
+    """Service type of client key *key* (``"sonarr:4k"`` -> ``"sonarr"``)."""
+    return key.partition(":")[0]
+
+
+class ServiceInstance(BaseModel):
+    """One extra, named instance of a service type."""
+
+    name: str
+    url: str
+    api_key: str = ""
+    # Plex only.
+    token: str = ""
+
+
+class RateLimit(BaseModel):
+    """Token-bucket limit for one service: requests/second and burst size."""
+
+    rate: float
+    burst: float = 1
 
 
 class Settings(BaseSettings):
@@ -14,6 +51,22 @@ class Settings(BaseSettings):
     # Dashboard
     mcc_host: str = Field(default="0.0.0.0")
     mcc_port: int = Field(default=8880)
+    # Shared secret for /api/debug/profile; profiling is disabled when empty.
+    mcc_debug_token: str = ""
+    # Event-loop stalls longer than this are logged with the blocking task.
+    mcc_slow_callback_ms: float = 100
+    # Shared secret for /api/webhooks/*; webhooks are unauthenticated when empty.
+    mcc_webhook_token: str = ""
+    # Per-collector polling overrides, e.g. {"calendar": 1800} (JSON in env).
+    mcc_collector_intervals: dict[str, float] = Field(default_factory=dict)
+    # Extra named instances per service type (JSON in env), e.g.
+    # {"sonarr": [{"name": "4k", "url": "http://...", "api_key": "..."}]}.
+    mcc_instances: dict[str, list[ServiceInstance]] = Field(default_factory=dict)
+    # Per-service rate limits by service type or instance key (JSON in env),
+    # e.g. {"plex": {"rate": 5, "burst": 10}}; a rate of 0 disables limiting.
+    mcc_rate_limits: dict[str, RateLimit] = Field(default_factory=dict)
+    # SQLite file for the Plex session history; history is off when empty.
+    mcc_history_path: str = ""
 
     # Sonarr
     sonarr_url: str = ""
@@ -67,3 +120,39 @@ class Settings(BaseSettings):
         if self.recyclarr_exe_path:
             services.append("recyclarr")
         return services
+
+    def configured_instances(self) -> list[tuple[str, str, str, str]]:
+        """Return ``(key, service, url, secret)`` for every usable instance.
+
+        The flat settings come first as each service's default instance,
+        followed by the named instances from ``mcc_instances``.  *secret* is
+        the API key, or the token for Plex.
+        """
+        instances = []
+        for service in self.configured_services():
+            if service == "recyclarr":
+                continue
+            secret_field = "token" if service in _TOKEN_SERVICES else "api_key"
+            instances.append((
+                service,
+                service,
+                getattr(self, f"{service}_url"),
+                getattr(self, f"{service}_{secret_field}"),
+            ))
+        for service, extras in self.mcc_instances.items():
+            for extra in extras:
+                secret = extra.token if service in _TOKEN_SERVICES else extra.api_key
+                if not extra.name or not extra.url:
+                    continue
+                if not secret and service not in _KEYLESS_SERVICES:
+                    continue
+                instances.append(
+                    (instance_key(service, extra.name), service, extra.url, secret)
+                )
+        return instances
+
+    def rate_limit(self, key: str) -> RateLimit | None:
+        """Configured limit for instance *key*, else for its service type."""
+        return self.mcc_rate_limits.get(key) or self.mcc_rate_limits.get(
+            instance_service(key)
+        )
@@ -0,0 +1,160 @@
+"""Event-loop diagnostics — lag probe, slow-callback watchdog, stack sampler.
+
+Collectors, hub fan-out and REST handlers all share one asyncio loop, so a
+single blocking call stalls everything.  :class:`LoopLagMonitor` measures how
+late the loop wakes up and names the task that was hogging it;
+:func:`sample_stacks` produces a flamegraph-ready profile of the loop thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from types import FrameType
+
+from app.metrics import record_loop_lag
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures scheduled-vs-actual wakeup time of the running event loop.
+
+    A probe coroutine sleeps for *interval* seconds and records how much
+    later than scheduled it woke up.  A companion watchdog thread notices
+    when the probe stops ticking for longer than *slow_threshold* and logs
+    the name and stack of the task that is blocking the loop.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        slow_threshold: float = 0.1,
+    ) -> None:
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._heartbeat = time.monotonic()
+
+    async def _probe(self) -> None:
+        """Sleep, then record how late the wakeup was."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._heartbeat = time.monotonic()
+            record_loop_lag(lag)
+            if lag >= self.slow_threshold:
+                logger.warning("Event loop lagged %.0f ms", lag * 1000)
+
+    def _watch(self) -> None:
+        """Watchdog thread: report the task blocking the loop, once per stall."""
+        reported_for = 0.0
+        budget = self.interval + self.slow_threshold
+        while not self._stop.wait(self.slow_threshold / 2):
+            beat = self._heartbeat
+            stalled = time.monotonic() - beat
+            if stalled < budget or beat == reported_for:
+                continue
+            reported_for = beat
+            logger.warning(
+                "Slow callback: loop blocked for %.0f ms in task %s\n%s",
+                (stalled - self.interval) * 1000,
+                self._current_task_name(),
+                self._loop_stack(),
+            )
+
+    def _current_task_name(self) -> str:
+        """Name of the task the loop is currently running, if any."""
+        if self._loop is None:
+            return "<unknown>"
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        return task.get_name() if task is not None else "<no task>"
+
+    def _loop_stack(self) -> str:
+        """Formatted stack of the loop thread."""
+        frame = sys._current_frames().get(self._loop_thread_id or 0)
+        if frame is None:
+            return ""
+        return "".join(traceback.format_stack(frame, limit=12))
+
+    def start(self) -> None:
+        """Start the probe task and watchdog thread on the running loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._probe(), name="loop-lag-probe")
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Cancel the probe and stop the watchdog thread."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+
+# -- Stack sampling profiler -------------------------------------------------
+
+def _collapse(frame: FrameType | None) -> str:
+    """Render a frame chain root-first as ``mod:func;mod:func`` for flamegraphs."""
+    names: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        names.append(f"{module}:{code.co_qualname}")
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+async def sample_stacks(seconds: float, interval: float = 0.005) -> str:
+    """Sample the event-loop thread's stack for *seconds*.
+
+    Returns Brendan Gregg's collapsed-stack format (``a;b;c <count>`` per
+    line), ready for ``flamegraph.pl`` or speedscope.  Sampling runs in a
+    background thread so the loop keeps serving requests meanwhile.
+    """
+    target = threading.get_ident()
+    counts: Counter[str] = Counter()
+    stop = threading.Event()
+
+    def sampler() -> None:
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(target)
+            if frame is not None:
+                counts[_collapse(frame)] += 1
+
+    thread = threading.Thread(target=sampler, name="stack-sampler", daemon=True)
+    thread.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stop.set()
+        await asyncio.to_thread(thread.join)
+
+    return "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
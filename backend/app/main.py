@@ -5,12 +5,16 @@ from __future__ import annotations
 import json
 import logging
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from typing import Any
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.calendar_store import CalendarStore
 from app.config import Settings
+from app.diagnostics import LoopLagMonitor
+from app.session_history import SessionHistory
 from app.ws.hub import ConnectionHub
 
 from app.collectors.health import HealthCollector
@@ -18,8 +22,11 @@ from app.collectors.downloads import DownloadsCollector
 from app.collectors.streaming import StreamingCollector
 from app.collectors.transcoding import TranscodingCollector
 from app.collectors.calendar import CalendarCollector
+from app.collectors.push import ArrPushListener
 
-from app.routers import health, downloads, streaming, transcoding, calendar
+from app.routers import (
+    health, downloads, streaming, transcoding, calendar, debug, webhooks, stream,
+)
 from app.metrics import router as metrics_router
 
 from app.services.sonarr import SonarrClient
@@ -35,15 +42,16 @@ logger = logging.getLogger(__name__)
 
 # -- Client factory registry ------------------------------------------------
 
+# Service type -> ``factory(url, secret)``; one client is built per instance.
 CLIENT_FACTORIES: dict[str, Any] = {
-    "sonarr": lambda s: SonarrClient(s.sonarr_url, s.sonarr_api_key),
-    "radarr": lambda s: RadarrClient(s.radarr_url, s.radarr_api_key),
-    "prowlarr": lambda s: ProwlarrClient(s.prowlarr_url, s.prowlarr_api_key),
-    "bazarr": lambda s: BazarrClient(s.bazarr_url, s.bazarr_api_key),
-    "overseerr": lambda s: OverseerrClient(s.overseerr_url, s.overseerr_api_key),
-    "plex": lambda s: PlexClient(s.plex_url, s.plex_token),
-    "tdarr": lambda s: TdarrClient(s.tdarr_url, s.tdarr_api_key),
-    "sabnzbd": lambda s: SABnzbdClient(s.sabnzbd_url, s.sabnzbd_api_key),
+    "sonarr": SonarrClient,
+    "radarr": RadarrClient,
+    "prowlarr": ProwlarrClient,
+    "bazarr": BazarrClient,
+    "overseerr": OverseerrClient,
+    "plex": PlexClient,
+    "tdarr": TdarrClient,
+    "sabnzbd": SABnzbdClient,
 }
 
 # -- Collector intervals (seconds) -----------------------------------------
@@ -56,14 +64,32 @@ COLLECTOR_INTERVALS: dict[str, float] = {
     "calendar": 300,
 }
 
+# Slow reconciliation intervals used while a push source is connected.
+PUSH_FALLBACK_INTERVALS: dict[str, float] = {
+    "streaming": 60,
+    "calendar": 1800,
+}
+
 
 def _build_clients(settings: Settings) -> dict[str, Any]:
-    """Instantiate service clients for every configured service."""
+    """Instantiate a client for every configured service instance.
+
+    Clients are keyed by instance (``"sonarr"``, ``"sonarr:4k"``); each
+    client's ``service_name`` is its key, so metrics stay per instance.
+    ``mcc_rate_limits`` overrides the default rate limit per instance or
+    service type.
+    """
     clients: dict[str, Any] = {}
-    for name in settings.configured_services():
-        factory = CLIENT_FACTORIES.get(name)
+    for key, service, url, secret in settings.configured_instances():
+        factory = CLIENT_FACTORIES.get(service)
         if factory is not None:
-            clients[name] = factory(settings)
+            limit = settings.rate_limit(key)
+            if limit is not None:
+                client = factory(url, secret, rate=limit.rate, burst=limit.burst)
+            else:
+                client = factory(url, secret)
+            client.service_name = key
+            clients[key] = client
     return clients
 
 
@@ -85,35 +111,63 @@ def create_app(
         settings = Settings()
 
     hub = ConnectionHub()
+    calendar_store = CalendarStore()
+    session_history = (
+        SessionHistory(settings.mcc_history_path) if settings.mcc_history_path else None
+    )
     clients = _build_clients(settings)
     collectors: list[Any] = []
+    loop_monitor = LoopLagMonitor(
+        slow_threshold=settings.mcc_slow_callback_ms / 1000
+    )
+
+    intervals = {**COLLECTOR_INTERVALS, **settings.mcc_collector_intervals}
 
     if not skip_collectors:
         collectors = [
-            HealthCollector(hub, clients, COLLECTOR_INTERVALS["health"]),
-            DownloadsCollector(hub, clients, COLLECTOR_INTERVALS["downloads"]),
-            StreamingCollector(hub, clients, COLLECTOR_INTERVALS["streaming"]),
-            TranscodingCollector(hub, clients, COLLECTOR_INTERVALS["transcoding"]),
-            CalendarCollector(hub, clients, COLLECTOR_INTERVALS["calendar"]),
+            HealthCollector(hub, clients, intervals["health"]),
+            DownloadsCollector(hub, clients, intervals["downloads"]),
+            StreamingCollector(
+                hub, clients, intervals["streaming"],
+                push_interval=PUSH_FALLBACK_INTERVALS["streaming"],
+                history=session_history,
+            ),
+            TranscodingCollector(hub, clients, intervals["transcoding"]),
+            CalendarCollector(
+                hub, clients, intervals["calendar"],
+                push_interval=PUSH_FALLBACK_INTERVALS["calendar"],
+                store=calendar_store,
+            ),
         ]
+    collectors_by_name = {c.name: c for c in collectors}
+    push_listener = ArrPushListener(clients, collectors_by_name)
 
     @asynccontextmanager
     async def lifespan(application: FastAPI):  # noqa: ARG001
+        loop_monitor.start()
+        if session_history is not None:
+            session_history.start()
         # Start collectors
         for collector in collectors:
             collector.start()
+        if collectors:
+            push_listener.start()
         logger.info(
             "Started %d collectors for %d services",
             len(collectors),
             len(clients),
         )
         yield
-        # Stop collectors
+        # Stop push listeners and collectors
+        await push_listener.stop()
         for collector in collectors:
             await collector.stop()
         # Close all HTTP clients
         for client in clients.values():
             await client.close()
+        if session_history is not None:
+            await session_history.close()
+        await loop_monitor.stop()
         logger.info("Shutdown complete")
 
     application = FastAPI(
@@ -122,8 +176,13 @@ def create_app(
         lifespan=lifespan,
     )
 
-    # Store hub on app state so routers can access it.
+    # Store hub, settings, collectors, the calendar index and the session
+    # history (``None`` when disabled) on app state.
     application.state.hub = hub
+    application.state.settings = settings
+    application.state.collectors = collectors_by_name
+    application.state.calendar_store = calendar_store
+    application.state.session_history = session_history
 
     # CORS middleware — allow all origins for the dashboard SPA.
     application.add_middleware(
@@ -140,6 +199,9 @@ def create_app(
     application.include_router(streaming.router)
     application.include_router(transcoding.router)
     application.include_router(calendar.router)
+    application.include_router(debug.router)
+    application.include_router(webhooks.router)
+    application.include_router(stream.router)
 
     # Prometheus metrics
     application.include_router(metrics_router)
@@ -148,19 +210,55 @@ def create_app(
     @application.websocket("/ws")
     async def websocket_endpoint(ws: WebSocket):
         await ws.accept()
+        # Queues the current snapshots; the hub's writer task sends them.
         hub.connect(ws)
         try:
-            # Send current snapshots on connect
-            for msg_type in ("health", "downloads", "streaming", "transcoding", "calendar"):
-                snapshot = hub.get_snapshot(msg_type)
-                if snapshot:
-                    await ws.send_text(json.dumps(snapshot))
-            # Keep alive — wait for client messages (or disconnect)
+            # Keep alive and handle client messages until disconnect
             while True:
-                await ws.receive_text()
+                await _handle_client_message(ws, await ws.receive_text())
         except WebSocketDisconnect:
+            pass
+        finally:
             hub.disconnect(ws)
 
+    async def _handle_client_message(ws: WebSocket, raw: str) -> None:
+        """Apply a client control message.
+
+        ``{"action": "view", "type": "calendar", "from", "to", "kind"}``
+        narrows this connection's calendar pushes to one range; sending it
+        without ``from``/``to``/``kind`` restores the default snapshot.
+        """
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return
+        if not isinstance(message, dict) or message.get("action") != "view":
+            return
+        if message.get("type") != "calendar":
+            return
+        params = (message.get("from"), message.get("to"), message.get("kind"))
+        if params == (None, None, None):
+            hub.clear_view(ws, "calendar")
+            snapshot = hub.get_snapshot("calendar")
+            if snapshot:
+                hub.send(ws, "calendar", snapshot)
+            return
+        try:
+            start, end, kinds = calendar.parse_view(*params)
+        except ValueError as exc:
+            hub.send(ws, "error", {"type": "error", "data": {"detail": str(exc)}})
+            return
+
+        def render() -> dict[str, Any]:
+            return calendar.calendar_slice(calendar_store, start, end, kinds)
+
+        hub.set_view(ws, "calendar", (start, end, kinds), render)
+        hub.send(ws, "calendar", {
+            "type": "calendar",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "data": render(),
+        })
+
     return application
 
 
@@ -1,11 +1,19 @@
-"""Prometheus metrics — exposes Gauge metrics scraped from hub snapshots."""
+"""Prometheus metrics — snapshot gauges plus hot-path latency histograms."""
 
 from __future__ import annotations
 
 from typing import Any
 
 from fastapi import APIRouter, Request
-from prometheus_client import CollectorRegistry, Gauge, generate_latest
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+from app.perf import perf_stats
 
 # Use a dedicated registry so tests don't clash with the global default.
 registry = CollectorRegistry()
@@ -32,6 +40,27 @@ mcc_downloads_active = Gauge(
     registry=registry,
 )
 
+mcc_sabnzbd_speed_bytes = Gauge(
+    "mcc_sabnzbd_speed_bytes",
+    "SABnzbd download speed in bytes per second",
+    ["instance", "smoothing"],
+    registry=registry,
+)
+
+mcc_sabnzbd_remaining_bytes = Gauge(
+    "mcc_sabnzbd_remaining_bytes",
+    "Bytes left to download in the SABnzbd queue",
+    ["instance"],
+    registry=registry,
+)
+
+mcc_sabnzbd_eta_seconds = Gauge(
+    "mcc_sabnzbd_eta_seconds",
+    "Estimated seconds until the SABnzbd queue finishes (EWMA speed)",
+    ["instance"],
+    registry=registry,
+)
+
 mcc_plex_streams_active = Gauge(
     "mcc_plex_streams_active",
     "Number of active Plex streaming sessions",
@@ -56,6 +85,236 @@ mcc_tdarr_space_saved_bytes = Gauge(
     registry=registry,
 )
 
+mcc_tdarr_node_files_per_hour = Gauge(
+    "mcc_tdarr_node_files_per_hour",
+    "Files transcoded per hour by a Tdarr node (rolling window)",
+    ["instance", "node"],
+    registry=registry,
+)
+
+mcc_tdarr_node_bytes_per_hour = Gauge(
+    "mcc_tdarr_node_bytes_per_hour",
+    "Source bytes transcoded per hour by a Tdarr node (rolling window)",
+    ["instance", "node"],
+    registry=registry,
+)
+
+mcc_tdarr_node_fps = Gauge(
+    "mcc_tdarr_node_fps",
+    "Mean combined worker fps of a Tdarr node (rolling window)",
+    ["instance", "node"],
+    registry=registry,
+)
+
+_TDARR_NODE_GAUGES = {
+    "files_per_hour": mcc_tdarr_node_files_per_hour,
+    "bytes_per_hour": mcc_tdarr_node_bytes_per_hour,
+    "fps": mcc_tdarr_node_fps,
+}
+
+
+# -- Hot-path histograms ---------------------------------------------------
+
+# Buckets tuned for LAN upstreams: most calls are 5-500ms, timeouts hit 30s.
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+# Sub-millisecond buckets for in-process work (JSON encode, fan-out).
+FAST_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 1.0,
+)
+BYTES_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216,
+)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000, 2500, 10000)
+
+mcc_upstream_request_seconds = Histogram(
+    "mcc_upstream_request_seconds",
+    "Upstream HTTP request latency per attempt",
+    ["service", "endpoint", "status"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+
+mcc_upstream_response_bytes = Histogram(
+    "mcc_upstream_response_bytes",
+    "Upstream HTTP response body size",
+    ["service", "endpoint"],
+    buckets=BYTES_BUCKETS,
+    registry=registry,
+)
+
+mcc_upstream_retries = Counter(
+    "mcc_upstream_retries",
+    "Upstream requests retried after a failed attempt",
+    ["service", "endpoint"],
+    registry=registry,
+)
+
+mcc_upstream_retries_denied = Counter(
+    "mcc_upstream_retries_denied",
+    "Upstream retries skipped because the deadline or retry budget ran out",
+    ["service", "endpoint", "reason"],
+    registry=registry,
+)
+
+mcc_upstream_queue_wait_seconds = Histogram(
+    "mcc_upstream_queue_wait_seconds",
+    "Time an upstream request waited for a concurrency slot",
+    ["service", "priority"],
+    buckets=FAST_BUCKETS,
+    registry=registry,
+)
+
+mcc_upstream_hedges = Counter(
+    "mcc_upstream_hedges",
+    "Hedged upstream requests by which attempt answered first",
+    ["service", "endpoint", "winner"],
+    registry=registry,
+)
+
+mcc_upstream_throttled = Counter(
+    "mcc_upstream_throttled",
+    "Upstream 429 responses that paused a service's rate limiter",
+    ["service", "endpoint"],
+    registry=registry,
+)
+
+mcc_collector_duration_seconds = Histogram(
+    "mcc_collector_duration_seconds",
+    "Wall time of a single collector cycle",
+    ["collector"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+
+mcc_collector_errors = Counter(
+    "mcc_collector_errors",
+    "Collector cycles that raised an unhandled exception",
+    ["collector"],
+    registry=registry,
+)
+
+mcc_hub_encode_seconds = Histogram(
+    "mcc_hub_encode_seconds",
+    "Time spent JSON-encoding a broadcast message",
+    ["type"],
+    buckets=FAST_BUCKETS,
+    registry=registry,
+)
+
+mcc_hub_fanout_seconds = Histogram(
+    "mcc_hub_fanout_seconds",
+    "Time spent sending a broadcast to every connected client",
+    ["type"],
+    buckets=FAST_BUCKETS,
+    registry=registry,
+)
+
+mcc_hub_recipients = Histogram(
+    "mcc_hub_recipients",
+    "Number of clients a broadcast was sent to",
+    ["type"],
+    buckets=COUNT_BUCKETS,
+    registry=registry,
+)
+
+
+mcc_event_loop_lag_seconds = Gauge(
+    "mcc_event_loop_lag_seconds",
+    "Most recent event-loop wakeup delay (actual minus scheduled)",
+    registry=registry,
+)
+
+mcc_event_loop_lag_distribution = Histogram(
+    "mcc_event_loop_lag_distribution_seconds",
+    "Distribution of event-loop wakeup delays",
+    buckets=FAST_BUCKETS,
+    registry=registry,
+)
+
+
+def record_upstream(
+    service: str,
+    endpoint: str,
+    status: str,
+    seconds: float,
+    size: int | None = None,
+) -> None:
+    """Record one upstream request attempt."""
+    mcc_upstream_request_seconds.labels(
+        service=service, endpoint=endpoint, status=status
+    ).observe(seconds)
+    if size is not None:
+        mcc_upstream_response_bytes.labels(
+            service=service, endpoint=endpoint
+        ).observe(size)
+    perf_stats.observe("upstream_seconds", f"{service}:{endpoint}", seconds)
+    if status.startswith("2"):
+        # Hedge delays key off healthy latency only; failures and timeouts
+        # would inflate them just when the upstream is struggling.
+        perf_stats.observe("upstream_ok_seconds", f"{service}:{endpoint}", seconds)
+
+
+def record_retry(service: str, endpoint: str) -> None:
+    """Count a retry of an upstream request."""
+    mcc_upstream_retries.labels(service=service, endpoint=endpoint).inc()
+
+
+def record_retry_denied(service: str, endpoint: str, reason: str) -> None:
+    """Count a retry skipped for *reason* (``deadline`` or ``budget``)."""
+    mcc_upstream_retries_denied.labels(
+        service=service, endpoint=endpoint, reason=reason
+    ).inc()
+
+
+def record_queue_wait(service: str, priority: str, seconds: float) -> None:
+    """Record how long a request waited for its service's limiter."""
+    mcc_upstream_queue_wait_seconds.labels(
+        service=service, priority=priority
+    ).observe(seconds)
+    perf_stats.observe("upstream_queue_seconds", f"{service}:{priority}", seconds)
+
+
+def record_hedge(service: str, endpoint: str, winner: str) -> None:
+    """Count a hedged request; *winner* is ``primary`` or ``hedge``."""
+    mcc_upstream_hedges.labels(
+        service=service, endpoint=endpoint, winner=winner
+    ).inc()
+
+
+def record_throttle(service: str, endpoint: str) -> None:
+    """Count a 429 (Too Many Requests) response."""
+    mcc_upstream_throttled.labels(service=service, endpoint=endpoint).inc()
+
+
+def record_collect(collector: str, seconds: float, *, failed: bool) -> None:
+    """Record the duration (and failure) of one collector cycle."""
+    mcc_collector_duration_seconds.labels(collector=collector).observe(seconds)
+    if failed:
+        mcc_collector_errors.labels(collector=collector).inc()
+    perf_stats.observe("collect_seconds", collector, seconds)
+
+
+def record_broadcast(
+    msg_type: str, encode_s: float, fanout_s: float, recipients: int
+) -> None:
+    """Record encode time, fan-out time and recipient count of a broadcast."""
+    mcc_hub_encode_seconds.labels(type=msg_type).observe(encode_s)
+    mcc_hub_fanout_seconds.labels(type=msg_type).observe(fanout_s)
+    mcc_hub_recipients.labels(type=msg_type).observe(recipients)
+    perf_stats.observe("hub_encode_seconds", msg_type, encode_s)
+    perf_stats.observe("hub_fanout_seconds", msg_type, fanout_s)
+    perf_stats.observe("hub_recipients", msg_type, recipients)
+
+
+def record_loop_lag(seconds: float) -> None:
+    """Record one event-loop lag probe."""
+    mcc_event_loop_lag_seconds.set(seconds)
+    mcc_event_loop_lag_distribution.observe(seconds)
+    perf_stats.observe("loop_lag_seconds", "main", seconds)
+
 
 # -- Snapshot-to-gauge sync ------------------------------------------------
 
@@ -79,9 +338,26 @@ def update_metrics_from_hub(hub: Any) -> None:
     downloads = hub.get_snapshot("downloads")
     if downloads:
         data = downloads.get("data", downloads)
-        count = len(data.get("sabnzbd", {}).get("items", []))
-        count += len(data.get("sonarr_queue", []))
-        count += len(data.get("radarr_queue", []))
+        count = len(data.get("sonarr_queue", [])) + len(data.get("radarr_queue", []))
+        # Rebuild the per-instance series so removed instances disappear.
+        for gauge in (
+            mcc_sabnzbd_speed_bytes, mcc_sabnzbd_remaining_bytes, mcc_sabnzbd_eta_seconds,
+        ):
+            gauge.clear()
+        for instance, sab in (data.get("sabnzbd_instances") or {}).items():
+            count += sab.get("total_items", len(sab.get("items", [])))
+            mcc_sabnzbd_speed_bytes.labels(instance=instance, smoothing="raw").set(
+                sab.get("speed_bps", 0)
+            )
+            mcc_sabnzbd_speed_bytes.labels(instance=instance, smoothing="ewma").set(
+                sab.get("speed_ewma_bps", 0)
+            )
+            mcc_sabnzbd_remaining_bytes.labels(instance=instance).set(
+                sab.get("sizeleft_bytes", 0)
+            )
+            mcc_sabnzbd_eta_seconds.labels(instance=instance).set(
+                sab.get("eta_ewma_s") or 0
+            )
         mcc_downloads_active.set(count)
 
     # Streaming snapshot
@@ -97,6 +373,14 @@ def update_metrics_from_hub(hub: Any) -> None:
         data = transcoding.get("data", transcoding)
         mcc_tdarr_queue_size.set(data.get("queue_size", 0))
         mcc_tdarr_space_saved_bytes.set(data.get("size_diff_bytes", 0))
+        # Rebuild the per-node series so departed nodes disappear.
+        for field, gauge in _TDARR_NODE_GAUGES.items():
+            gauge.clear()
+            for node in data.get("nodes", []):
+                gauge.labels(
+                    instance=node.get("instance", "tdarr"),
+                    node=node.get("name", node.get("id", "")),
+                ).set(node.get("throughput", {}).get(field, 0))
 
 
 # -- Router ----------------------------------------------------------------
@@ -0,0 +1,109 @@
+"""Rolling latency windows — in-process percentile summaries.
+
+Prometheus histograms are great for scraping but can't answer "what is the
+p95 of this endpoint right now?" from inside the process.  This module keeps
+a bounded window of recent samples per (metric, label-key) pair so that
+debug endpoints and adaptive client logic can read live percentiles.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from collections import deque
+from typing import Any
+
+# Samples retained per window — enough for stable p99 at 5s poll cadence.
+DEFAULT_WINDOW = 1024
+
+
+class LatencyWindow:
+    """Fixed-size ring of the most recent samples for one series."""
+
+    def __init__(self, size: int = DEFAULT_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self.count = 0
+        # q -> percentile over the current samples; cleared by add()
+        self._percentiles: dict[float, float] = {}
+
+    def add(self, value: float) -> None:
+        """Record a single sample."""
+        self._samples.append(value)
+        self.count += 1
+        if self._percentiles:
+            self._percentiles.clear()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float | None:
+        """Return the *q*-th percentile (0-100) using nearest-rank, or ``None``.
+
+        Selects from the nearer tail instead of sorting the whole window,
+        and is cached until the next :meth:`add`.
+        """
+        if not self._samples:
+            return None
+        value = self._percentiles.get(q)
+        if value is None:
+            n = len(self._samples)
+            rank = max(1, math.ceil(q / 100 * n))
+            if rank > n // 2:
+                value = heapq.nlargest(n - rank + 1, self._samples)[-1]
+            else:
+                value = heapq.nsmallest(rank, self._samples)[-1]
+            self._percentiles[q] = value
+        return value
+
+    def summary(self) -> dict[str, Any]:
+        """Return count plus p50/p95/p99/max over the current window."""
+        if not self._samples:
+            return {"count": self.count, "p50": None, "p95": None, "p99": None, "max": None}
+        ordered = sorted(self._samples)
+        n = len(ordered)
+
+        def rank(q: float) -> float:
+            return ordered[max(1, math.ceil(q / 100 * n)) - 1]
+
+        return {
+            "count": self.count,
+            "p50": rank(50),
+            "p95": rank(95),
+            "p99": rank(99),
+            "max": ordered[-1],
+        }
+
+
+class PerfStats:
+    """Registry of :class:`LatencyWindow` objects keyed by metric and labels."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._window = window
+        self._series: dict[str, dict[str, LatencyWindow]] = {}
+
+    def observe(self, metric: str, key: str, value: float) -> None:
+        """Add *value* to the window for ``metric``/``key``."""
+        by_key = self._series.setdefault(metric, {})
+        win = by_key.get(key)
+        if win is None:
+            win = by_key[key] = LatencyWindow(self._window)
+        win.add(value)
+
+    def get(self, metric: str, key: str) -> LatencyWindow | None:
+        """Return the window for ``metric``/``key`` if any samples exist."""
+        return self._series.get(metric, {}).get(key)
+
+    def summary(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Return ``{metric: {key: {count, p50, p95, p99, max}}}``."""
+        return {
+            metric: {key: win.summary() for key, win in sorted(by_key.items())}
+            for metric, by_key in sorted(self._series.items())
+        }
+
+    def reset(self) -> None:
+        """Drop all recorded series."""
+        self._series.clear()
+
+
+# Process-wide instance shared by clients, collectors and the hub.
+perf_stats = PerfStats()
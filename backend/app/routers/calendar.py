@@ -1,11 +1,90 @@
-"""Calendar REST endpoint — returns latest calendar snapshot from the hub."""
+"""Calendar REST endpoint — latest snapshot, or a date range from the store."""
 
-from fastapi import APIRouter, Request
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.calendar_store import KINDS, CalendarStore
+from app.routers.longpoll import MAX_WAIT, snapshot_response
 
 router = APIRouter()
 
+# Span used when only ``from`` is given.
+DEFAULT_SPAN = timedelta(days=7)
+
+
+def parse_bound(value: str, *, end: bool) -> datetime:
+    """Parse a date or datetime; a bare ``to`` date includes that whole day."""
+    try:
+        if len(value) == 10:
+            day = date.fromisoformat(value)
+            parsed = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            return parsed + timedelta(days=1) if end else parsed
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value!r}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def parse_view(
+    start: str | None, end: str | None, kind: str | None
+) -> tuple[datetime, datetime, tuple[str, ...]]:
+    """Validate range-query parameters; raise ``ValueError`` if invalid.
+
+    *start* defaults to today (UTC) and *end* to seven days after *start*.
+    """
+    if start:
+        lo = parse_bound(start, end=False)
+    else:
+        today = datetime.now(timezone.utc).date()
+        lo = datetime(today.year, today.month, today.day, tzinfo=timezone.utc)
+    hi = parse_bound(end, end=True) if end else lo + DEFAULT_SPAN
+    if hi <= lo:
+        raise ValueError("'to' must be after 'from'")
+    if kind is None:
+        kinds = KINDS
+    elif kind in KINDS:
+        kinds = (kind,)
+    else:
+        raise ValueError(f"'type' must be one of {', '.join(KINDS)}")
+    return lo, hi, kinds
+
+
+def calendar_slice(
+    store: CalendarStore,
+    start: datetime,
+    end: datetime,
+    kinds: tuple[str, ...],
+) -> dict[str, Any]:
+    """Return the store entries for one view, plus the range it covers."""
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        **store.query(start.timestamp(), end.timestamp(), kinds),
+    }
+
 
 @router.get("/api/calendar")
-async def get_calendar(request: Request):
-    hub = request.app.state.hub
-    return hub.get_snapshot("calendar") or {"episodes": [], "movies": []}
+async def get_calendar(
+    request: Request,
+    start: str | None = Query(None, alias="from"),
+    end: str | None = Query(None, alias="to"),
+    kind: str | None = Query(None, alias="type"),
+    since: int | None = Query(None, ge=0),
+    wait: float = Query(0, ge=0, le=MAX_WAIT),
+):
+    """Return the 7-day snapshot, or any range when ``from``/``to``/``type`` is set."""
+    if start is None and end is None and kind is None:
+        return await snapshot_response(
+            request, "calendar", {"episodes": [], "movies": []}, since, wait
+        )
+    try:
+        lo, hi, kinds = parse_view(start, end, kind)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return calendar_slice(request.app.state.calendar_store, lo, hi, kinds)
@@ -0,0 +1,54 @@
+"""Debug REST endpoints — live performance summaries and on-demand profiling."""
+
+import asyncio
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from app.diagnostics import sample_stacks
+from app.perf import perf_stats
+
+router = APIRouter()
+
+_profile_lock = asyncio.Lock()
+
+
+def require_debug_token(request: Request) -> None:
+    """Reject the request unless it carries the configured debug token.
+
+    The token may be sent as an ``X-Debug-Token`` header or a ``token``
+    query parameter.  With no token configured the endpoint doesn't exist.
+    """
+    expected = request.app.state.settings.mcc_debug_token
+    if not expected:
+        raise HTTPException(status_code=404, detail="Debug profiling is disabled")
+    supplied = (
+        request.headers.get("X-Debug-Token")
+        or request.query_params.get("token", "")
+    )
+    if not hmac.compare_digest(supplied.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
+
+@router.get("/api/debug/perf")
+async def get_perf():
+    """Return p50/p95/p99 summaries for upstream, collector and hub timings."""
+    return perf_stats.summary()
+
+
+@router.get(
+    "/api/debug/profile",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_debug_token)],
+)
+async def get_profile(seconds: float = Query(default=10, gt=0, le=60)):
+    """Sample the event loop for *seconds* and return collapsed stacks."""
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    async with _profile_lock:
+        collapsed = await sample_stacks(seconds)
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'},
+    )
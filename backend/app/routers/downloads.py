@@ -1,15 +1,41 @@
-"""Downloads REST endpoint — returns latest downloads snapshot from the hub."""
+"""Downloads REST endpoint — latest snapshot, or an indexed page of queue items."""
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Query, Request
+
+from app.routers.longpoll import (
+    DEFAULT_LIMIT, MAX_LIMIT, MAX_WAIT, is_listing, listing_response,
+    snapshot_response,
+)
 
 router = APIRouter()
 
 
 @router.get("/api/downloads")
-async def get_downloads(request: Request):
-    hub = request.app.state.hub
-    return hub.get_snapshot("downloads") or {
-        "sabnzbd": {"items": []},
-        "sonarr_queue": [],
-        "radarr_queue": [],
-    }
+async def get_downloads(
+    request: Request,
+    status: str | None = None,
+    service: str | None = None,
+    q: str | None = None,
+    sort: str | None = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    since: int | None = Query(None, ge=0),
+    wait: float = Query(0, ge=0, le=MAX_WAIT),
+):
+    """Return the snapshot, or SABnzbd/Sonarr/Radarr items when filtering or paging.
+
+    The snapshot carries only the first page of each SABnzbd queue; listings
+    cover the whole queue, with slots past that page refreshed less often
+    (see :class:`~app.collectors.downloads.DownloadsCollector`).
+    """
+    filters = {"status": status, "service": service}
+    if not is_listing(request, filters):
+        return await snapshot_response(request, "downloads", {
+            "sabnzbd": {"items": []},
+            "sonarr_queue": [],
+            "radarr_queue": [],
+        }, since, wait)
+    return await listing_response(
+        request, "downloads", filters,
+        q=q, sort=sort, offset=offset, limit=limit, since=since, wait=wait,
+    )
@@ -1,11 +1,16 @@
 """Health REST endpoint — returns latest health snapshot from the hub."""
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Query, Request
+
+from app.routers.longpoll import MAX_WAIT, snapshot_response
 
 router = APIRouter()
 
 
 @router.get("/api/health")
-async def get_health(request: Request):
-    hub = request.app.state.hub
-    return hub.get_snapshot("health") or {"services": []}
+async def get_health(
+    request: Request,
+    since: int | None = Query(None, ge=0),
+    wait: float = Query(0, ge=0, le=MAX_WAIT),
+):
+    return await snapshot_response(request, "health", {"services": []}, since, wait)
@@ -0,0 +1,80 @@
+"""Shared snapshot responses: long-polling and indexed, paginated lists."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import HTTPException, Request, Response
+
+# Upper bound for ``wait`` — stays under common proxy idle timeouts.
+MAX_WAIT = 60
+
+# Page size of list queries, and the largest page a client may ask for.
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+async def snapshot_response(
+    request: Request,
+    msg_type: str,
+    default: dict[str, Any],
+    since: int | None,
+    wait: float,
+) -> Any:
+    """Return the *msg_type* snapshot, long-polling when *since* is given.
+
+    Without *since* this is the plain latest snapshot (or *default*).  With
+    it, the request parks for up to *wait* seconds until a version newer
+    than *since* is broadcast, and answers ``304 Not Modified`` if none is.
+    """
+    hub = request.app.state.hub
+    if since is None:
+        return hub.get_snapshot(msg_type) or default
+    snapshot = await hub.wait_for_snapshot(msg_type, since, wait)
+    if snapshot is None:
+        return Response(status_code=304)
+    return snapshot
+
+
+# Query parameters that turn a snapshot request into a list query.
+LIST_PARAMS = ("q", "sort", "offset", "limit")
+
+
+def is_listing(request: Request, filters: dict[str, str | None]) -> bool:
+    """Whether the request names a filter or any of :data:`LIST_PARAMS`."""
+    return any(name in request.query_params for name in (*filters, *LIST_PARAMS))
+
+
+def _split(value: str | None) -> list[str]:
+    return [v for v in (value or "").split(",") if v]
+
+
+async def listing_response(
+    request: Request,
+    msg_type: str,
+    filters: dict[str, str | None],
+    *,
+    q: str | None,
+    sort: str | None,
+    offset: int,
+    limit: int,
+    since: int | None,
+    wait: float,
+) -> Any:
+    """Return one page of *msg_type* records from the hub's index.
+
+    Each filter value is a comma-separated list of alternatives.  *since*
+    and *wait* long-poll as in :func:`snapshot_response` before the page
+    is taken.
+    """
+    hub = request.app.state.hub
+    if since is not None and await hub.wait_for_snapshot(msg_type, since, wait) is None:
+        return Response(status_code=304)
+    index = hub.get_index(msg_type)
+    try:
+        return index.query(
+            {name: _split(value) for name, value in filters.items() if value},
+            q=q, sort=sort, offset=offset, limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
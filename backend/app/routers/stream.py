@@ -0,0 +1,64 @@
+"""Server-Sent Events stream — hub snapshots for clients without WebSockets."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.ws.hub import SNAPSHOT_TYPES, ConnectionHub
+
+router = APIRouter()
+
+# Seconds between keep-alive comments so idle proxies don't drop the stream.
+KEEPALIVE_INTERVAL = 15.0
+
+
+def _parse_topics(topics: str | None) -> frozenset[str]:
+    if not topics:
+        return frozenset(SNAPSHOT_TYPES)
+    requested = frozenset(t.strip() for t in topics.split(",") if t.strip())
+    unknown = requested - set(SNAPSHOT_TYPES)
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown topics: {', '.join(sorted(unknown))}",
+        )
+    return requested
+
+
+async def _events(
+    hub: ConnectionHub, topics: frozenset[str], last_event_id: int | None
+) -> AsyncIterator[bytes]:
+    """Yield pre-encoded hub frames for *topics*, with periodic keep-alives."""
+    sub = hub.subscribe(topics, last_event_id)
+    try:
+        # Tell EventSource how long to wait before reconnecting.
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                frames = await asyncio.wait_for(sub.next(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            for frame in frames:
+                yield frame
+    finally:
+        hub.unsubscribe(sub)
+
+
+@router.get("/api/stream")
+async def stream(
+    request: Request,
+    topics: str | None = Query(None, description="Comma-separated snapshot types"),
+    last_event_id: int | None = Header(None, alias="Last-Event-ID"),
+):
+    """Stream snapshot updates as SSE; ``Last-Event-ID`` resumes after a version."""
+    hub = request.app.state.hub
+    return StreamingResponse(
+        _events(hub, _parse_topics(topics), last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
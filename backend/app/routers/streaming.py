@@ -1,15 +1,94 @@
-"""Streaming REST endpoint — returns latest streaming snapshot from the hub."""
+"""Streaming REST endpoints — latest snapshot, indexed sessions, play history."""
 
-from fastapi import APIRouter, Request
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.routers.calendar import parse_bound
+from app.routers.longpoll import (
+    DEFAULT_LIMIT, MAX_LIMIT, MAX_WAIT, is_listing, listing_response,
+    snapshot_response,
+)
 
 router = APIRouter()
 
+# History range used when ``from`` is not given: the last week.
+HISTORY_SPAN = timedelta(days=7)
+
 
 @router.get("/api/streaming")
-async def get_streaming(request: Request):
-    hub = request.app.state.hub
-    return hub.get_snapshot("streaming") or {
-        "stream_count": 0,
-        "transcode_count": 0,
-        "sessions": [],
-    }
+async def get_streaming(
+    request: Request,
+    status: str | None = None,
+    service: str | None = None,
+    user: str | None = None,
+    q: str | None = None,
+    sort: str | None = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    since: int | None = Query(None, ge=0),
+    wait: float = Query(0, ge=0, le=MAX_WAIT),
+):
+    """Return the snapshot, or Plex sessions when filtering or paging."""
+    filters = {"status": status, "service": service, "user": user}
+    if not is_listing(request, filters):
+        return await snapshot_response(request, "streaming", {
+            "stream_count": 0,
+            "transcode_count": 0,
+            "sessions": [],
+        }, since, wait)
+    return await listing_response(
+        request, "streaming", filters,
+        q=q, sort=sort, offset=offset, limit=limit, since=since, wait=wait,
+    )
+
+
+def _history(request: Request) -> Any:
+    history = request.app.state.session_history
+    if history is None:
+        raise HTTPException(status_code=404, detail="Session history is disabled")
+    return history
+
+
+def _history_range(start: str | None, end: str | None) -> tuple[float, float]:
+    """Epoch bounds for a history query; defaults to the week up to now."""
+    try:
+        hi = parse_bound(end, end=True) if end else datetime.now(timezone.utc)
+        lo = parse_bound(start, end=False) if start else hi - HISTORY_SPAN
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if hi <= lo:
+        raise HTTPException(status_code=422, detail="'to' must be after 'from'")
+    return lo.timestamp(), hi.timestamp()
+
+
+@router.get("/api/streaming/history/concurrency")
+async def get_history_concurrency(
+    request: Request,
+    start: str | None = Query(None, alias="from"),
+    end: str | None = Query(None, alias="to"),
+    bucket: str | None = None,
+):
+    """Peak concurrent streams over a range, optionally per hour or day."""
+    history = _history(request)
+    lo, hi = _history_range(start, end)
+    try:
+        result = await history.concurrency(lo, hi, bucket)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return {"from": lo, "to": hi, **result}
+
+
+@router.get("/api/streaming/history/users")
+async def get_history_users(
+    request: Request,
+    start: str | None = Query(None, alias="from"),
+    end: str | None = Query(None, alias="to"),
+):
+    """Plays, transcode ratio and watch time per user over a range."""
+    history = _history(request)
+    lo, hi = _history_range(start, end)
+    return {"from": lo, "to": hi, "users": await history.users(lo, hi)}
@@ -1,11 +1,36 @@
-"""Transcoding REST endpoint — returns latest transcoding snapshot from the hub."""
+"""Transcoding REST endpoint — latest snapshot, or an indexed page of workers."""
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Query, Request
+
+from app.routers.longpoll import (
+    DEFAULT_LIMIT, MAX_LIMIT, MAX_WAIT, is_listing, listing_response,
+    snapshot_response,
+)
 
 router = APIRouter()
 
 
 @router.get("/api/transcoding")
-async def get_transcoding(request: Request):
-    hub = request.app.state.hub
-    return hub.get_snapshot("transcoding") or {"nodes": [], "queue_size": 0}
+async def get_transcoding(
+    request: Request,
+    status: str | None = None,
+    service: str | None = None,
+    node: str | None = None,
+    q: str | None = None,
+    sort: str | None = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    since: int | None = Query(None, ge=0),
+    wait: float = Query(0, ge=0, le=MAX_WAIT),
+):
+    """Return the snapshot, or Tdarr workers when filtering or paging."""
+    filters = {"status": status, "service": service, "node": node}
+    if not is_listing(request, filters):
+        return await snapshot_response(request, "transcoding", {
+            "nodes": [],
+            "queue_size": 0,
+        }, since, wait)
+    return await listing_response(
+        request, "transcoding", filters,
+        q=q, sort=sort, offset=offset, limit=limit, since=since, wait=wait,
+    )
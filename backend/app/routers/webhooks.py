@@ -0,0 +1,168 @@
+"""Inbound webhook endpoints — trigger targeted collector refreshes.
+
+Sonarr, Radarr, Tdarr, Overseerr and Plex can all notify us on grabs,
+imports, finished transcodes or new media.  Each event is mapped to the
+snapshot types it affects and the matching collectors are asked to run
+now; their own debounce coalesces bursts into a single cycle.
+
+Sonarr/Radarr events only make the calendar refetch the days of the
+episodes or movie they carry.  Named instances add ``?instance=<name>`` to
+the webhook URL so only that instance's days are refetched.
+"""
+
+from __future__ import annotations
+
+import hmac
+import json
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+from app.collectors.calendar import event_days
+from app.config import instance_key
+
+router = APIRouter()
+
+
+# -- Payload models ------------------------------------------------------------
+
+class ArrWebhook(BaseModel):
+    """Sonarr / Radarr webhook body."""
+
+    model_config = ConfigDict(extra="allow")
+
+    eventType: str
+
+
+class OverseerrWebhook(BaseModel):
+    """Overseerr webhook body (default JSON template)."""
+
+    model_config = ConfigDict(extra="allow")
+
+    notification_type: str
+
+
+class PlexWebhook(BaseModel):
+    """Plex webhook ``payload`` form field."""
+
+    model_config = ConfigDict(extra="allow")
+
+    event: str
+
+
+class TdarrWebhook(BaseModel):
+    """Tdarr flow "Send web request" body — free-form, ``event`` optional."""
+
+    model_config = ConfigDict(extra="allow")
+
+    event: str = "transcode"
+
+
+# -- Event -> snapshot type mapping ------------------------------------------
+
+ARR_EVENTS: dict[str, tuple[str, ...]] = {
+    "Grab": ("downloads",),
+    "Download": ("downloads", "calendar"),
+    "ManualInteractionRequired": ("downloads",),
+    "EpisodeFileDelete": ("calendar",),
+    "MovieFileDelete": ("calendar",),
+    "SeriesAdd": ("calendar",),
+    "SeriesDelete": ("calendar",),
+    "MovieAdded": ("calendar",),
+    "MovieDelete": ("calendar",),
+    "Health": ("health",),
+    "HealthRestored": ("health",),
+    "ApplicationUpdate": ("health",),
+}
+
+OVERSEERR_EVENTS: dict[str, tuple[str, ...]] = {
+    "MEDIA_APPROVED": ("calendar", "downloads"),
+    "MEDIA_AUTO_APPROVED": ("calendar", "downloads"),
+    "MEDIA_AVAILABLE": ("calendar",),
+}
+
+PLEX_EVENTS: dict[str, tuple[str, ...]] = {
+    "media.play": ("streaming",),
+    "media.pause": ("streaming",),
+    "media.resume": ("streaming",),
+    "media.stop": ("streaming",),
+    "media.scrobble": ("streaming",),
+    "library.new": ("calendar",),
+}
+
+
+def _require_token(request: Request) -> None:
+    """Check the shared webhook secret when one is configured."""
+    expected = request.app.state.settings.mcc_webhook_token
+    if not expected:
+        return
+    supplied = (
+        request.headers.get("X-Webhook-Token")
+        or request.query_params.get("token", "")
+    )
+    if not hmac.compare_digest(supplied.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Invalid webhook token")
+
+
+async def _json_body(request: Request) -> Any:
+    try:
+        return await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body is not valid JSON")
+
+
+async def _parse(
+    service: str, request: Request
+) -> tuple[str, tuple[str, ...], dict[str, Any]]:
+    """Validate the payload for *service*; return (event, snapshot types, body).
+
+    The body is only kept for Sonarr/Radarr, whose events carry dates.
+    """
+    try:
+        if service in ("sonarr", "radarr"):
+            arr = ArrWebhook.model_validate(await _json_body(request))
+            return arr.eventType, ARR_EVENTS.get(arr.eventType, ()), arr.model_dump()
+        if service == "overseerr":
+            ov = OverseerrWebhook.model_validate(await _json_body(request))
+            types = OVERSEERR_EVENTS.get(ov.notification_type, ())
+            return ov.notification_type, types, {}
+        if service == "tdarr":
+            td = TdarrWebhook.model_validate(await _json_body(request))
+            return td.event, ("transcoding",), {}
+        if service == "plex":
+            # Plex posts multipart/form-data with the JSON in a "payload" field.
+            form = await request.form()
+            raw = form.get("payload")
+            if not isinstance(raw, str):
+                raise HTTPException(status_code=400, detail="Missing payload field")
+            plex = PlexWebhook.model_validate(json.loads(raw))
+            return plex.event, PLEX_EVENTS.get(plex.event, ()), {}
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors(include_url=False))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Payload is not valid JSON")
+    raise HTTPException(status_code=404, detail=f"Unknown webhook service: {service}")
+
+
+@router.post("/api/webhooks/{service}", status_code=202)
+async def receive_webhook(service: str, request: Request):
+    """Map a webhook to snapshot types and trigger those collectors now."""
+    _require_token(request)
+    event, types, body = await _parse(service, request)
+
+    collectors = request.app.state.collectors
+    refreshed = []
+    for name in types:
+        collector = collectors.get(name)
+        if collector is None:
+            continue
+        if name == "calendar" and body:
+            instance = request.query_params.get("instance", "")
+            collector.request_refresh(
+                days=event_days(body), instance=instance_key(service, instance)
+            )
+        else:
+            collector.request_refresh()
+        refreshed.append(name)
+    return {"service": service, "event": event, "refreshed": refreshed}
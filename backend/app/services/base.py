@@ -3,20 +3,72 @@
 from __future__ import annotations
 
 import asyncio
+import random
+import time
 from typing import Any
 
 import httpx
 
+from app.metrics import (
+    record_hedge, record_queue_wait, record_retry, record_retry_denied,
+    record_throttle, record_upstream,
+)
+from app.perf import perf_stats
+from app.services.budget import RatioBudget
+from app.services.deadline import DeadlineExceeded, remaining
+from app.services.limiter import PriorityLimiter, request_priority
+from app.services.ratelimit import TokenBucket, parse_retry_after
+from app.services.schema import Schema
+
+# Hedged GETs may add at most this fraction of extra requests, process-wide.
+HEDGE_RATIO = 0.05
+
+# Samples an endpoint needs before its p95 is trusted as a hedge delay.
+HEDGE_MIN_SAMPLES = 20
+
+hedge_budget = RatioBudget(HEDGE_RATIO)
+
+# Default per-client rate limit: sustained requests/second and burst size.
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 20
+
+# Longest ``Retry-After`` pause honoured before retrying a 429.
+MAX_RETRY_AFTER = 60.0
+
+# Retries may add at most this fraction of extra requests, process-wide, so
+# an outage can't multiply the load on a struggling service.
+RETRY_RATIO = 0.1
+
+retry_budget = RatioBudget(RETRY_RATIO, reserve=10.0)
+
+# Server errors worth retrying (idempotent requests only).
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
 
 class BaseClient:
-    """Async HTTP client with exponential-backoff retry on connection errors.
+    """Async HTTP client with deadline-aware, budgeted retries.
 
     Subclasses override ``_build_url`` and ``_get_headers`` to customise the
     request for a specific service (API prefix, auth headers, etc.).
+
+    At most *max_concurrency* requests are in flight per client; the rest
+    queue by :data:`~app.services.limiter.request_priority`.  Requests are
+    also paced by a :class:`~app.services.ratelimit.TokenBucket` of *rate*
+    requests/second and *burst* (``rate=0`` disables it), which backs off on
+    429 responses.
     """
 
     service_name: str = "unknown"
 
+    #: Cheapest liveness endpoint, relative to the service root rather than
+    #: the API prefix.  ``None`` means :meth:`ping` falls back to
+    #: ``get_system_status()``.
+    ping_path: str | None = None
+
+    #: Per-endpoint :class:`~app.services.schema.Schema` of the fields
+    #: callers use; responses from other endpoints are decoded in full.
+    field_specs: dict[str, Schema] = {}
+
     def __init__(
         self,
         base_url: str,
@@ -24,12 +76,24 @@ class BaseClient:
         timeout: float = 30,
         max_retries: int = 3,
         retry_base_delay: float = 0.5,
+        transport: httpx.AsyncBaseTransport | None = None,
+        max_concurrency: int = 4,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
     ) -> None:
         self._base_url = base_url.rstrip("/")
         self._timeout = timeout
         self._max_retries = max_retries
         self._retry_base_delay = retry_base_delay
+        self._transport = transport
         self._client: httpx.AsyncClient | None = None
+        self._limiter = PriorityLimiter(max_concurrency)
+        self._bucket = TokenBucket(rate, burst) if rate > 0 else None
+        # Outcome of the most recent requests (monotonic times), so health
+        # checks can count data-path traffic as proof of liveness.
+        self.last_success: float | None = None
+        self.last_failure: float | None = None
+        self.last_latency: float | None = None
 
     # -- URL / header helpers ------------------------------------------------
 
@@ -41,12 +105,34 @@ class BaseClient:
         """Return default request headers.  Override in subclasses."""
         return {"Accept": "application/json"}
 
+    def _endpoint_label(
+        self,
+        endpoint: str,
+        *,
+        params: dict[str, Any] | None = None,
+        json: Any | None = None,
+    ) -> str:
+        """Return a low-cardinality endpoint name for metrics labels."""
+        return endpoint or "/"
+
+    def _field_spec(
+        self,
+        endpoint: str,
+        *,
+        params: dict[str, Any] | None = None,
+        json: Any | None = None,
+    ) -> Schema | None:
+        """Return the schema to decode *endpoint*'s response with, if any."""
+        return self.field_specs.get(endpoint)
+
     # -- Core request machinery ----------------------------------------------
 
     def _ensure_client(self) -> httpx.AsyncClient:
         """Lazily create the underlying ``httpx.AsyncClient``."""
         if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(timeout=self._timeout)
+            self._client = httpx.AsyncClient(
+                timeout=self._timeout, transport=self._transport
+            )
         return self._client
 
     async def _request(
@@ -56,44 +142,256 @@ class BaseClient:
         *,
         params: dict[str, Any] | None = None,
         json: Any | None = None,
+        root: bool = False,
+        hedge: bool = False,
     ) -> Any:
-        """Send an HTTP request with iterative retry + exponential backoff.
+        """Send an HTTP request with iterative retry + jittered backoff.
+
+        Connection errors and 429 responses are retried for every method;
+        timeouts and 5xx responses only for GETs.  Other errors propagate
+        immediately.  Retries draw on the global :data:`retry_budget` and
+        stop once the current :mod:`~app.services.deadline` would pass.  A
+        429 pauses the client's rate limiter for ``Retry-After`` (capped at
+        :data:`MAX_RETRY_AFTER`) and the retry waits on it, so only this
+        client's requests are delayed.  Every attempt is timed and recorded
+        in the ``mcc_upstream_*`` metrics under the service and endpoint
+        label.  With *root*, *endpoint* is relative to the service root
+        instead of going through :meth:`_build_url`.  *hedge* (idempotent
+        GETs only) enables hedged attempts, see :meth:`_hedged_attempt`.
+
+        Responses are decoded with :meth:`_field_spec` where one is declared,
+        so only the fields callers use are kept.
+        """
+        schema = self._field_spec(endpoint, params=params, json=json)
+
+        try:
+            response = await self._send(
+                method, endpoint, params=params, json=json, root=root,
+                hedge=hedge and method == "GET",
+            )
+        except Exception:
+            self.last_failure = time.monotonic()
+            raise
+        self.last_success = time.monotonic()
+        if schema is None:
+            return response.json()
+        return schema.decode(response.content)
+
+    async def _attempt(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        label: str,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send one HTTP request and record its outcome and latency.
 
-        Only ``httpx.ConnectError`` triggers a retry; all other exceptions
-        propagate immediately.
+        The request first waits for a rate-limit token and a slot in the
+        client's priority limiter; that wait is recorded separately from the
+        upstream latency.  Its timeout is the client's, or whatever is left
+        of the current deadline if that is sooner.
         """
-        url = self._build_url(endpoint)
+        priority = request_priority.get()
+        queued = time.perf_counter()
+        if self._bucket is not None and not await self._bucket.acquire(remaining()):
+            raise DeadlineExceeded(
+                f"{self.service_name} {label}: rate limited past the deadline"
+            )
+        async with self._limiter.slot(priority):
+            start = time.perf_counter()
+            record_queue_wait(self.service_name, priority.name.lower(), start - queued)
+            timeout = self._timeout
+            left = remaining()
+            if left is not None:
+                if left <= 0:
+                    raise DeadlineExceeded(f"{self.service_name} {label}: deadline passed")
+                timeout = min(timeout, left)
+            try:
+                response = await client.request(method, url, timeout=timeout, **kwargs)
+            except Exception as exc:
+                record_upstream(
+                    self.service_name, label, type(exc).__name__,
+                    time.perf_counter() - start,
+                )
+                raise
+            record_upstream(
+                self.service_name, label, str(response.status_code),
+                time.perf_counter() - start, len(response.content),
+            )
+            return response
+
+    def _hedge_delay(self, label: str) -> float | None:
+        """p95 of *label*'s successful requests, or ``None`` while there's too little data."""
+        window = perf_stats.get("upstream_ok_seconds", f"{self.service_name}:{label}")
+        if window is None or len(window) < HEDGE_MIN_SAMPLES:
+            return None
+        return window.percentile(95)
+
+    async def _hedged_attempt(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        label: str,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send one request, hedging it if it outlives the endpoint's p95.
+
+        If the first request hasn't answered after the observed p95 and the
+        global :data:`hedge_budget` allows, a second identical request is
+        fired.  The first successful response wins and the other request is
+        cancelled; an error only surfaces once both have failed.  If the
+        caller is cancelled, both requests are too.
+        """
+        hedge_budget.deposit()
+        delay = self._hedge_delay(label)
+        if delay is None:
+            return await self._attempt(client, method, url, label, **kwargs)
+
+        primary = asyncio.ensure_future(
+            self._attempt(client, method, url, label, **kwargs)
+        )
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done or not hedge_budget.try_withdraw():
+            return await primary
+
+        hedge = asyncio.ensure_future(
+            self._attempt(client, method, url, label, **kwargs)
+        )
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.cancelled():
+                        error = error or asyncio.CancelledError()
+                        continue
+                    exc = task.exception()
+                    if exc is None:
+                        winner = "hedge" if task is hedge else "primary"
+                        record_hedge(self.service_name, label, winner)
+                        return task.result()
+                    error = error or exc
+            raise error  # type: ignore[misc]
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number *attempt* + 1."""
+        return random.uniform(0, self._retry_base_delay * (2 ** attempt))
+
+    def _may_retry(self, label: str, delay: float) -> bool:
+        """Whether a retry after *delay* seconds fits the deadline and budget."""
+        left = remaining()
+        if left is not None and left <= delay:
+            record_retry_denied(self.service_name, label, "deadline")
+            return False
+        if not retry_budget.try_withdraw():
+            record_retry_denied(self.service_name, label, "budget")
+            return False
+        return True
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        params: dict[str, Any] | None,
+        json: Any | None,
+        root: bool,
+        hedge: bool,
+    ) -> httpx.Response:
+        url = f"{self._base_url}/{endpoint}" if root else self._build_url(endpoint)
         headers = self._get_headers()
         client = self._ensure_client()
+        label = self._endpoint_label(endpoint, params=params, json=json)
+        send = self._hedged_attempt if hedge else self._attempt
+        idempotent = method == "GET"
 
-        last_exc: httpx.ConnectError | None = None
+        retry_budget.deposit()
+        last_exc: Exception | None = None
+        delay = 0.0
+        # Whether the next attempt waits out *delay* in the token bucket.
+        paused = False
         for attempt in range(self._max_retries):
+            if attempt:
+                if not self._may_retry(label, delay):
+                    break
+                record_retry(self.service_name, label)
+                if delay and not paused:
+                    await asyncio.sleep(delay)
+            start = time.perf_counter()
             try:
-                response = await client.request(
-                    method,
-                    url,
-                    headers=headers,
-                    params=params,
-                    json=json,
+                response = await send(
+                    client, method, url, label,
+                    headers=headers, params=params, json=json,
                 )
-                response.raise_for_status()
-                return response.json()
             except httpx.ConnectError as exc:
-                last_exc = exc
-                if attempt < self._max_retries - 1:
-                    delay = self._retry_base_delay * (2 ** attempt)
-                    await asyncio.sleep(delay)
+                last_exc, delay, paused = exc, self._backoff(attempt), False
+                continue
+            except httpx.TimeoutException as exc:
+                if not idempotent:
+                    raise
+                last_exc, delay, paused = exc, self._backoff(attempt), False
+                continue
+
+            if response.status_code == 429:
+                record_throttle(self.service_name, label)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is None:
+                    retry_after = self._backoff(attempt)
+                if self._bucket is not None:
+                    self._bucket.throttle(min(retry_after, MAX_RETRY_AFTER))
+                if retry_after > MAX_RETRY_AFTER:
+                    response.raise_for_status()
+                # With a bucket the retry waits on its pause instead of
+                # sleeping; either way the deadline check counts the wait.
+                delay, paused = retry_after, self._bucket is not None
+                last_exc = self._status_error(response)
+                continue
+            if idempotent and response.status_code in RETRY_STATUSES:
+                last_exc, delay = self._status_error(response), self._backoff(attempt)
+                paused = False
+                continue
 
-        # All retries exhausted — re-raise the last ConnectError.
+            response.raise_for_status()
+            if self._bucket is not None:
+                self._bucket.relax()
+            self.last_latency = time.perf_counter() - start
+            return response
+
+        # Out of attempts, deadline or retry budget — re-raise the last error.
         raise last_exc  # type: ignore[misc]
 
+    @staticmethod
+    def _status_error(response: httpx.Response) -> httpx.HTTPStatusError:
+        """The error ``raise_for_status()`` would raise for *response*."""
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            return exc
+        raise AssertionError("not an error response")
+
     # -- Convenience methods -------------------------------------------------
 
     async def get(
-        self, endpoint: str, *, params: dict[str, Any] | None = None
+        self,
+        endpoint: str,
+        *,
+        params: dict[str, Any] | None = None,
+        hedge: bool = False,
     ) -> Any:
-        """HTTP GET."""
-        return await self._request("GET", endpoint, params=params)
+        """HTTP GET; *hedge* opts into hedged requests on the hot path."""
+        return await self._request("GET", endpoint, params=params, hedge=hedge)
 
     async def post(self, endpoint: str, *, json: Any | None = None) -> Any:
         """HTTP POST."""
@@ -101,6 +399,13 @@ class BaseClient:
 
     # -- Health check --------------------------------------------------------
 
+    async def ping(self) -> None:
+        """Cheapest liveness probe; raises if the service is unreachable."""
+        if self.ping_path is None:
+            await self.get_system_status()  # type: ignore[attr-defined]
+            return
+        await self._request("GET", self.ping_path, root=True)
+
     async def test_connection(self) -> bool:
         """GET ``system/status``; return *True* on success, *False* otherwise."""
         try:
@@ -0,0 +1,32 @@
+"""Ratio budgets — cap extra upstream requests (hedges, retries).
+
+Every eligible request deposits *ratio* tokens and every extra request
+withdraws one, so over time extras stay below ``ratio`` of normal traffic.
+The balance is capped so a long quiet spell can't bank a burst of extras.
+"""
+
+from __future__ import annotations
+
+
+class RatioBudget:
+    """Token budget allowing extras at most *ratio* of normal requests."""
+
+    def __init__(self, ratio: float, *, reserve: float = 1.0, cap: float = 10.0) -> None:
+        self.ratio = ratio
+        self.cap = cap
+        self._balance = min(reserve, cap)
+
+    @property
+    def balance(self) -> float:
+        return self._balance
+
+    def deposit(self) -> None:
+        """Credit one normal request."""
+        self._balance = min(self._balance + self.ratio, self.cap)
+
+    def try_withdraw(self) -> bool:
+        """Spend one token on an extra request; ``False`` if none are left."""
+        if self._balance < 1:
+            return False
+        self._balance -= 1
+        return True
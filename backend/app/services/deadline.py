@@ -0,0 +1,46 @@
+"""Per-cycle deadlines for upstream requests.
+
+Collectors open a :func:`deadline` scope around each cycle; every upstream
+request made inside it sizes its timeout from the time left and stops
+retrying once that is spent, so a cycle can't outlast its interval however
+many calls it makes.  Like :data:`~app.services.limiter.request_priority`,
+the deadline travels in a context variable and is inherited by tasks the
+cycle spawns.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+#: Monotonic time by which the current task's upstream work must finish,
+#: or ``None`` for no deadline (REST handlers, webhooks).
+request_deadline: ContextVar[float | None] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The current deadline passed before an upstream request could be sent."""
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline, or ``None`` without one."""
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """Limit upstream work in this block to *seconds* (or an earlier deadline)."""
+    until = time.monotonic() + seconds
+    current = request_deadline.get()
+    token = request_deadline.set(until if current is None else min(current, until))
+    try:
+        yield
+    finally:
+        request_deadline.reset(token)
@@ -0,0 +1,85 @@
+"""Priority-aware concurrency limiting for upstream requests.
+
+Each service client owns a :class:`PriorityLimiter`.  When all its slots
+are busy, waiting requests are admitted strictly by priority (then FIFO),
+so a calendar sweep can't hold up an interactive request or the streaming
+poll.  The caller's priority travels in the :data:`request_priority`
+context variable, which collectors set for the duration of their cycle.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import AsyncIterator
+
+
+class Priority(IntEnum):
+    """Request lanes, most urgent first."""
+
+    INTERACTIVE = 0
+    REALTIME = 1
+    HEALTH = 2
+    BACKGROUND = 3
+
+
+#: Priority of upstream requests made from the current task.  Anything not
+#: running inside a collector cycle (REST handlers, webhooks) is interactive.
+request_priority: ContextVar[Priority] = ContextVar(
+    "request_priority", default=Priority.INTERACTIVE
+)
+
+
+class PriorityLimiter:
+    """Semaphore with at most *limit* holders and priority-ordered waiters."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for *_, fut in self._waiters if not fut.done())
+
+    async def acquire(self, priority: Priority) -> None:
+        """Wait for a slot; higher-priority waiters are admitted first."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        entry = (int(priority), next(self._seq), fut)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # The slot was handed over just before we were cancelled.
+                self.release()
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the best waiter if any."""
+        while self._waiters:
+            *_, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the ``async with`` block."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
@@ -2,9 +2,23 @@
 
 from __future__ import annotations
 
-from typing import Any
+import json
+from typing import Any, AsyncIterator, Callable
+from urllib.parse import urlencode
+
+from websockets.asyncio.client import connect
 
 from app.services.base import BaseClient
+from app.services.schema import Fields, Schema
+
+# Each session embeds every media stream; keep what the dashboard shows.
+SESSION_FIELDS = Fields(
+    "sessionKey", "ratingKey", "type", "title", "grandparentTitle",
+    "parentIndex", "index", "TranscodeSession",
+    User=Fields("title"),
+    Player=Fields("state"),
+    Media=[Fields(Part=[Fields("decision")])],
+)
 
 
 class PlexClient(BaseClient):
@@ -16,6 +30,12 @@ class PlexClient(BaseClient):
 
     service_name = "plex"
 
+    field_specs = {
+        "status/sessions": Schema(Fields(
+            MediaContainer=Fields("size", Metadata=[SESSION_FIELDS]),
+        )),
+    }
+
     def __init__(self, base_url: str, token: str, **kwargs: Any) -> None:
         super().__init__(base_url, **kwargs)
         self._token = token
@@ -30,12 +50,16 @@ class PlexClient(BaseClient):
         *,
         params: dict[str, Any] | None = None,
         json: Any | None = None,
+        root: bool = False,
+        hedge: bool = False,
     ) -> Any:
         """Inject the Plex token into query params before delegating."""
         if params is None:
             params = {}
         params["X-Plex-Token"] = self._token
-        return await super()._request(method, endpoint, params=params, json=json)
+        return await super()._request(
+            method, endpoint, params=params, json=json, root=root, hedge=hedge
+        )
 
     # -- Health check --------------------------------------------------------
 
@@ -54,11 +78,45 @@ class PlexClient(BaseClient):
         return await self.get("identity")
 
     async def get_sessions(self) -> list[Any]:
-        """GET /status/sessions — currently playing sessions."""
-        r = await self.get("status/sessions")
+        """GET /status/sessions — currently playing sessions (hedged)."""
+        r = await self.get("status/sessions", hedge=True)
         return r.get("MediaContainer", {}).get("Metadata", [])
 
     async def get_transcode_sessions(self) -> list[Any]:
         """GET /transcode/sessions — active transcode sessions."""
         r = await self.get("transcode/sessions")
         return r.get("MediaContainer", {}).get("TranscodeSession", [])
+
+    # -- Notification stream -------------------------------------------------
+
+    def _notifications_url(self) -> str:
+        """``ws(s)://`` URL of the ``/:/websockets/notifications`` endpoint."""
+        scheme, _, rest = self._base_url.partition("://")
+        ws_scheme = "wss" if scheme == "https" else "ws"
+        query = urlencode({"X-Plex-Token": self._token})
+        return f"{ws_scheme}://{rest}/:/websockets/notifications?{query}"
+
+    async def listen_notifications(
+        self, on_connect: Callable[[], None] | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield each ``NotificationContainer`` pushed by the server.
+
+        *on_connect* is called once the socket is open.  The generator ends
+        when the server closes the connection; connection errors propagate
+        so the caller can decide how to back off and reconnect.
+        """
+        async with connect(
+            self._notifications_url(),
+            additional_headers={"X-Plex-Token": self._token},
+            open_timeout=self._timeout,
+        ) as ws:
+            if on_connect is not None:
+                on_connect()
+            async for raw in ws:
+                try:
+                    message = json.loads(raw)
+                except ValueError:
+                    continue
+                container = message.get("NotificationContainer")
+                if isinstance(container, dict):
+                    yield container
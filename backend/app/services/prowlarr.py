@@ -12,6 +12,9 @@ class ProwlarrClient(BaseClient):
 
     service_name = "prowlarr"
 
+    # Unauthenticated, no database access — much lighter than system/status.
+    ping_path = "ping"
+
     def __init__(self, base_url: str, api_key: str, **kwargs: Any) -> None:
         super().__init__(base_url, **kwargs)
         self._api_key = api_key
@@ -2,9 +2,24 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, AsyncIterator, Callable
 
 from app.services.base import BaseClient
+from app.services.schema import Fields, Schema
+from app.services.signalr import listen_signalr
+
+QUEUE_FIELDS = Fields(
+    "page", "pageSize", "totalRecords",
+    records=[Fields(
+        "id", "movieId", "title", "status", "trackedDownloadState",
+        "size", "sizeleft", "timeleft",
+    )],
+)
+
+MOVIE_FIELDS = Fields(
+    "id", "title", "year", "digitalRelease", "physicalRelease", "inCinemas",
+    "hasFile",
+)
 
 
 class RadarrClient(BaseClient):
@@ -12,6 +27,14 @@ class RadarrClient(BaseClient):
 
     service_name = "radarr"
 
+    # Unauthenticated, no database access — much lighter than system/status.
+    ping_path = "ping"
+
+    field_specs = {
+        "queue": Schema(QUEUE_FIELDS),
+        "calendar": Schema([MOVIE_FIELDS]),
+    }
+
     def __init__(self, base_url: str, api_key: str, **kwargs: Any) -> None:
         super().__init__(base_url, **kwargs)
         self._api_key = api_key
@@ -48,3 +71,18 @@ class RadarrClient(BaseClient):
         if end is not None:
             params["end"] = end
         return await self.get("calendar", params=params or None)
+
+    # -- Push events ---------------------------------------------------------
+
+    async def listen_events(
+        self, on_connect: Callable[[], None] | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield ``{"name", "body"}`` change events from the SignalR hub."""
+        async for message in listen_signalr(
+            self._ensure_client(),
+            self._base_url,
+            self._api_key,
+            on_connect=on_connect,
+            timeout=self._timeout,
+        ):
+            yield message
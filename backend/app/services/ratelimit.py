@@ -0,0 +1,99 @@
+"""Adaptive token-bucket rate limiting for upstream requests.
+
+Each service client owns a :class:`TokenBucket`.  Requests take one token;
+tokens refill at ``rate`` per second up to ``burst``.  A 429 response pauses
+the bucket for the server's ``Retry-After`` and halves the rate, which then
+creeps back towards the configured limit with every successful response.
+Waiting is an ``asyncio.sleep`` in the requesting task only, so a throttled
+service never holds up requests to other services.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Fraction of the configured rate regained per successful response.
+RECOVERY_STEP = 0.05
+
+# Lowest rate a bucket backs off to, as a fraction of the configured rate.
+MIN_RATE_FRACTION = 1 / 16
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a ``Retry-After`` header (delta or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class TokenBucket:
+    """*rate* requests per second sustained, bursts of up to *burst*."""
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    @property
+    def blocked_for(self) -> float:
+        """Seconds left in the current ``Retry-After`` pause."""
+        return max(self._blocked_until - time.monotonic(), 0.0)
+
+    def _refill(self, now: float) -> None:
+        # _updated may lie in the future while paused; nothing refills then.
+        elapsed = max(now - self._updated, 0.0)
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = max(now, self._updated)
+
+    async def acquire(self, max_wait: float | None = None) -> bool:
+        """Wait until a token is available and take it.
+
+        Returns *False*, without waiting or taking a token, when the wait
+        would run past *max_wait* seconds.
+        """
+        give_up = None if max_wait is None else time.monotonic() + max_wait
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            wait = self._blocked_until - now
+            if wait <= 0:
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if give_up is not None and now + wait > give_up:
+                return False
+            await asyncio.sleep(wait)
+
+    def throttle(self, delay: float) -> None:
+        """Back off after a 429: pause for *delay* seconds and halve the rate."""
+        now = time.monotonic()
+        self._refill(now)
+        self._blocked_until = max(self._blocked_until, now + delay)
+        # Start refilling from empty once the pause is over.
+        self._tokens = 0.0
+        self._updated = self._blocked_until
+        self.rate = max(self.rate / 2, self.max_rate * MIN_RATE_FRACTION)
+
+    def relax(self) -> None:
+        """Credit a successful response: move the rate back towards the limit."""
+        if self.rate < self.max_rate:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
@@ -5,6 +5,16 @@ from __future__ import annotations
 from typing import Any
 
 from app.services.base import BaseClient
+from app.services.schema import Fields, Schema
+
+QUEUE_FIELDS = Fields(
+    "speed", "kbpersec", "mbleft", "sizeleft", "timeleft", "status", "paused",
+    "noofslots", "noofslots_total",
+    slots=[Fields(
+        "nzo_id", "filename", "status", "percentage", "mb", "mbleft", "size",
+        "sizeleft", "timeleft",
+    )],
+)
 
 
 class SABnzbdClient(BaseClient):
@@ -16,6 +26,9 @@ class SABnzbdClient(BaseClient):
 
     service_name = "sabnzbd"
 
+    #: Keyed by ``mode`` rather than endpoint, see :meth:`_field_spec`.
+    field_specs = {"queue": Schema(Fields(queue=QUEUE_FIELDS))}
+
     def __init__(self, base_url: str, api_key: str, **kwargs: Any) -> None:
         super().__init__(base_url, **kwargs)
         self._api_key = api_key
@@ -24,7 +37,27 @@ class SABnzbdClient(BaseClient):
         """Always resolve to ``/api`` regardless of *endpoint*."""
         return f"{self._base_url}/api"
 
-    async def _api(self, mode: str, **params: Any) -> Any:
+    def _endpoint_label(
+        self,
+        endpoint: str,
+        *,
+        params: dict[str, Any] | None = None,
+        json: Any | None = None,
+    ) -> str:
+        """Label requests by SABnzbd ``mode`` since the path never changes."""
+        return str((params or {}).get("mode", "api"))
+
+    def _field_spec(
+        self,
+        endpoint: str,
+        *,
+        params: dict[str, Any] | None = None,
+        json: Any | None = None,
+    ) -> Schema | None:
+        """Pick the schema by SABnzbd ``mode``, like the metrics label."""
+        return self.field_specs.get(self._endpoint_label(endpoint, params=params))
+
+    async def _api(self, mode: str, *, hedge: bool = False, **params: Any) -> Any:
         """Execute a SABnzbd API call for the given *mode*."""
         query: dict[str, Any] = {
             "mode": mode,
@@ -32,7 +65,7 @@ class SABnzbdClient(BaseClient):
             "output": "json",
             **params,
         }
-        return await self.get("", params=query)
+        return await self.get("", params=query, hedge=hedge)
 
     # -- Health check --------------------------------------------------------
 
@@ -50,9 +83,33 @@ class SABnzbdClient(BaseClient):
         """Version check (fullstatus was removed in SABnzbd 4.x)."""
         return await self._api("version")
 
-    async def get_queue(self) -> Any:
-        """Current download queue."""
-        return await self._api("queue")
+    async def get_queue(
+        self,
+        start: int | None = None,
+        limit: int | None = None,
+        *,
+        aggregates_only: bool = False,
+        hedge: bool = True,
+    ) -> Any:
+        """Current download queue.
+
+        *start*/*limit* page through the slot list.  With *aggregates_only*
+        the queue-level totals (speed, size left, time left, slot count)
+        are returned with an empty ``slots`` list.  Pass ``hedge=False`` for
+        large pages: they outlast the small-page p95 hedging keys off.
+        """
+        params: dict[str, Any] = {}
+        if start is not None:
+            params["start"] = start
+        if aggregates_only:
+            # SABnzbd treats limit=0 as "everything"; 1 is the smallest page.
+            params["limit"] = 1
+        elif limit is not None:
+            params["limit"] = limit
+        result = await self._api("queue", hedge=hedge, **params)
+        if aggregates_only and isinstance(result.get("queue"), dict):
+            result["queue"]["slots"] = []
+        return result
 
     async def get_version(self) -> Any:
         """SABnzbd version string."""
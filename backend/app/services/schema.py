@@ -0,0 +1,118 @@
+"""Declarative field specs for decoding only the parts of a response we use.
+
+Upstream payloads carry far more than the dashboard reads: every Plex
+session embeds a dozen media streams, calendar entries repeat whole series
+objects, Tdarr rows hold full probe results.  A client declares, per
+endpoint, the fields its callers need::
+
+    SESSIONS = Schema(Fields(MediaContainer=Fields(
+        Metadata=[Fields("sessionKey", "title", User=Fields("title"))],
+    )))
+
+Positional names are kept whole, keyword arguments narrow a nested object,
+``[spec]`` applies *spec* to each item of an array and :class:`Each` to each
+value of an object keyed by id.  Everything else is dropped.
+
+With the optional ``msgspec`` package (``pip install .[fast]``) the response
+is decoded straight into generated structs, skipping unwanted subtrees
+without ever building them.  Without it, or when a payload doesn't match
+the expected shape, it is parsed with :mod:`json` and then projected.  Either
+way callers get the same plain dicts and lists.
+"""
+
+from __future__ import annotations
+
+import json
+from itertools import count
+from typing import Any, Union
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - exercised when msgspec is absent
+    msgspec = None  # type: ignore[assignment]
+
+_struct_ids = count()
+
+
+class Fields:
+    """The wanted fields of a JSON object; see the module docstring."""
+
+    __slots__ = ("fields",)
+
+    def __init__(self, *names: str, **nested: Spec) -> None:
+        self.fields: dict[str, Spec | None] = {name: None for name in names}
+        self.fields.update(nested)
+
+    def __repr__(self) -> str:
+        return f"Fields({', '.join(self.fields)})"
+
+
+class Each:
+    """Apply *spec* to every value of an object with dynamic keys."""
+
+    __slots__ = ("spec",)
+
+    def __init__(self, spec: Spec) -> None:
+        self.spec = spec
+
+
+#: A :class:`Fields`, a one-item list of a spec, or an :class:`Each`.
+Spec = Union[Fields, Each, list]
+
+
+def project(value: Any, spec: Spec) -> Any:
+    """Keep only the parts of an already-parsed *value* named by *spec*.
+
+    Values whose type doesn't match the spec are returned unchanged.
+    """
+    if isinstance(spec, Fields):
+        if not isinstance(value, dict):
+            return value
+        out = {}
+        for name, sub in spec.fields.items():
+            if name in value:
+                item = value[name]
+                out[name] = item if sub is None else project(item, sub)
+        return out
+    if isinstance(spec, Each):
+        if not isinstance(value, dict):
+            return value
+        return {key: project(item, spec.spec) for key, item in value.items()}
+    if not isinstance(value, list):
+        return value
+    return [project(item, spec[0]) for item in value]
+
+
+def _compile(spec: Spec) -> Any:
+    """msgspec type equivalent to *spec*; absent fields decode as ``UNSET``."""
+    if isinstance(spec, Fields):
+        attrs = []
+        rename = {}
+        for i, (name, sub) in enumerate(spec.fields.items()):
+            rename[f"f{i}"] = name
+            kind = Any if sub is None else Union[_compile(sub), None]
+            attrs.append((f"f{i}", Union[kind, msgspec.UnsetType], msgspec.UNSET))
+        return msgspec.defstruct(f"Fields{next(_struct_ids)}", attrs, rename=rename)
+    if isinstance(spec, Each):
+        return dict[str, _compile(spec.spec)]
+    return list[_compile(spec[0])]
+
+
+class Schema:
+    """A compiled field spec for one endpoint's response body."""
+
+    def __init__(self, spec: Spec) -> None:
+        self.spec = spec
+        self._decoder = (
+            msgspec.json.Decoder(_compile(spec)) if msgspec is not None else None
+        )
+
+    def decode(self, content: bytes) -> Any:
+        """Parse *content*, keeping only the fields named by the spec."""
+        if self._decoder is not None:
+            try:
+                return msgspec.to_builtins(self._decoder.decode(content))
+            except msgspec.DecodeError:
+                # Unexpected shape (or invalid JSON, which json reports alike).
+                pass
+        return project(json.loads(content), self.spec)
@@ -0,0 +1,95 @@
+"""Minimal SignalR (ASP.NET Core, JSON protocol) client for *arr push events.
+
+Sonarr and Radarr broadcast resource changes — queue updates, commands,
+episode/movie changes — over a SignalR hub at ``/signalr/messages``.  Only
+the receive side is implemented: negotiate, handshake, then yield every
+``receiveMessage`` invocation and answer pings.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncIterator, Callable
+from urllib.parse import urlencode
+
+import httpx
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosedOK
+
+# Every SignalR JSON-protocol frame is terminated by this character.
+RECORD_SEPARATOR = "\x1e"
+
+# Hub message types (see the SignalR hub protocol spec).
+INVOCATION = 1
+PING = 6
+CLOSE = 7
+
+
+class SignalRError(Exception):
+    """The hub rejected the handshake or closed with an error."""
+
+
+def _frames(raw: str | bytes) -> list[dict[str, Any]]:
+    """Split a websocket message into decoded hub frames."""
+    if isinstance(raw, bytes):
+        raw = raw.decode()
+    return [json.loads(part) for part in raw.split(RECORD_SEPARATOR) if part]
+
+
+async def listen_signalr(
+    http: httpx.AsyncClient,
+    base_url: str,
+    api_key: str,
+    *,
+    hub_path: str = "signalr/messages",
+    on_connect: Callable[[], None] | None = None,
+    timeout: float = 30,
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield ``{"name": ..., "body": {...}}`` messages from an *arr hub.
+
+    *http* is used for the negotiate call so it shares the service
+    client's connection pool.  The generator ends when the hub closes the
+    connection; errors propagate to the caller for reconnect handling.
+    """
+    negotiate = await http.post(
+        f"{base_url}/{hub_path}/negotiate",
+        params={"negotiateVersion": 1},
+        headers={"X-Api-Key": api_key},
+    )
+    negotiate.raise_for_status()
+    info = negotiate.json()
+    token = info.get("connectionToken") or info.get("connectionId", "")
+
+    scheme, _, rest = base_url.partition("://")
+    ws_scheme = "wss" if scheme == "https" else "ws"
+    query = urlencode({"id": token, "access_token": api_key})
+    url = f"{ws_scheme}://{rest}/{hub_path}?{query}"
+
+    async with connect(
+        url, additional_headers={"X-Api-Key": api_key}, open_timeout=timeout
+    ) as ws:
+        await ws.send(json.dumps({"protocol": "json", "version": 1}) + RECORD_SEPARATOR)
+        frames = _frames(await ws.recv())
+        handshake = frames.pop(0) if frames else {}
+        if handshake.get("error"):
+            raise SignalRError(handshake["error"])
+        if on_connect is not None:
+            on_connect()
+
+        while True:
+            for frame in frames:
+                kind = frame.get("type")
+                if kind == PING:
+                    await ws.send(json.dumps({"type": PING}) + RECORD_SEPARATOR)
+                elif kind == CLOSE:
+                    if frame.get("error"):
+                        raise SignalRError(frame["error"])
+                    return
+                elif kind == INVOCATION and frame.get("target") == "receiveMessage":
+                    for arg in frame.get("arguments", []):
+                        if isinstance(arg, dict) and "name" in arg:
+                            yield arg
+            try:
+                frames = _frames(await ws.recv())
+            except ConnectionClosedOK:
+                return
@@ -2,9 +2,27 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, AsyncIterator, Callable
 
 from app.services.base import BaseClient
+from app.services.schema import Fields, Schema
+from app.services.signalr import listen_signalr
+
+QUEUE_FIELDS = Fields(
+    "page", "pageSize", "totalRecords",
+    records=[Fields(
+        "id", "seriesId", "episodeId", "title", "status", "trackedDownloadState",
+        "size", "sizeleft", "timeleft",
+    )],
+)
+
+EPISODE_FIELDS = Fields(
+    "id", "seriesId", "seriesTitle", "title", "airDate", "airDateUtc",
+    "seasonNumber", "episodeNumber", "hasFile",
+    series=Fields("id", "title"),
+)
+
+SERIES_FIELDS = Fields("id", "title", "year", "tvdbId", "titleSlug")
 
 
 class SonarrClient(BaseClient):
@@ -12,6 +30,15 @@ class SonarrClient(BaseClient):
 
     service_name = "sonarr"
 
+    # Unauthenticated, no database access — much lighter than system/status.
+    ping_path = "ping"
+
+    field_specs = {
+        "queue": Schema(QUEUE_FIELDS),
+        "calendar": Schema([EPISODE_FIELDS]),
+        "series": Schema([SERIES_FIELDS]),
+    }
+
     def __init__(self, base_url: str, api_key: str, **kwargs: Any) -> None:
         super().__init__(base_url, **kwargs)
         self._api_key = api_key
@@ -39,12 +66,38 @@ class SonarrClient(BaseClient):
         )
 
     async def get_calendar(
-        self, start: str | None = None, end: str | None = None
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        include_series: bool = True,
     ) -> Any:
-        """GET calendar with optional date range."""
-        params: dict[str, Any] = {"includeSeries": "true"}
+        """GET calendar with optional date range.
+
+        Pass ``include_series=False`` to skip the embedded series objects
+        and resolve titles from :meth:`get_series` instead.
+        """
+        params: dict[str, Any] = {"includeSeries": str(include_series).lower()}
         if start is not None:
             params["start"] = start
         if end is not None:
             params["end"] = end
         return await self.get("calendar", params=params)
+
+    async def get_series(self) -> Any:
+        """GET series (all series, used for the seriesId -> title cache)."""
+        return await self.get("series")
+
+    # -- Push events ---------------------------------------------------------
+
+    async def listen_events(
+        self, on_connect: Callable[[], None] | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield ``{"name", "body"}`` change events from the SignalR hub."""
+        async for message in listen_signalr(
+            self._ensure_client(),
+            self._base_url,
+            self._api_key,
+            on_connect=on_connect,
+            timeout=self._timeout,
+        ):
+            yield message
@@ -5,6 +5,17 @@ from __future__ import annotations
 from typing import Any
 
 from app.services.base import BaseClient
+from app.services.schema import Each, Fields, Schema
+
+# Staged rows carry full ffprobe output; only their count is shown.
+STAGED_FIELDS = Fields("_id")
+
+NODE_FIELDS = Fields("nodeName", workers=Each(Fields(
+    "file", "status", "workerType", "percentage", "fps", "ETA",
+    "sourcefileSizeInGbytes",
+)))
+
+STATISTICS_FIELDS = Fields("totalFileCount", "totalTranscodeCount", "sizeDiff")
 
 
 class TdarrClient(BaseClient):
@@ -16,6 +27,13 @@ class TdarrClient(BaseClient):
 
     service_name = "tdarr"
 
+    #: Keyed by ``cruddb`` label, see :meth:`_field_spec`.
+    field_specs = {
+        "cruddb/NodeJSONDB": Schema(Each(NODE_FIELDS)),
+        "cruddb/StagedJSONDB": Schema([STAGED_FIELDS]),
+        "cruddb/StatisticsJSONDB": Schema(STATISTICS_FIELDS),
+    }
+
     def __init__(self, base_url: str, api_key: str = "", **kwargs: Any) -> None:
         super().__init__(base_url, **kwargs)
         self._api_key = api_key
@@ -29,6 +47,30 @@ class TdarrClient(BaseClient):
             headers["x-api-key"] = self._api_key
         return headers
 
+    def _endpoint_label(
+        self,
+        endpoint: str,
+        *,
+        params: dict[str, Any] | None = None,
+        json: Any | None = None,
+    ) -> str:
+        """Label ``cruddb`` calls by collection so each read is tracked apart."""
+        if endpoint == "cruddb" and isinstance(json, dict):
+            collection = json.get("data", {}).get("collection")
+            if collection:
+                return f"cruddb/{collection}"
+        return endpoint
+
+    def _field_spec(
+        self,
+        endpoint: str,
+        *,
+        params: dict[str, Any] | None = None,
+        json: Any | None = None,
+    ) -> Schema | None:
+        """Pick the schema by ``cruddb`` collection, like the metrics label."""
+        return self.field_specs.get(self._endpoint_label(endpoint, json=json))
+
     # -- Internal helpers ----------------------------------------------------
 
     async def _cruddb(self, collection: str, mode: str) -> Any:
@@ -0,0 +1,383 @@
+"""Durable Plex session history — one row per play in a local SQLite file.
+
+The streaming collector hands every session list it publishes to
+:meth:`SessionHistory.observe`, which diffs it against the plays it has open:
+new sessions start a play, vanished ones stop it.  A session that comes
+back within :data:`STOP_GRACE` seconds (a failed poll, a reconnect) keeps
+its play, and a stopped play ends when the session was first missed.
+
+Rows are compact: users, titles and instances are stored as integer ids
+into a ``names`` dictionary, times as epoch seconds and the playback
+decision as a 0/1 flag.  Writes are buffered and flushed in one transaction
+every :data:`FLUSH_INTERVAL` seconds (or :data:`FLUSH_BATCH` operations) on
+a worker thread, so the event loop never waits on the disk.  Plays left
+open by a shutdown are closed at the last flush time on the next start.
+
+Queries (concurrency peaks, per-user totals) only read plays overlapping
+the requested range, straight from a covering index on start time, so they
+stay in the millisecond range over months of history.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Seconds between batched writes, and pending operations that force one.
+FLUSH_INTERVAL = 5.0
+FLUSH_BATCH = 500
+
+# Seconds a session may be missing before its play is considered stopped.
+STOP_GRACE = 90.0
+
+# Bucket widths accepted by :meth:`SessionHistory.concurrency`.
+BUCKETS: dict[str, int] = {"hour": 3600, "day": 86400}
+
+# ``names.kind`` values.
+_INSTANCE, _USER, _TITLE = 0, 1, 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS names (
+    id INTEGER PRIMARY KEY,
+    kind INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (kind, name)
+);
+CREATE TABLE IF NOT EXISTS plays (
+    id INTEGER PRIMARY KEY,
+    instance INTEGER NOT NULL,
+    user INTEGER NOT NULL,
+    title INTEGER NOT NULL,
+    transcode INTEGER NOT NULL DEFAULT 0,
+    started INTEGER NOT NULL,
+    stopped INTEGER
+);
+-- Covers the range queries, so they never touch the table itself.
+CREATE INDEX IF NOT EXISTS plays_range ON plays (started, stopped, user, transcode);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+"""
+
+
+@dataclass
+class _Play:
+    id: int
+    user: str
+    title: str
+    transcode: bool
+    started: int
+    missing_since: float | None = None
+
+
+def _play_title(session: dict[str, Any]) -> str:
+    """Group episodes under their show; movies and tracks by their own title."""
+    return session.get("grandparentTitle") or session.get("title") or ""
+
+
+class SessionHistory:
+    """Session start/stop log in a SQLite database at *path*."""
+
+    def __init__(self, path: str | Path) -> None:
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db_lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        # (instance, sessionKey) -> open play
+        self._open: dict[tuple[str, str], _Play] = {}
+        # Buffered writes: new names, new plays, transcode flags, stops.
+        self._names: list[tuple[int, int, str]] = []
+        self._starts: list[tuple[int, int, int, int, int, int]] = []
+        self._transcodes: list[tuple[int]] = []
+        self._stops: list[tuple[int, int]] = []
+        with self._db_lock:
+            self._db.executescript(_SCHEMA)
+            self._ids = {
+                (kind, name): id_
+                for id_, kind, name in self._db.execute("SELECT id, kind, name FROM names")
+            }
+            self._next_name = 1 + max(self._ids.values(), default=0)
+            (last_play,) = self._db.execute("SELECT MAX(id) FROM plays").fetchone()
+            self._next_play = (last_play or 0) + 1
+            self._recover()
+            # Longest play so far bounds how far back range queries look.
+            (longest,) = self._db.execute(
+                "SELECT MAX(stopped - started) FROM plays"
+            ).fetchone()
+            self._longest = longest or 0
+
+    def _recover(self) -> None:
+        """Close plays left open by the previous run at its last flush."""
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'flushed'").fetchone()
+        if row is not None:
+            self._db.execute(
+                "UPDATE plays SET stopped = MAX(started, ?) WHERE stopped IS NULL",
+                row,
+            )
+            self._db.commit()
+
+    @property
+    def pending(self) -> int:
+        """Buffered write operations."""
+        return (
+            len(self._names) + len(self._starts)
+            + len(self._transcodes) + len(self._stops)
+        )
+
+    def _name_id(self, kind: int, name: str) -> int:
+        key = (kind, name)
+        id_ = self._ids.get(key)
+        if id_ is None:
+            id_ = self._ids[key] = self._next_name
+            self._next_name += 1
+            self._names.append((id_, kind, name))
+        return id_
+
+    # -- Recording -----------------------------------------------------------
+
+    def observe(self, sessions: Iterable[dict[str, Any]], now: float | None = None) -> None:
+        """Record starts and stops implied by the current *sessions* list."""
+        now = time.time() if now is None else now
+        seen: dict[tuple[str, str], dict[str, Any]] = {}
+        for i, session in enumerate(sessions):
+            key = session.get("sessionKey")
+            instance = session.get("instance", "plex")
+            seen[(instance, str(key) if key is not None else f"#{i}")] = session
+
+        for key, play in list(self._open.items()):
+            session = seen.get(key)
+            if session is not None and (
+                session.get("user", "") != play.user or _play_title(session) != play.title
+            ):
+                # Plex reused the session key for a different play.
+                self._stop(key, now)
+            elif session is None:
+                if play.missing_since is None:
+                    play.missing_since = now
+                elif now - play.missing_since > STOP_GRACE:
+                    self._stop(key, play.missing_since)
+            else:
+                play.missing_since = None
+
+        for key, session in seen.items():
+            transcode = session.get("decision") == "transcode"
+            play = self._open.get(key)
+            if play is None:
+                self._start(key, session, transcode, now)
+            elif transcode and not play.transcode:
+                play.transcode = True
+                self._transcodes.append((play.id,))
+
+        if self.pending >= FLUSH_BATCH:
+            self._wake.set()
+
+    def _start(
+        self, key: tuple[str, str], session: dict[str, Any], transcode: bool, now: float
+    ) -> None:
+        play = _Play(
+            self._next_play, session.get("user", ""), _play_title(session),
+            transcode, int(now),
+        )
+        self._next_play += 1
+        self._open[key] = play
+        self._starts.append((
+            play.id,
+            self._name_id(_INSTANCE, key[0]),
+            self._name_id(_USER, play.user),
+            self._name_id(_TITLE, play.title),
+            int(transcode),
+            play.started,
+        ))
+
+    def _stop(self, key: tuple[str, str], at: float) -> None:
+        play = self._open.pop(key)
+        self._stops.append((int(at), play.id))
+
+    # -- Writing -------------------------------------------------------------
+
+    def _write(
+        self,
+        names: list[tuple[int, int, str]],
+        starts: list[tuple[int, int, int, int, int, int]],
+        transcodes: list[tuple[int]],
+        stops: list[tuple[int, int]],
+        flushed: int,
+    ) -> None:
+        with self._db_lock, self._db:
+            self._db.executemany("INSERT INTO names VALUES (?, ?, ?)", names)
+            self._db.executemany(
+                "INSERT INTO plays (id, instance, user, title, transcode, started)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                starts,
+            )
+            self._db.executemany("UPDATE plays SET transcode = 1 WHERE id = ?", transcodes)
+            self._db.executemany(
+                "UPDATE plays SET stopped = MAX(started, ?) WHERE id = ?", stops
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('flushed', ?)", (flushed,)
+            )
+            if stops:
+                (longest,) = self._db.execute(
+                    "SELECT MAX(stopped - started) FROM plays WHERE id IN (%s)"
+                    % ",".join("?" * len(stops)),
+                    [play_id for _, play_id in stops],
+                ).fetchone()
+                self._longest = max(self._longest, longest or 0)
+
+    async def flush(self) -> None:
+        """Write buffered operations in one transaction on a worker thread.
+
+        A failed write rolls back and its batch goes back in front of
+        anything buffered since, so the next flush retries it.
+        """
+        async with self._flush_lock:
+            batch = (self._names, self._starts, self._transcodes, self._stops)
+            self._names, self._starts, self._transcodes, self._stops = [], [], [], []
+            try:
+                await asyncio.to_thread(self._write, *batch, int(time.time()))
+            except Exception:
+                self._names = batch[0] + self._names
+                self._starts = batch[1] + self._starts
+                self._transcodes = batch[2] + self._transcodes
+                self._stops = batch[3] + self._stops
+                raise
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to write session history")
+
+    def start(self) -> None:
+        """Start the periodic flush task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop flushing, write what is buffered and close the database."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        with self._db_lock:
+            self._db.close()
+
+    # -- Queries -------------------------------------------------------------
+
+    def _earliest(self, start: int) -> int:
+        """Earliest start time of a play that may still run at *start*."""
+        return min(
+            [start - self._longest, *(play.started for play in self._open.values())]
+        )
+
+    def _concurrency(
+        self, start: int, end: int, bucket: int | None, now: int
+    ) -> dict[str, Any]:
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT started, COALESCE(stopped, :now) FROM plays"
+                " WHERE started >= :earliest AND started < :end"
+                " AND COALESCE(stopped, :now) > :start",
+                {"start": start, "end": end, "now": now,
+                 "earliest": self._earliest(start)},
+            ).fetchall()
+        events: list[tuple[int, int]] = []
+        for started, stopped in rows:
+            events.append((max(started, start), 1))
+            if stopped < end:
+                events.append((stopped, -1))
+        # Stops sort before starts at the same second, so back-to-back
+        # plays don't count as overlapping.
+        events.sort()
+
+        live = peak = 0
+        peak_at = start
+        buckets: list[dict[str, int]] = []
+        bucket_peak = 0
+        edge = start + bucket if bucket else end
+        for at, delta in events:
+            while bucket and at >= edge:
+                buckets.append({"start": edge - bucket, "peak": bucket_peak})
+                bucket_peak = live
+                edge += bucket
+            live += delta
+            if live > peak:
+                peak, peak_at = live, at
+            bucket_peak = max(bucket_peak, live)
+
+        result: dict[str, Any] = {"peak": peak, "peak_at": peak_at, "plays": len(rows)}
+        if bucket:
+            while edge - bucket < end:
+                buckets.append({"start": edge - bucket, "peak": bucket_peak})
+                bucket_peak = live
+                edge += bucket
+            result["buckets"] = buckets
+        return result
+
+    async def concurrency(
+        self, start: float, end: float, bucket: str | None = None
+    ) -> dict[str, Any]:
+        """Peak concurrent streams in ``[start, end)``, optionally per bucket.
+
+        Returns ``peak``, when it was first reached (``peak_at``, epoch
+        seconds), the number of ``plays`` overlapping the range and, with a
+        *bucket* of ``"hour"`` or ``"day"``, the peak within each bucket.
+        """
+        if bucket is not None and bucket not in BUCKETS:
+            raise ValueError(f"'bucket' must be one of {', '.join(BUCKETS)}")
+        await self.flush()
+        return await asyncio.to_thread(
+            self._concurrency, int(start), int(end),
+            BUCKETS[bucket] if bucket else None, int(time.time()),
+        )
+
+    def _users(self, start: int, end: int, now: int) -> list[dict[str, Any]]:
+        with self._db_lock:
+            rows = self._db.execute(
+                """
+                SELECT n.name, COUNT(*), SUM(p.transcode),
+                       SUM(MIN(COALESCE(p.stopped, :now), :end) - MAX(p.started, :start))
+                FROM plays p JOIN names n ON n.id = p.user
+                WHERE p.started >= :earliest AND p.started < :end
+                  AND COALESCE(p.stopped, :now) > :start
+                GROUP BY p.user
+                ORDER BY 4 DESC
+                """,
+                {"start": start, "end": end, "now": now,
+                 "earliest": self._earliest(start)},
+            ).fetchall()
+        return [
+            {
+                "user": name,
+                "plays": plays,
+                "transcodes": transcodes,
+                "transcode_ratio": transcodes / plays,
+                "watch_seconds": seconds,
+            }
+            for name, plays, transcodes, seconds in rows
+        ]
+
+    async def users(self, start: float, end: float) -> list[dict[str, Any]]:
+        """Plays, transcodes and watch time per user in ``[start, end)``."""
+        await self.flush()
+        return await asyncio.to_thread(self._users, int(start), int(end), int(time.time()))
@@ -2,63 +2,295 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import time
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable, Hashable
+
+from app.metrics import record_broadcast
+from app.ws.index import SnapshotIndex, default_indexes
 
 logger = logging.getLogger(__name__)
 
+#: Snapshot message types, in the order they are replayed to new clients.
+SNAPSHOT_TYPES: tuple[str, ...] = (
+    "health", "downloads", "streaming", "transcoding", "calendar",
+)
+
+
+def sse_frame(message: dict[str, Any], payload: str) -> bytes:
+    """Encode one hub message as a Server-Sent Events frame."""
+    return (
+        f"id: {message['version']}\nevent: {message['type']}\n"
+        f"data: {payload}\n\n"
+    ).encode()
+
+
+class Subscription:
+    """Per-listener mailbox of pre-encoded frames, latest-wins per topic.
+
+    Snapshots supersede each other, so a slow listener only ever holds one
+    pending frame per topic instead of a growing backlog.  Frames are SSE
+    ``bytes`` for :meth:`ConnectionHub.subscribe` listeners and JSON text
+    for WebSocket connections.
+    """
+
+    def __init__(self, topics: frozenset[str]) -> None:
+        self.topics = topics
+        self._pending: dict[str, Any] = {}
+        self._ready = asyncio.Event()
+
+    def offer(self, topic: str, frame: Any) -> None:
+        """Queue *frame*, replacing any undelivered frame for *topic*."""
+        self._pending.pop(topic, None)
+        self._pending[topic] = frame
+        self._ready.set()
+
+    async def next(self) -> list[Any]:
+        """Wait for and return every pending frame, oldest topic first."""
+        await self._ready.wait()
+        frames = list(self._pending.values())
+        self._pending.clear()
+        self._ready.clear()
+        return frames
+
 
 class ConnectionHub:
     """Manages WebSocket connections and broadcasts messages to all clients.
 
     Also stores the latest snapshot per message type so REST endpoints can
     serve the most recent data without waiting for the next poll cycle.
+
+    Every WebSocket connection gets a :class:`Subscription` mailbox and a
+    writer task that drains it, so a broadcast only drops the encoded
+    payload into each mailbox and a stalled socket never holds up the
+    others; its mailbox keeps just the latest message per type.
+
+    A connection can register a *view* for a message type (see
+    :meth:`set_view`); it then receives its own rendered slice instead of
+    the full payload.  Views with the same key share one render/encode per
+    broadcast.
+
+    Every broadcast gets a new, increasing ``version`` so pollers can ask
+    for "anything newer than N" and park on :meth:`wait_for_snapshot`
+    until it arrives.
+
+    Besides WebSockets, listeners can :meth:`subscribe` to a set of topics
+    (used by the SSE stream).  Each broadcast is encoded into an SSE frame
+    once and the same bytes are dropped into every matching mailbox.
+
+    Snapshot types with a :class:`~app.ws.index.SnapshotIndex` (*indexes*,
+    :func:`~app.ws.index.default_indexes` by default) have it updated on
+    every broadcast; see :meth:`get_index`.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, indexes: dict[str, SnapshotIndex] | None = None) -> None:
         self.connections: list[Any] = []
+        # ws -> (mailbox, writer task)
+        self._writers: dict[Any, tuple[Subscription, asyncio.Task[None]]] = {}
         self._snapshots: dict[str, dict[str, Any]] = {}
+        self._version = 0
+        self._changed = asyncio.Condition()
+        self._subscribers: set[Subscription] = set()
+        # msg_type -> SSE frame of the current snapshot
+        self._frames: dict[str, bytes] = {}
+        # msg_type -> JSON text of the current snapshot
+        self._payloads: dict[str, str] = {}
+        # ws -> msg_type -> (view key, render function)
+        self._views: dict[Any, dict[str, tuple[Hashable, Callable[[], Any]]]] = {}
+        self._indexes = default_indexes() if indexes is None else indexes
 
     def connect(self, ws: Any) -> None:
-        """Register a new WebSocket connection."""
+        """Register a new WebSocket connection, queueing the current snapshots."""
         self.connections.append(ws)
+        mailbox = Subscription(frozenset(SNAPSHOT_TYPES))
+        for msg_type in SNAPSHOT_TYPES:
+            snapshot = self._snapshots.get(msg_type)
+            if snapshot is not None:
+                payload = self._payloads.get(msg_type)
+                if payload is None:
+                    payload = self._payloads[msg_type] = json.dumps(snapshot)
+                mailbox.offer(msg_type, payload)
+        self._writers[ws] = (mailbox, asyncio.create_task(self._write(ws, mailbox)))
 
     def disconnect(self, ws: Any) -> None:
-        """Remove a WebSocket connection."""
+        """Remove a WebSocket connection and stop its writer."""
         if ws in self.connections:
             self.connections.remove(ws)
+        self._views.pop(ws, None)
+        _, writer = self._writers.pop(ws, (None, None))
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
 
-    async def broadcast(self, msg_type: str, data: Any) -> None:
-        """Send a JSON message to every connected client.
+    def send(self, ws: Any, msg_type: str, message: dict[str, Any]) -> None:
+        """Queue *message* for *ws* alone, superseding any unsent *msg_type* one."""
+        entry = self._writers.get(ws)
+        if entry is not None:
+            entry[0].offer(msg_type, json.dumps(message))
 
-        Message format::
+    async def _write(self, ws: Any, mailbox: Subscription) -> None:
+        """Deliver *mailbox* to *ws* until it fails or is disconnected."""
+        try:
+            while True:
+                for text in await mailbox.next():
+                    await ws.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.disconnect(ws)
+            logger.warning("Removed dead WebSocket connection")
 
-            {"type": msg_type, "timestamp": ISO8601, "data": data}
+    def set_view(
+        self,
+        ws: Any,
+        msg_type: str,
+        key: Hashable,
+        render: Callable[[], Any],
+    ) -> None:
+        """Send *ws* ``render()`` instead of the full *msg_type* payload.
 
-        Dead connections (those that raise on ``send_text``) are silently
-        removed from the connection list.
+        *key* identifies the view's parameters; connections with equal keys
+        share a single render and encode per broadcast.
         """
-        message = {
+        self._views.setdefault(ws, {})[msg_type] = (key, render)
+
+    def clear_view(self, ws: Any, msg_type: str) -> None:
+        """Go back to sending *ws* the full *msg_type* payload."""
+        views = self._views.get(ws)
+        if views is not None:
+            views.pop(msg_type, None)
+            if not views:
+                del self._views[ws]
+
+    def _message(self, msg_type: str, data: Any) -> dict[str, Any]:
+        self._version += 1
+        return {
             "type": msg_type,
+            "version": self._version,
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "data": data,
         }
-        self._snapshots[msg_type] = message
 
-        payload = json.dumps(message)
-        dead: list[Any] = []
-        for ws in self.connections:
+    async def broadcast(
+        self, msg_type: str, data: Any, *, index_data: Any = None
+    ) -> None:
+        """Send a JSON message to every connected client.
+
+        Message format::
+
+            {"type": msg_type, "version": N, "timestamp": ISO8601, "data": data}
+
+        WebSocket and SSE listeners get the message through their mailboxes;
+        delivery happens in their writer tasks, so this returns without
+        waiting on any socket.  Dead WebSocket connections are removed by
+        their writers.  Encode time, fan-out time and the recipient count
+        are recorded in the ``mcc_hub_*`` metrics.
+
+        *index_data*, when given, is what the type's list index sees instead
+        of *data* — e.g. a whole queue whose snapshot only carries a page.
+        """
+        message = self._message(msg_type, data)
+        self._snapshots[msg_type] = message
+        index = self._indexes.get(msg_type)
+        if index is not None:
             try:
-                await ws.send_text(payload)
+                index.update(
+                    data if index_data is None else index_data, message["version"]
+                )
             except Exception:
-                dead.append(ws)
+                logger.exception("Failed to index %s snapshot", msg_type)
+        async with self._changed:
+            self._changed.notify_all()
 
-        for ws in dead:
-            self.connections.remove(ws)
-            logger.warning("Removed dead WebSocket connection during broadcast")
+        start = time.perf_counter()
+        payload = self._payloads[msg_type] = json.dumps(message)
+        encoded = time.perf_counter()
+
+        self._frames.pop(msg_type, None)
+        listeners = [sub for sub in self._subscribers if msg_type in sub.topics]
+        if listeners:
+            frame = self._frames[msg_type] = sse_frame(message, payload)
+            for sub in listeners:
+                sub.offer(msg_type, frame)
+
+        recipients = len(self.connections) + len(listeners)
+        rendered: dict[Hashable, str] = {}
+        for ws in list(self.connections):
+            mailbox, _ = self._writers[ws]
+            view = self._views.get(ws, {}).get(msg_type)
+            if view is None:
+                mailbox.offer(msg_type, payload)
+                continue
+            key, render = view
+            if key not in rendered:
+                try:
+                    rendered[key] = json.dumps({**message, "data": render()})
+                except Exception:
+                    logger.exception("Failed to render %s view", msg_type)
+                    rendered[key] = payload
+            mailbox.offer(msg_type, rendered[key])
+        record_broadcast(
+            msg_type, encoded - start, time.perf_counter() - encoded, recipients
+        )
+
+    def subscribe(
+        self, topics: frozenset[str], last_event_id: int | None = None
+    ) -> Subscription:
+        """Register a mailbox for *topics*, preloaded with current snapshots.
+
+        With *last_event_id*, only snapshots newer than that version are
+        preloaded, so a reconnecting listener resumes without repeats.
+        """
+        sub = Subscription(topics)
+        for msg_type in SNAPSHOT_TYPES:
+            snapshot = self._snapshots.get(msg_type)
+            if msg_type not in topics or snapshot is None:
+                continue
+            if last_event_id is not None and snapshot["version"] <= last_event_id:
+                continue
+            frame = self._frames.get(msg_type)
+            if frame is None:
+                payload = self._payloads.get(msg_type) or json.dumps(snapshot)
+                frame = self._frames[msg_type] = sse_frame(snapshot, payload)
+            sub.offer(msg_type, frame)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        """Remove a mailbox registered with :meth:`subscribe`."""
+        self._subscribers.discard(sub)
+
+    def get_index(self, msg_type: str) -> SnapshotIndex | None:
+        """Return the record index kept for *msg_type*, if there is one."""
+        return self._indexes.get(msg_type)
 
     def get_snapshot(self, msg_type: str) -> dict[str, Any] | None:
         """Return the last broadcast message for *msg_type*, or ``None``."""
         return self._snapshots.get(msg_type)
+
+    async def wait_for_snapshot(
+        self, msg_type: str, since: int, timeout: float
+    ) -> dict[str, Any] | None:
+        """Return the *msg_type* snapshot once its version exceeds *since*.
+
+        Returns immediately if it already does; otherwise waits up to
+        *timeout* seconds and returns ``None`` if nothing newer arrived.
+        """
+
+        def newer() -> bool:
+            snapshot = self._snapshots.get(msg_type)
+            return snapshot is not None and snapshot["version"] > since
+
+        if not newer():
+            if timeout <= 0:
+                return None
+            try:
+                async with self._changed:
+                    await asyncio.wait_for(
+                        self._changed.wait_for(newer), timeout=timeout
+                    )
+            except asyncio.TimeoutError:
+                return None
+        return self._snapshots[msg_type]
@@ -0,0 +1,256 @@
+"""Secondary indexes over snapshot records for filtered, paginated reads.
+
+A :class:`SnapshotIndex` flattens one snapshot type into records (queue
+items, Tdarr workers, Plex sessions) and keeps, per filter, a posting set of
+record keys for every value.  :meth:`ConnectionHub.broadcast
+<app.ws.hub.ConnectionHub.broadcast>` feeds it each new snapshot; only
+records that were added, removed or changed touch the postings, and sorted
+orders are cached until the records change.  The REST endpoints answer
+``status=``/``service=``/``q=``/``sort=`` queries from it without walking
+the whole snapshot.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+from app.config import instance_service
+
+Record = dict[str, Any]
+
+#: Yields ``(key, record)`` pairs for one snapshot's data.
+Extractor = Callable[[Any], Iterable[tuple[Hashable, Record]]]
+
+
+def _sort_key(value: Any) -> tuple[int, Any]:
+    """Order numbers (including numeric strings) before text."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value)
+    if isinstance(value, str):
+        try:
+            return (0, float(value))
+        except ValueError:
+            return (1, value.lower())
+    return (1, str(value).lower())
+
+
+class SnapshotIndex:
+    """Records of one snapshot type, indexed for filtering and sorting.
+
+    *fields* maps each filter name to the record fields whose values it
+    matches; ``{"service": ("service", "instance")}`` lets ``service=``
+    match a service type or an instance key.  *search* names the fields
+    ``q`` looks in and *sorts* the fields that may be sorted on.
+    """
+
+    def __init__(
+        self,
+        extract: Extractor,
+        *,
+        fields: dict[str, tuple[str, ...]],
+        search: tuple[str, ...] = (),
+        sorts: tuple[str, ...] = (),
+    ) -> None:
+        self._extract = extract
+        self.fields = fields
+        self.search = search
+        self.sorts = sorts
+        self.version = 0
+        self._records: dict[Hashable, Record] = {}
+        self._text: dict[Hashable, str] = {}
+        # filter -> lower-cased value -> record keys
+        self._postings: dict[str, dict[str, set[Hashable]]] = {
+            name: {} for name in fields
+        }
+        # sort spec -> (ordered keys, key -> position)
+        self._orders: dict[str, tuple[list[Hashable], dict[Hashable, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _values(self, name: str, record: Record) -> Iterator[str]:
+        for field in self.fields[name]:
+            value = record.get(field)
+            if value is not None and value != "":
+                yield str(value).lower()
+
+    def _add(self, key: Hashable, record: Record) -> None:
+        self._records[key] = record
+        for name, postings in self._postings.items():
+            for value in self._values(name, record):
+                postings.setdefault(value, set()).add(key)
+        if self.search:
+            self._text[key] = " ".join(
+                str(record.get(field) or "") for field in self.search
+            ).lower()
+
+    def _remove(self, key: Hashable) -> None:
+        record = self._records.pop(key)
+        for name, postings in self._postings.items():
+            for value in self._values(name, record):
+                keys = postings.get(value)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del postings[value]
+        self._text.pop(key, None)
+
+    def update(self, data: Any, version: int) -> int:
+        """Index the snapshot *data*; return how many records changed."""
+        incoming: dict[Hashable, Record] = {}
+        for key, record in self._extract(data):
+            # Duplicate keys (e.g. two queue items with the same name) stay apart.
+            n = 1
+            unique = key
+            while unique in incoming:
+                n += 1
+                unique = (key, n)
+            incoming[unique] = record
+
+        changed = 0
+        for key in self._records.keys() - incoming.keys():
+            self._remove(key)
+            changed += 1
+        for key, record in incoming.items():
+            old = self._records.get(key)
+            if old is not None:
+                if old == record:
+                    continue
+                self._remove(key)
+            self._add(key, record)
+            changed += 1
+
+        if changed or list(self._records) != list(incoming):
+            # Keep snapshot order as the default order.
+            self._records = {key: self._records[key] for key in incoming}
+            self._orders.clear()
+        self.version = version
+        return changed
+
+    def _order(self, sort: str) -> tuple[list[Hashable], dict[Hashable, int]]:
+        """Record keys ordered by *sort* (``field`` or ``-field``), cached."""
+        cached = self._orders.get(sort)
+        if cached is None:
+            field = sort.lstrip("-")
+            if sort and field not in self.sorts:
+                raise ValueError(f"'sort' must be one of {', '.join(self.sorts)}")
+            keys = list(self._records)
+            if field:
+                # Records without the field go last in either direction.
+                missing = [k for k in keys if self._records[k].get(field) is None]
+                keys = sorted(
+                    (k for k in keys if self._records[k].get(field) is not None),
+                    key=lambda k: _sort_key(self._records[k][field]),
+                    reverse=sort.startswith("-"),
+                ) + missing
+            cached = self._orders[sort] = (keys, {k: i for i, k in enumerate(keys)})
+        return cached
+
+    def query(
+        self,
+        filters: dict[str, list[str]] | None = None,
+        *,
+        q: str | None = None,
+        sort: str | None = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> dict[str, Any]:
+        """Return one page of matching records and the total match count.
+
+        Each filter matches any of its values (case-insensitive); different
+        filters must all match.  *q* is a case-insensitive substring search
+        over the :attr:`search` fields.
+        """
+        order, rank = self._order(sort or "")
+        matched: set[Hashable] | None = None
+        for name, values in (filters or {}).items():
+            if name not in self._postings:
+                raise ValueError(f"Unknown filter: {name!r}")
+            postings = self._postings[name]
+            keys = set().union(*(postings.get(v.lower(), ()) for v in values))
+            matched = keys if matched is None else matched & keys
+        if q:
+            needle = q.lower()
+            pool = self._records if matched is None else matched
+            matched = {key for key in pool if needle in self._text.get(key, "")}
+
+        keys = order if matched is None else sorted(matched, key=rank.__getitem__)
+        return {
+            "version": self.version,
+            "total": len(keys),
+            "offset": offset,
+            "limit": limit,
+            "items": [self._records[key] for key in keys[offset:offset + limit]],
+        }
+
+
+# -- Record extractors ---------------------------------------------------------
+
+def download_records(data: dict[str, Any]) -> Iterator[tuple[Hashable, Record]]:
+    """SABnzbd slots and Sonarr/Radarr queue records, tagged with their service."""
+    for instance, sab in (data.get("sabnzbd_instances") or {}).items():
+        for item in sab.get("items", []):
+            key = item.get("id") or item.get("name")
+            yield (instance, key), {**item, "service": "sabnzbd", "instance": instance}
+    for field in ("sonarr_queue", "radarr_queue"):
+        for rec in data.get(field, []):
+            instance = rec.get("instance") or field.partition("_")[0]
+            key = rec.get("id") or rec.get("title")
+            yield (instance, key), {**rec, "service": instance_service(instance)}
+
+
+def worker_records(data: dict[str, Any]) -> Iterator[tuple[Hashable, Record]]:
+    """One record per Tdarr worker, tagged with its node and instance."""
+    for node in data.get("nodes", []):
+        instance = node.get("instance", "tdarr")
+        for worker in node.get("workers", []):
+            yield (instance, node.get("id"), worker.get("id")), {
+                **worker,
+                "node": node.get("name", node.get("id")),
+                "service": instance_service(instance),
+                "instance": instance,
+            }
+
+
+def session_records(data: dict[str, Any]) -> Iterator[tuple[Hashable, Record]]:
+    """Plex sessions; the stored session dicts already carry ``instance``."""
+    for session in data.get("sessions", []):
+        instance = session.get("instance", "plex")
+        yield (instance, session.get("sessionKey")), {
+            **session, "service": instance_service(instance),
+        }
+
+
+def default_indexes() -> dict[str, SnapshotIndex]:
+    """Indexes the hub keeps for the REST list endpoints."""
+    return {
+        "downloads": SnapshotIndex(
+            download_records,
+            fields={"status": ("status",), "service": ("service", "instance")},
+            search=("name", "title"),
+            sorts=(
+                "name", "title", "status", "service", "percentage",
+                "size", "sizeleft", "size_bytes", "sizeleft_bytes", "timeleft_s",
+            ),
+        ),
+        "transcoding": SnapshotIndex(
+            worker_records,
+            fields={
+                "status": ("status",),
+                "service": ("service", "instance"),
+                "node": ("node",),
+            },
+            search=("file", "node"),
+            sorts=("file", "node", "status", "percentage", "fps", "eta_s"),
+        ),
+        "streaming": SnapshotIndex(
+            session_records,
+            fields={
+                "status": ("state",),
+                "service": ("service", "instance"),
+                "user": ("user",),
+            },
+            search=("title", "grandparentTitle", "user"),
+            sorts=("title", "user", "state", "decision"),
+        ),
+    }
@@ -0,0 +1,6 @@
+"""Benchmark suite — collectors and hub driven against simulated upstreams.
+
+Run from ``backend/``::
+
+    python -m benchmarks.run --queue-items 5000 --staged-files 50000
+"""
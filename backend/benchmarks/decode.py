@@ -0,0 +1,156 @@
+"""Response decoding benchmark: full JSON parse vs. per-endpoint field specs.
+
+Builds large upstream bodies with :mod:`benchmarks.upstreams` and decodes
+each one three ways:
+
+* **full** — ``json.loads``, what ``response.json()`` did for every endpoint;
+* **projected** — the pure-Python fallback, ``json.loads`` then pruning;
+* **spec** — :meth:`~app.services.schema.Schema.decode` as the clients use
+  it (msgspec typed decoding when installed).
+
+For each it reports CPU seconds per decode, peak Python allocations during
+one decode and the bytes the result keeps alive::
+
+    python -m benchmarks.decode --sessions 500 --calendar-entries 5000 \\
+        --staged-files 50000 --iterations 20 --output decode-results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from app.services import schema as schema_module
+from app.services.plex import PlexClient
+from app.services.radarr import RadarrClient
+from app.services.sabnzbd import SABnzbdClient
+from app.services.schema import Schema, project
+from app.services.sonarr import SonarrClient
+from app.services.tdarr import TdarrClient
+from benchmarks.upstreams import PayloadSizes, UpstreamState
+
+
+def fixtures(sizes: PayloadSizes, seed: int = 1) -> dict[str, tuple[bytes, Schema]]:
+    """Encoded upstream bodies with the schema their client decodes them by."""
+    state = UpstreamState(sizes, seed=seed)
+    records = state.arr_records
+    queue = {
+        "page": 1, "pageSize": len(records), "totalRecords": len(records),
+        "records": records,
+    }
+    bodies: dict[str, tuple[Any, Schema]] = {
+        "plex.sessions": (
+            {"MediaContainer": {"size": len(state.sessions), "Metadata": state.sessions}},
+            PlexClient.field_specs["status/sessions"],
+        ),
+        "sonarr.calendar": (
+            [{**ep, "series": state._series(ep["seriesId"])} for ep in state.episodes],
+            SonarrClient.field_specs["calendar"],
+        ),
+        "sonarr.queue": (queue, SonarrClient.field_specs["queue"]),
+        "radarr.calendar": (state.movies, RadarrClient.field_specs["calendar"]),
+        "sabnzbd.queue": (
+            {"queue": {"speed": "12.3 M", "kbpersec": "12595.2", "mbleft": "1234.5",
+                       "noofslots": len(state.sab_slots), "slots": state.sab_slots}},
+            SABnzbdClient.field_specs["queue"],
+        ),
+        "tdarr.nodes": (state.nodes, TdarrClient.field_specs["cruddb/NodeJSONDB"]),
+        "tdarr.staged": (state.staged, TdarrClient.field_specs["cruddb/StagedJSONDB"]),
+    }
+    return {name: (json.dumps(body).encode(), spec) for name, (body, spec) in bodies.items()}
+
+
+def _measure(decode: Callable[[bytes], Any], body: bytes, iterations: int) -> dict[str, Any]:
+    decode(body)  # warm-up
+    cpu_start = time.process_time()
+    for _ in range(iterations):
+        decode(body)
+    cpu = time.process_time() - cpu_start
+
+    # Allocations come from a separate traced run: tracemalloc slows
+    # allocation-heavy code several-fold and would skew timings.
+    tracemalloc.start()
+    result = decode(body)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {
+        "cpu_per_decode_s": cpu / iterations,
+        "peak_alloc_bytes": peak,
+        "retained_bytes": retained,
+    }
+
+
+def bench_decode(body: bytes, spec: Schema, iterations: int) -> dict[str, Any]:
+    """Compare the three decoders on one body."""
+    modes = {
+        "full": json.loads,
+        "projected": lambda content: project(json.loads(content), spec.spec),
+        "spec": spec.decode,
+    }
+    result: dict[str, Any] = {"body_bytes": len(body)}
+    for mode, decode in modes.items():
+        result[mode] = _measure(decode, body, iterations)
+    full, slim = result["full"], result["spec"]
+    result["cpu_ratio"] = slim["cpu_per_decode_s"] / full["cpu_per_decode_s"]
+    result["peak_ratio"] = slim["peak_alloc_bytes"] / full["peak_alloc_bytes"]
+    return result
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    sizes = PayloadSizes(
+        queue_items=args.queue_items,
+        staged_files=args.staged_files,
+        sessions=args.sessions,
+        calendar_entries=args.calendar_entries,
+        tdarr_nodes=args.tdarr_nodes,
+        workers_per_node=args.workers_per_node,
+    )
+    endpoints = {}
+    for name, (body, spec) in fixtures(sizes, args.seed).items():
+        endpoints[name] = bench_decode(body, spec, args.iterations)
+        print(f"{name:16s} cpu x{endpoints[name]['cpu_ratio']:.2f} "
+              f"peak x{endpoints[name]['peak_ratio']:.2f}", file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "msgspec": schema_module.msgspec is not None,
+            "config": {"sizes": vars(sizes), "iterations": args.iterations},
+        },
+        "endpoints": endpoints,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--iterations", type=int, default=20)
+    p.add_argument("--queue-items", type=int, default=2000)
+    p.add_argument("--staged-files", type=int, default=20000)
+    p.add_argument("--sessions", type=int, default=200)
+    p.add_argument("--calendar-entries", type=int, default=2000)
+    p.add_argument("--tdarr-nodes", type=int, default=8)
+    p.add_argument("--workers-per-node", type=int, default=4)
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--output", default="-",
+                   help="JSON output path ('-' for stdout)")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    body = json.dumps(run(args), indent=2)
+    if args.output == "-":
+        print(body)
+    else:
+        with open(args.output, "w") as fh:
+            fh.write(body + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""Collector benchmark runner.
+
+Drives every collector against :mod:`benchmarks.upstreams` and reports, per
+collector, cycle latency percentiles, CPU seconds per cycle and peak Python
+allocations.  It then measures end-to-end update latency: the time from a
+change in upstream state until the hub sends a WebSocket frame that
+contains it.  Results are written as JSON so releases can be compared::
+
+    python -m benchmarks.run --cycles 50 --queue-items 5000 \\
+        --staged-files 50000 --output bench-results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from app.collectors.base import BaseCollector
+from app.collectors.calendar import CalendarCollector
+from app.collectors.downloads import DownloadsCollector
+from app.collectors.health import HealthCollector
+from app.collectors.streaming import StreamingCollector
+from app.collectors.transcoding import TranscodingCollector
+from app.perf import LatencyWindow
+from app.ws.hub import ConnectionHub
+from benchmarks.upstreams import SERVICES, FakeUpstreams, PayloadSizes, UpstreamProfile
+
+COLLECTORS: dict[str, type[BaseCollector]] = {
+    "health": HealthCollector,
+    "downloads": DownloadsCollector,
+    "streaming": StreamingCollector,
+    "transcoding": TranscodingCollector,
+    "calendar": CalendarCollector,
+}
+
+
+class FrameRecorder:
+    """Stand-in WebSocket that timestamps every frame the hub sends it."""
+
+    def __init__(self) -> None:
+        self.frames: list[tuple[float, str]] = []
+        self._waiters: list[tuple[str, asyncio.Future[float]]] = []
+
+    async def send_text(self, payload: str) -> None:
+        now = time.perf_counter()
+        self.frames.append((now, payload))
+        for marker, fut in list(self._waiters):
+            if marker in payload and not fut.done():
+                fut.set_result(now)
+                self._waiters.remove((marker, fut))
+
+    def wait_for(self, marker: str) -> asyncio.Future[float]:
+        fut: asyncio.Future[float] = asyncio.get_running_loop().create_future()
+        self._waiters.append((marker, fut))
+        return fut
+
+
+def _version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("media-command-center")
+    except Exception:
+        return "unknown"
+
+
+def _max_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes.
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+async def bench_collector(
+    name: str,
+    upstreams: FakeUpstreams,
+    cycles: int,
+    warmup: int,
+    hub: ConnectionHub | None = None,
+) -> dict[str, Any]:
+    """Run *cycles* back-to-back collect cycles and summarise their cost."""
+    hub = hub or ConnectionHub()
+    clients = upstreams.clients()
+    collector = COLLECTORS[name](hub, clients, interval=0)
+    try:
+        for _ in range(warmup):
+            await collector.run_once()
+
+        window = LatencyWindow(size=cycles)
+        cpu_start = time.process_time()
+        for _ in range(cycles):
+            start = time.perf_counter()
+            await collector.run_once()
+            window.add(time.perf_counter() - start)
+        cpu = time.process_time() - cpu_start
+
+        # Peak allocations come from a separate traced cycle: tracemalloc
+        # slows allocation-heavy code several-fold and would skew timings.
+        tracemalloc.start()
+        await collector.run_once()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        snapshot = hub.get_snapshot(name)
+        return {
+            "cycles": cycles,
+            "latency_s": window.summary(),
+            "cpu_per_cycle_s": cpu / cycles,
+            "peak_alloc_bytes_per_cycle": peak,
+            "snapshot_bytes": len(json.dumps(snapshot)) if snapshot else 0,
+        }
+    finally:
+        for client in clients.values():
+            await client.close()
+
+
+async def bench_end_to_end(
+    upstreams: FakeUpstreams, samples: int, interval: float
+) -> dict[str, Any]:
+    """Measure upstream-change to WebSocket-frame latency with live collectors.
+
+    Collectors run their normal loops at *interval* seconds; each sample
+    mutates upstream state at a random phase of the polling cycle and waits
+    for the hub to emit a frame containing the change.
+    """
+    hub = ConnectionHub()
+    recorder = FrameRecorder()
+    hub.connect(recorder)
+    clients = upstreams.clients()
+    collectors = [
+        DownloadsCollector(hub, clients, interval),
+        StreamingCollector(hub, clients, interval),
+    ]
+    for c in collectors:
+        c.start()
+
+    results: dict[str, LatencyWindow] = {
+        "downloads": LatencyWindow(size=samples),
+        "streaming": LatencyWindow(size=samples),
+    }
+    try:
+        for i in range(samples):
+            # Spread mutations across the polling phase.
+            await asyncio.sleep(interval * ((i * 0.37) % 1))
+            marker = f"e2e-{uuid.uuid4().hex}"
+            fut = recorder.wait_for(marker)
+            start = time.perf_counter()
+            if i % 2 == 0:
+                upstreams.state.add_download(marker)
+                kind = "downloads"
+            else:
+                upstreams.state.start_stream(marker)
+                kind = "streaming"
+            seen = await asyncio.wait_for(fut, timeout=interval * 4 + 5)
+            results[kind].add(seen - start)
+    finally:
+        hub.disconnect(recorder)
+        for c in collectors:
+            await c.stop()
+        for client in clients.values():
+            await client.close()
+
+    return {
+        "poll_interval_s": interval,
+        "samples": samples,
+        "latency_s": {kind: w.summary() for kind, w in results.items()},
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    sizes = PayloadSizes(
+        queue_items=args.queue_items,
+        staged_files=args.staged_files,
+        sessions=args.sessions,
+        calendar_entries=args.calendar_entries,
+        tdarr_nodes=args.tdarr_nodes,
+        workers_per_node=args.workers_per_node,
+    )
+    profile = UpstreamProfile(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+    )
+    upstreams = FakeUpstreams(
+        sizes, {name: profile for name in SERVICES}, seed=args.seed
+    )
+
+    collectors = {}
+    for name in args.collectors:
+        collectors[name] = await bench_collector(
+            name, upstreams, args.cycles, args.warmup
+        )
+        print(f"{name:12s} p50={collectors[name]['latency_s']['p50']:.4f}s "
+              f"cpu/cycle={collectors[name]['cpu_per_cycle_s']:.4f}s",
+              file=sys.stderr)
+
+    result: dict[str, Any] = {
+        "meta": {
+            "version": _version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "config": {
+                "sizes": vars(sizes),
+                "profile": vars(profile),
+                "cycles": args.cycles,
+            },
+        },
+        "collectors": collectors,
+    }
+    if args.e2e_samples:
+        result["end_to_end"] = await bench_end_to_end(
+            upstreams, args.e2e_samples, args.e2e_interval
+        )
+    result["max_rss_bytes"] = _max_rss_bytes()
+    return result
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--collectors", nargs="+", default=list(COLLECTORS),
+                   choices=list(COLLECTORS))
+    p.add_argument("--cycles", type=int, default=30)
+    p.add_argument("--warmup", type=int, default=3)
+    p.add_argument("--queue-items", type=int, default=200)
+    p.add_argument("--staged-files", type=int, default=1000)
+    p.add_argument("--sessions", type=int, default=10)
+    p.add_argument("--calendar-entries", type=int, default=100)
+    p.add_argument("--tdarr-nodes", type=int, default=4)
+    p.add_argument("--workers-per-node", type=int, default=2)
+    p.add_argument("--latency-ms", type=float, default=5)
+    p.add_argument("--jitter-ms", type=float, default=2)
+    p.add_argument("--error-rate", type=float, default=0.0)
+    p.add_argument("--e2e-samples", type=int, default=10,
+                   help="end-to-end latency samples (0 to skip)")
+    p.add_argument("--e2e-interval", type=float, default=5,
+                   help="collector poll interval during the end-to-end run")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--output", default="-",
+                   help="JSON output path ('-' for stdout)")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    result = asyncio.run(run(args))
+    body = json.dumps(result, indent=2)
+    if args.output == "-":
+        print(body)
+    else:
+        with open(args.output, "w") as fh:
+            fh.write(body + "\n")
+
+
+if __name__ == "__main__":
+    main()
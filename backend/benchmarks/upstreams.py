@@ -0,0 +1,441 @@
+"""In-process ASGI stand-ins for every upstream service.
+
+Each fake speaks just enough of the real API for the collectors to work:
+same paths, same auth-free JSON shapes, same pagination parameters.  Every
+service is wrapped in :class:`Degrade`, which injects latency, jitter and
+HTTP 500s according to an :class:`UpstreamProfile`.
+
+Responses are encoded once per state change and cached, so the benchmark
+measures the collectors' decode and processing cost rather than the fake's
+own JSON encoding.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from app.services.bazarr import BazarrClient
+from app.services.overseerr import OverseerrClient
+from app.services.plex import PlexClient
+from app.services.prowlarr import ProwlarrClient
+from app.services.radarr import RadarrClient
+from app.services.sabnzbd import SABnzbdClient
+from app.services.sonarr import SonarrClient
+from app.services.tdarr import TdarrClient
+
+SERVICES = (
+    "sonarr", "radarr", "sabnzbd", "plex",
+    "tdarr", "prowlarr", "bazarr", "overseerr",
+)
+
+
+@dataclass
+class UpstreamProfile:
+    """Latency and failure characteristics of one simulated upstream."""
+
+    latency: float = 0.005
+    jitter: float = 0.002
+    error_rate: float = 0.0
+
+
+@dataclass
+class PayloadSizes:
+    """How much data the simulated stack holds."""
+
+    queue_items: int = 200
+    staged_files: int = 1000
+    sessions: int = 10
+    calendar_entries: int = 100
+    tdarr_nodes: int = 4
+    workers_per_node: int = 2
+
+
+# -- Fault injection ---------------------------------------------------------
+
+class Degrade:
+    """ASGI middleware adding latency, jitter and random 500s."""
+
+    def __init__(self, app: Any, profile: UpstreamProfile, rng: random.Random) -> None:
+        self.app = app
+        self.profile = profile
+        self._rng = rng
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] == "http":
+            p = self.profile
+            delay = p.latency + self._rng.uniform(-p.jitter, p.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if p.error_rate and self._rng.random() < p.error_rate:
+                await Response("simulated failure", status_code=500)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+# -- Shared mutable state ----------------------------------------------------
+
+class UpstreamState:
+    """Mutable dataset behind all fakes, with an encode-once response cache."""
+
+    def __init__(self, sizes: PayloadSizes, seed: int = 1) -> None:
+        self.sizes = sizes
+        self._rng = random.Random(seed)
+        self._cache: dict[str, bytes] = {}
+        self.sab_slots = [self._sab_slot(i) for i in range(sizes.queue_items)]
+        self.arr_records = [self._arr_record(i) for i in range(sizes.queue_items)]
+        self.sessions = [self._plex_session(i) for i in range(sizes.sessions)]
+        self.staged = [self._staged_file(i) for i in range(sizes.staged_files)]
+        self.episodes = [self._episode(i) for i in range(sizes.calendar_entries)]
+        self.movies = [self._movie(i) for i in range(sizes.calendar_entries)]
+        self.nodes = {
+            f"node-{n}": self._tdarr_node(n) for n in range(sizes.tdarr_nodes)
+        }
+
+    # -- Generators ----------------------------------------------------------
+
+    def _sab_slot(self, i: int, name: str | None = None) -> dict[str, Any]:
+        mb = self._rng.uniform(500, 20000)
+        left = mb * self._rng.random()
+        return {
+            "index": i,
+            "nzo_id": f"SABnzbd_nzo_{i:06d}",
+            "filename": name or f"Some.Show.S01E{i % 100:02d}.1080p.WEB-DL-{i}",
+            "cat": "tv",
+            "priority": "Normal",
+            "status": "Downloading" if i == 0 else "Queued",
+            "percentage": str(int(100 * (1 - left / mb))),
+            "mb": f"{mb:.2f}",
+            "mbleft": f"{left:.2f}",
+            "size": f"{mb / 1024:.1f} GB",
+            "sizeleft": f"{left / 1024:.1f} GB",
+            "timeleft": "0:12:34",
+            "labels": [],
+            "password": "",
+            "script": "None",
+        }
+
+    def _arr_record(self, i: int) -> dict[str, Any]:
+        size = self._rng.randint(500, 20000) * 1024 * 1024
+        return {
+            "id": i,
+            "seriesId": i % 300,
+            "episodeId": 10000 + i,
+            "title": f"Some.Show.S01E{i % 100:02d}.1080p.WEB-DL-{i}",
+            "status": "downloading",
+            "trackedDownloadStatus": "ok",
+            "trackedDownloadState": "downloading",
+            "statusMessages": [],
+            "size": size,
+            "sizeleft": size // 2,
+            "timeleft": "00:12:34",
+            "downloadClient": "SABnzbd",
+            "protocol": "usenet",
+            "quality": {"quality": {"id": 3, "name": "WEBDL-1080p"}, "revision": {"version": 1}},
+            "languages": [{"id": 1, "name": "English"}],
+        }
+
+    def _plex_session(self, i: int, title: str | None = None) -> dict[str, Any]:
+        streams = [
+            {"id": j, "streamType": j % 3 + 1, "codec": "h264", "bitrate": 8000,
+             "language": "English", "displayTitle": f"Stream {j}"}
+            for j in range(12)
+        ]
+        return {
+            "sessionKey": str(i),
+            "ratingKey": str(50000 + i),
+            "type": "episode",
+            "title": title or f"Episode {i}",
+            "grandparentTitle": f"Show {i % 7}",
+            "parentIndex": 1,
+            "index": i,
+            "summary": "x" * 600,
+            "User": {"id": i % 5, "title": f"user{i % 5}", "thumb": "https://plex.tv/u"},
+            "Player": {"state": "playing", "product": "Plex Web", "address": "10.0.0.2"},
+            "Media": [{
+                "bitrate": 8000, "container": "mkv", "videoResolution": "1080",
+                "Part": [{
+                    "decision": "transcode" if i % 3 == 0 else "directplay",
+                    "file": f"/media/tv/Show {i % 7}/S01E{i:02d}.mkv",
+                    "size": 2_000_000_000,
+                    "Stream": streams,
+                }],
+            }],
+            **({"TranscodeSession": {"videoDecision": "transcode", "progress": 12.5}}
+               if i % 3 == 0 else {}),
+        }
+
+    def _staged_file(self, i: int) -> dict[str, Any]:
+        return {
+            "_id": f"/media/movies/Movie {i} (2020)/Movie {i}.mkv",
+            "DB": "library-1",
+            "footprintId": f"fp{i}",
+            "lastTranscodeDate": 0,
+            "file_size": self._rng.randint(1000, 50000),
+            "container": "mkv",
+            "video_codec_name": "hevc",
+        }
+
+    def _tdarr_node(self, n: int) -> dict[str, Any]:
+        return {
+            "nodeName": f"Node-{n}",
+            "workers": {
+                f"w{n}-{k}": {
+                    "_id": f"w{n}-{k}",
+                    "file": f"/media/movies/Movie {n}{k}/Movie.mkv",
+                    "percentage": self._rng.uniform(0, 100),
+                    "fps": self._rng.uniform(20, 200),
+                    "ETA": "0:10:00",
+                    "workerType": "transcodegpu",
+                    "sourcefileSizeInGbytes": 4.2,
+                }
+                for k in range(self.sizes.workers_per_node)
+            },
+        }
+
+    def _episode(self, i: int) -> dict[str, Any]:
+        air = datetime.now(timezone.utc) + timedelta(hours=i * 168 / max(1, self.sizes.calendar_entries))
+        return {
+            "id": 90000 + i,
+            "seriesId": i % 50,
+            "title": f"Episode {i}",
+            "airDateUtc": air.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "airDate": air.strftime("%Y-%m-%d"),
+            "seasonNumber": 1,
+            "episodeNumber": i,
+            "hasFile": False,
+            "overview": "y" * 400,
+        }
+
+    def _series(self, series_id: int) -> dict[str, Any]:
+        return {
+            "id": series_id,
+            "title": f"Show {series_id}",
+            "overview": "z" * 1500,
+            "images": [{"coverType": t, "url": f"/MediaCover/{series_id}/{t}.jpg"}
+                       for t in ("poster", "banner", "fanart")],
+            "seasons": [{"seasonNumber": s, "monitored": True} for s in range(10)],
+            "genres": ["Drama", "Thriller"],
+        }
+
+    def _movie(self, i: int) -> dict[str, Any]:
+        rel = datetime.now(timezone.utc) + timedelta(hours=i * 168 / max(1, self.sizes.calendar_entries))
+        return {
+            "id": 70000 + i,
+            "title": f"Movie {i}",
+            "digitalRelease": rel.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "hasFile": False,
+            "overview": "m" * 800,
+        }
+
+    # -- Mutations (used by end-to-end latency probes) -----------------------
+
+    def add_download(self, name: str) -> None:
+        """Insert a new SABnzbd slot at the head of the queue."""
+        self.sab_slots.insert(0, self._sab_slot(0, name=name))
+        self.invalidate("sab")
+
+    def start_stream(self, title: str) -> None:
+        """Start a new Plex session."""
+        self.sessions.append(self._plex_session(len(self.sessions), title=title))
+        self.invalidate("plex")
+
+    def invalidate(self, prefix: str) -> None:
+        """Drop cached encodings whose key starts with *prefix*."""
+        for key in [k for k in self._cache if k.startswith(prefix)]:
+            del self._cache[key]
+
+    def encoded(self, key: str, build: Callable[[], Any]) -> bytes:
+        """Return the cached JSON body for *key*, building it on first use."""
+        body = self._cache.get(key)
+        if body is None:
+            body = self._cache[key] = json.dumps(build()).encode()
+        return body
+
+
+# -- App builders ------------------------------------------------------------
+
+def _json(body: bytes) -> Response:
+    return Response(body, media_type="application/json")
+
+
+def _status(version: str) -> Callable[[Request], Any]:
+    async def handler(request: Request) -> Response:
+        return _json(json.dumps({"version": version}).encode())
+    return handler
+
+
+def _arr_app(state: UpstreamState, name: str, version: str, *, series: bool) -> Starlette:
+    async def queue(request: Request) -> Response:
+        page = int(request.query_params.get("page", 1))
+        size = int(request.query_params.get("pageSize", 10))
+        records = state.arr_records
+        return _json(state.encoded(f"{name}:queue:{page}:{size}", lambda: {
+            "page": page,
+            "pageSize": size,
+            "totalRecords": len(records),
+            "records": records[(page - 1) * size:page * size],
+        }))
+
+    async def calendar(request: Request) -> Response:
+        embed = request.query_params.get("includeSeries") == "true"
+        start = request.query_params.get("start", "")
+        end = request.query_params.get("end", "9999")
+        key = f"{name}:calendar:{start}:{end}:{embed}"
+        if series:
+            def build() -> Any:
+                out = []
+                for ep in state.episodes:
+                    if start <= ep["airDate"] < end:
+                        out.append({**ep, "series": state._series(ep["seriesId"])} if embed else ep)
+                return out
+        else:
+            def build() -> Any:
+                return [m for m in state.movies if start <= m["digitalRelease"][:10] < end]
+        return _json(state.encoded(key, build))
+
+    async def all_series(request: Request) -> Response:
+        return _json(state.encoded(f"{name}:series", lambda: [
+            state._series(i) for i in range(50)
+        ]))
+
+    async def ping(request: Request) -> Response:
+        return _json(b'{"status": "OK"}')
+
+    return Starlette(routes=[
+        Route("/ping", ping),
+        Route(f"/api/v3/system/status", _status(version)),
+        Route(f"/api/v3/queue", queue),
+        Route(f"/api/v3/calendar", calendar),
+        Route(f"/api/v3/series", all_series),
+    ])
+
+
+def _sabnzbd_app(state: UpstreamState) -> Starlette:
+    async def api(request: Request) -> Response:
+        mode = request.query_params.get("mode")
+        if mode == "version":
+            return _json(b'{"version": "4.3.2"}')
+        start = int(request.query_params.get("start", 0))
+        limit = int(request.query_params.get("limit", 0))
+        slots = state.sab_slots
+        return _json(state.encoded(f"sab:queue:{start}:{limit}", lambda: {"queue": {
+            "status": "Downloading",
+            "speed": "25.3 M",
+            "kbpersec": "25907.20",
+            "size": "812.4 GB",
+            "sizeleft": "402.2 GB",
+            "mb": "831897.60",
+            "mbleft": "411852.80",
+            "timeleft": "4:31:02",
+            "noofslots": len(slots),
+            "noofslots_total": len(slots),
+            "slots": slots[start:start + limit] if limit else slots[start:],
+        }}))
+
+    return Starlette(routes=[Route("/api", api)])
+
+
+def _plex_app(state: UpstreamState) -> Starlette:
+    async def identity(request: Request) -> Response:
+        return _json(b'{"MediaContainer": {"machineIdentifier": "bench", "version": "1.40.0"}}')
+
+    async def sessions(request: Request) -> Response:
+        return _json(state.encoded("plex:sessions", lambda: {"MediaContainer": {
+            "size": len(state.sessions), "Metadata": state.sessions,
+        }}))
+
+    async def transcodes(request: Request) -> Response:
+        return _json(state.encoded("plex:transcodes", lambda: {"MediaContainer": {
+            "TranscodeSession": [
+                s["TranscodeSession"] for s in state.sessions if "TranscodeSession" in s
+            ],
+        }}))
+
+    return Starlette(routes=[
+        Route("/identity", identity),
+        Route("/status/sessions", sessions),
+        Route("/transcode/sessions", transcodes),
+    ])
+
+
+def _tdarr_app(state: UpstreamState) -> Starlette:
+    async def status(request: Request) -> Response:
+        return _json(b'{"status": "good", "version": "2.17.01"}')
+
+    async def cruddb(request: Request) -> Response:
+        collection = (await request.json()).get("data", {}).get("collection")
+        if collection == "NodeJSONDB":
+            return _json(state.encoded("tdarr:nodes", lambda: state.nodes))
+        if collection == "StagedJSONDB":
+            return _json(state.encoded("tdarr:staged", lambda: state.staged))
+        return _json(state.encoded("tdarr:stats", lambda: {
+            "totalFileCount": len(state.staged) * 4,
+            "totalTranscodeCount": 12345,
+            "sizeDiff": 987654321,
+        }))
+
+    return Starlette(routes=[
+        Route("/api/v2/status", status),
+        Route("/api/v2/cruddb", cruddb, methods=["POST"]),
+    ])
+
+
+def _simple_app(path: str, version: str) -> Starlette:
+    return Starlette(routes=[Route(path, _status(version))])
+
+
+class FakeUpstreams:
+    """All eight fake services plus clients wired to them in-process."""
+
+    def __init__(
+        self,
+        sizes: PayloadSizes | None = None,
+        profiles: dict[str, UpstreamProfile] | None = None,
+        seed: int = 1,
+    ) -> None:
+        self.state = UpstreamState(sizes or PayloadSizes(), seed=seed)
+        self.profiles = {name: UpstreamProfile() for name in SERVICES}
+        self.profiles.update(profiles or {})
+        rng = random.Random(seed)
+        raw = {
+            "sonarr": _arr_app(self.state, "sonarr", "4.0.0", series=True),
+            "radarr": _arr_app(self.state, "radarr", "5.0.0", series=False),
+            "sabnzbd": _sabnzbd_app(self.state),
+            "plex": _plex_app(self.state),
+            "tdarr": _tdarr_app(self.state),
+            "prowlarr": _simple_app("/api/v1/system/status", "1.20.0"),
+            "bazarr": _simple_app("/api/system/status", "1.4.0"),
+            "overseerr": _simple_app("/api/v1/status", "1.33.0"),
+        }
+        self.apps = {
+            name: Degrade(app, self.profiles[name], rng) for name, app in raw.items()
+        }
+
+    def transport(self, name: str) -> httpx.AsyncBaseTransport:
+        """An httpx transport that routes requests into the fake *name*."""
+        return httpx.ASGITransport(app=self.apps[name])
+
+    def clients(self) -> dict[str, Any]:
+        """Service clients for every fake, keyed like ``CLIENT_FACTORIES``."""
+        t = self.transport
+        return {
+            "sonarr": SonarrClient("http://sonarr", "k", transport=t("sonarr")),
+            "radarr": RadarrClient("http://radarr", "k", transport=t("radarr")),
+            "sabnzbd": SABnzbdClient("http://sabnzbd", "k", transport=t("sabnzbd")),
+            "plex": PlexClient("http://plex", "k", transport=t("plex")),
+            "tdarr": TdarrClient("http://tdarr", transport=t("tdarr")),
+            "prowlarr": ProwlarrClient("http://prowlarr", "k", transport=t("prowlarr")),
+            "bazarr": BazarrClient("http://bazarr", "k", transport=t("bazarr")),
+            "overseerr": OverseerrClient("http://overseerr", "k", transport=t("overseerr")),
+        }
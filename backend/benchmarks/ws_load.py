@@ -0,0 +1,326 @@
+"""WebSocket fan-out load test.
+
+Serves the real application (collectors disabled) with uvicorn in this
+process and opens N ``/ws`` clients from worker subprocesses, so server CPU
+and memory can be measured without client noise.  Clients come in three
+kinds:
+
+* **fast** — read every frame as soon as it arrives;
+* **slow** — sleep ``--slow-delay`` seconds after each frame;
+* **stalled** — connect and never read again.
+
+The server process drives ``hub.broadcast`` at ``--rate`` per second for
+``--duration`` seconds.  Each frame carries its send time, so clients
+report delivery latency.  The JSON report covers delivery-latency
+percentiles per client kind, achieved broadcast rate, server CPU and RSS
+per connection, and dropped connections::
+
+    python -m benchmarks.ws_load --clients 1000 --slow 50 --stalled 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import random
+import resource
+import socket
+import sys
+import time
+from typing import Any
+
+# Samples each worker keeps per client kind (reservoir sampling).
+RESERVOIR = 20000
+
+
+def _raise_fd_limit() -> None:
+    """Lift the soft open-files limit to the hard limit (sockets are fds)."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _summary(samples: list[float]) -> dict[str, Any]:
+    from app.perf import LatencyWindow
+
+    win = LatencyWindow(size=max(1, len(samples)))
+    for s in samples:
+        win.add(s)
+    return win.summary()
+
+
+# -- Client side (runs in worker processes) ----------------------------------
+
+class _Reservoir:
+    def __init__(self, size: int, rng: random.Random) -> None:
+        self.size = size
+        self.samples: list[float] = []
+        self.seen = 0
+        self._rng = rng
+
+    def add(self, value: float) -> None:
+        self.seen += 1
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+        else:
+            j = self._rng.randrange(self.seen)
+            if j < self.size:
+                self.samples[j] = value
+
+
+async def _client(
+    url: str,
+    kind: str,
+    slow_delay: float,
+    stop: asyncio.Event,
+    stats: dict[str, Any],
+    connect_sem: asyncio.Semaphore,
+) -> None:
+    import websockets
+
+    async with connect_sem:
+        try:
+            ws = await websockets.connect(url, max_queue=1 if kind == "stalled" else 16)
+        except Exception:
+            stats["connect_failed"] += 1
+            return
+    stats["connected"] += 1
+    try:
+        if kind == "stalled":
+            await stop.wait()
+            return
+        while not stop.is_set():
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            msg = json.loads(raw)
+            if msg.get("type") != "bench":
+                continue
+            stats[kind].add(time.time() - msg["data"]["sent_at"])
+            if kind == "slow":
+                await asyncio.sleep(slow_delay)
+    except Exception:
+        if not stop.is_set():
+            stats["dropped"] += 1
+    finally:
+        await ws.close()
+
+
+def _worker_main(
+    url: str,
+    counts: dict[str, int],
+    slow_delay: float,
+    connect_concurrency: int,
+    status_q: Any,
+    stop_evt: Any,
+) -> None:
+    _raise_fd_limit()
+
+    async def main() -> dict[str, Any]:
+        rng = random.Random(os.getpid())
+        stats: dict[str, Any] = {
+            "fast": _Reservoir(RESERVOIR, rng),
+            "slow": _Reservoir(RESERVOIR, rng),
+            "connected": 0,
+            "connect_failed": 0,
+            "dropped": 0,
+        }
+        stop = asyncio.Event()
+        sem = asyncio.Semaphore(connect_concurrency)
+        tasks = [
+            asyncio.create_task(_client(url, kind, slow_delay, stop, stats, sem))
+            for kind, n in counts.items()
+            for _ in range(n)
+        ]
+        total = sum(counts.values())
+        while stats["connected"] + stats["connect_failed"] < total:
+            await asyncio.sleep(0.05)
+        status_q.put(("ready", stats["connected"], stats["connect_failed"]))
+        while not stop_evt.is_set():
+            await asyncio.sleep(0.05)
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return {
+            "fast": stats["fast"].samples,
+            "fast_seen": stats["fast"].seen,
+            "slow": stats["slow"].samples,
+            "slow_seen": stats["slow"].seen,
+            "dropped": stats["dropped"],
+        }
+
+    status_q.put(("done", asyncio.run(main())))
+
+
+def _split(total: int, parts: int) -> list[int]:
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+
+# -- Server side -------------------------------------------------------------
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    import uvicorn
+
+    from app.config import Settings
+    from app.main import create_app
+
+    _raise_fd_limit()
+    application = create_app(settings=Settings(_env_file=None), skip_collectors=True)
+    hub = application.state.hub
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(
+        application, log_level="warning", backlog=4096, ws_max_queue=32,
+    ))
+    serve_task = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    fast = args.clients - args.slow - args.stalled
+    if fast < 0:
+        raise SystemExit("--slow + --stalled exceeds --clients")
+
+    ctx = mp.get_context("spawn")
+    status_q = ctx.Queue()
+    stop_evt = ctx.Event()
+    url = f"ws://127.0.0.1:{port}/ws"
+    procs = []
+    rss_before = _rss_bytes()
+    for f, s, st in zip(
+        _split(fast, args.workers),
+        _split(args.slow, args.workers),
+        _split(args.stalled, args.workers),
+    ):
+        p = ctx.Process(
+            target=_worker_main,
+            args=(url, {"fast": f, "slow": s, "stalled": st}, args.slow_delay,
+                  args.connect_concurrency, status_q, stop_evt),
+            daemon=True,
+        )
+        p.start()
+        procs.append(p)
+
+    connected = failed = 0
+    for _ in procs:
+        _, ok, bad = await asyncio.to_thread(status_q.get)
+        connected += ok
+        failed += bad
+    await asyncio.sleep(0.2)
+    peak_connections = len(hub.connections)
+    rss_connected = _rss_bytes()
+
+    padding = "x" * args.payload_bytes
+    broadcast_times: list[float] = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    next_tick = wall_start
+    sent = 0
+    while time.perf_counter() - wall_start < args.duration:
+        t0 = time.perf_counter()
+        await hub.broadcast("bench", {"seq": sent, "sent_at": time.time(), "pad": padding})
+        broadcast_times.append(time.perf_counter() - t0)
+        sent += 1
+        next_tick += 1 / args.rate
+        await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    await asyncio.sleep(args.drain)
+    remaining = len(hub.connections)
+
+    stop_evt.set()
+    fast_samples: list[float] = []
+    slow_samples: list[float] = []
+    fast_seen = slow_seen = client_dropped = 0
+    for _ in procs:
+        _, res = await asyncio.to_thread(status_q.get)
+        fast_samples += res["fast"]
+        slow_samples += res["slow"]
+        fast_seen += res["fast_seen"]
+        slow_seen += res["slow_seen"]
+        client_dropped += res["dropped"]
+    for p in procs:
+        await asyncio.to_thread(p.join, 10)
+
+    server.should_exit = True
+    await serve_task
+
+    per_conn = max(1, peak_connections)
+    return {
+        "config": vars(args),
+        "connections": {
+            "requested": args.clients,
+            "connected": connected,
+            "connect_failed": failed,
+            "server_peak": peak_connections,
+            "server_dropped": peak_connections - remaining,
+            "client_observed_drops": client_dropped,
+        },
+        "broadcasts": {
+            "sent": sent,
+            "target_rate": args.rate,
+            "achieved_rate": sent / wall if wall else 0,
+            "call_seconds": _summary(broadcast_times),
+        },
+        "delivery_latency_s": {
+            "fast": {**_summary(fast_samples), "frames": fast_seen},
+            "slow": {**_summary(slow_samples), "frames": slow_seen},
+        },
+        "server": {
+            "cpu_seconds": cpu,
+            "cpu_seconds_per_broadcast": cpu / sent if sent else 0,
+            "cpu_seconds_per_connection_broadcast": cpu / (sent * per_conn) if sent else 0,
+            "rss_before_bytes": rss_before,
+            "rss_connected_bytes": rss_connected,
+            "rss_per_connection_bytes": (rss_connected - rss_before) / per_conn,
+        },
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="WebSocket fan-out load test")
+    p.add_argument("--clients", type=int, default=1000)
+    p.add_argument("--slow", type=int, default=0, help="clients that read slowly")
+    p.add_argument("--stalled", type=int, default=0, help="clients that never read")
+    p.add_argument("--slow-delay", type=float, default=0.5,
+                   help="seconds a slow client sleeps after each frame")
+    p.add_argument("--rate", type=float, default=2, help="broadcasts per second")
+    p.add_argument("--duration", type=float, default=10, help="seconds of broadcasting")
+    p.add_argument("--payload-bytes", type=int, default=2048)
+    p.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                   help="client worker processes")
+    p.add_argument("--connect-concurrency", type=int, default=200)
+    p.add_argument("--drain", type=float, default=1.0,
+                   help="seconds to wait for in-flight frames after the last broadcast")
+    p.add_argument("--output", default="-", help="JSON output path ('-' for stdout)")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    result = asyncio.run(run(args))
+    body = json.dumps(result, indent=2)
+    if args.output == "-":
+        print(body)
+    else:
+        with open(args.output, "w") as fh:
+            fh.write(body + "\n")
+
+
+if __name__ == "__main__":
+    main()
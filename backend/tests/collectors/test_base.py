@@ -0,0 +1,121 @@
+"""Tests for BaseCollector scheduling."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.collectors.base import BaseCollector
+from app.ws.hub import ConnectionHub
+
+
+class CountingCollector(BaseCollector):
+    name = "counting"
+    refresh_debounce = 0.01
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.runs = 0
+
+    async def collect(self) -> None:
+        self.runs += 1
+
+
+@pytest.fixture
+def hub() -> ConnectionHub:
+    return ConnectionHub()
+
+
+class TestBaseCollector:
+    async def test_request_refresh_coalesces(self, hub: ConnectionHub) -> None:
+        """A burst of refresh requests runs one early cycle, not one per request."""
+        collector = CountingCollector(hub, {}, interval=60)
+        collector.start()
+        await asyncio.sleep(0.01)
+        assert collector.runs == 1
+
+        for _ in range(5):
+            collector.request_refresh()
+        await asyncio.sleep(0.05)
+        await collector.stop()
+
+        assert collector.runs == 2
+
+    async def test_push_interval_only_while_all_sources_connected(
+        self, hub: ConnectionHub
+    ) -> None:
+        collector = CountingCollector(hub, {}, interval=5, push_interval=60)
+        assert collector.current_interval == 5
+
+        collector.set_push_connected("a", True)
+        assert collector.current_interval == 60
+
+        collector.set_push_connected("b", False)
+        assert collector.current_interval == 5
+
+        collector.set_push_connected("b", True)
+        collector.set_push_connected("a", False)
+        assert collector.current_interval == 5
+        # Losing a source schedules a catch-up refresh.
+        assert collector._wake.is_set()
+
+
+class TestCollectorPriority:
+    async def test_cycle_runs_under_collector_priority(self, hub: ConnectionHub) -> None:
+        from app.services.limiter import Priority, request_priority
+
+        seen: list[Priority] = []
+
+        class Background(CountingCollector):
+            priority = Priority.BACKGROUND
+
+            async def collect(self) -> None:
+                seen.append(request_priority.get())
+
+        await Background(hub, {}, interval=60).run_once()
+
+        assert seen == [Priority.BACKGROUND]
+        assert request_priority.get() is Priority.INTERACTIVE
+
+    async def test_cycle_runs_under_interval_deadline(self, hub: ConnectionHub) -> None:
+        from app.services.deadline import remaining
+
+        seen: list[float | None] = []
+
+        class Timed(CountingCollector):
+            async def collect(self) -> None:
+                seen.append(remaining())
+
+        await Timed(hub, {}, interval=5).run_once()
+
+        assert seen[0] is not None and 4 < seen[0] <= 5
+        assert remaining() is None
+
+
+class TestInstances:
+    async def test_poll_instances_is_concurrent_and_bounded(
+        self, hub: ConnectionHub
+    ) -> None:
+        clients = {"sonarr": object(), "sonarr:4k": object(), "radarr": object()}
+        clients.update({f"sonarr:{i}": object() for i in range(6)})
+
+        class Bounded(CountingCollector):
+            max_fan_out = 3
+
+        collector = Bounded(hub, clients, interval=60)
+        running = peak = 0
+
+        async def poll(key: str, client: object) -> str:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return key
+
+        results = await collector.poll_instances("sonarr", poll)
+
+        assert list(results) == ["sonarr", "sonarr:4k", *(f"sonarr:{i}" for i in range(6))]
+        assert results["sonarr:4k"] == "sonarr:4k"
+        assert peak == 3
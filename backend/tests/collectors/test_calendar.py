@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
+from datetime import date, datetime, timedelta, timezone
 from unittest.mock import AsyncMock
 
 import pytest
 
-from app.collectors.calendar import CalendarCollector
+from app.collectors.calendar import (
+    DAY_SECONDS, CalendarCollector, event_days, midnight,
+)
 from app.ws.hub import ConnectionHub
 
 
@@ -91,3 +94,162 @@ class TestCalendarCollector:
 
         assert data["episodes"] == []
         assert data["movies"] == []
+
+
+def _day(offset: int) -> str:
+    return (datetime.now(timezone.utc).date() + timedelta(days=offset)).isoformat()
+
+
+class TestIncrementalSync:
+    def _sonarr(self) -> AsyncMock:
+        sonarr = AsyncMock()
+        sonarr.get_series = AsyncMock(return_value=[
+            {"id": 7, "title": "Severance"},
+        ])
+        sonarr.get_calendar = AsyncMock(return_value=[
+            {
+                "id": 1,
+                "seriesId": 7,
+                "title": "Hello, Ms. Cobel",
+                "airDateUtc": f"{_day(2)}T02:00:00Z",
+                "seasonNumber": 2,
+                "episodeNumber": 1,
+            },
+        ])
+        return sonarr
+
+    async def test_titles_come_from_series_cache(self, hub: ConnectionHub) -> None:
+        sonarr = self._sonarr()
+        collector = CalendarCollector(hub=hub, clients={"sonarr": sonarr}, interval=60.0)
+        await collector.collect()
+
+        ep = hub.get_snapshot("calendar")["data"]["episodes"][0]
+        assert ep["series"] == "Severance"
+        kwargs = sonarr.get_calendar.call_args.kwargs
+        assert kwargs["include_series"] is False
+        # The window plus the first chunk of the wider horizon, in one call.
+        assert kwargs["start"] == _day(0)
+        assert kwargs["end"] == _day(21)
+
+    async def test_second_cycle_only_refetches_today(self, hub: ConnectionHub) -> None:
+        sonarr = self._sonarr()
+        collector = CalendarCollector(hub=hub, clients={"sonarr": sonarr}, interval=60.0)
+        await collector.collect()
+        await collector.collect()
+
+        ranges = [
+            (c.kwargs["start"], c.kwargs["end"])
+            for c in sonarr.get_calendar.call_args_list[1:]
+        ]
+        # Today, then the next unfilled chunk of the horizon.
+        assert ranges == [(_day(0), _day(1)), (_day(21), _day(35))]
+        # The cached future bucket is still served.
+        episodes = hub.get_snapshot("calendar")["data"]["episodes"]
+        assert [ep["id"] for ep in episodes] == [1]
+        assert sonarr.get_series.await_count == 1
+
+    async def test_refresh_invalidates_all_buckets(self, hub: ConnectionHub) -> None:
+        sonarr = self._sonarr()
+        collector = CalendarCollector(hub=hub, clients={"sonarr": sonarr}, interval=60.0)
+        await collector.collect()
+        collector.request_refresh()
+        await collector.collect()
+
+        kwargs = sonarr.get_calendar.call_args.kwargs
+        assert (kwargs["start"], kwargs["end"]) == (_day(0), _day(21))
+
+    async def test_event_only_invalidates_its_own_days(self, hub: ConnectionHub) -> None:
+        sonarr, sonarr_4k = self._sonarr(), self._sonarr()
+        collector = CalendarCollector(
+            hub=hub, clients={"sonarr": sonarr, "sonarr:4k": sonarr_4k}, interval=60.0
+        )
+        await collector.collect()
+        days = event_days({"action": "updated", "resource": {
+            "id": 1, "airDateUtc": f"{_day(4)}T02:00:00Z",
+        }})
+        collector.request_refresh(days=days, instance="sonarr")
+        await collector.collect()
+
+        def ranges(client: AsyncMock) -> list[tuple[str, str]]:
+            return [
+                (c.kwargs["start"], c.kwargs["end"])
+                for c in client.get_calendar.call_args_list[1:]
+            ]
+
+        assert ranges(sonarr) == [
+            (_day(0), _day(1)), (_day(4), _day(5)), (_day(21), _day(35)),
+        ]
+        assert ranges(sonarr_4k) == [(_day(0), _day(1)), (_day(21), _day(35))]
+
+    def test_event_days(self) -> None:
+        webhook = {"eventType": "Download", "episodes": [
+            {"airDateUtc": "2026-03-01T02:00:00Z"},
+            {"airDateUtc": "2026-03-02T02:00:00Z"},
+        ]}
+        assert event_days(webhook) == [date(2026, 3, 1), date(2026, 3, 2)]
+        movie = {"resource": {"inCinemas": "2026-04-10", "digitalRelease": "2026-05-01"}}
+        assert event_days(movie) == [date(2026, 4, 10), date(2026, 5, 1)]
+        assert event_days({"eventType": "SeriesAdd", "series": {"id": 7}}) is None
+        assert event_days(None) is None
+
+    async def test_unknown_series_reloads_cache(
+        self, hub: ConnectionHub, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        import app.collectors.calendar as calendar_module
+
+        monkeypatch.setattr(calendar_module, "SERIES_MISS_COOLDOWN", 0)
+        sonarr = self._sonarr()
+        sonarr.get_series = AsyncMock(side_effect=[
+            [],
+            [{"id": 7, "title": "Severance"}],
+        ])
+        collector = CalendarCollector(hub=hub, clients={"sonarr": sonarr}, interval=60.0)
+        await collector.collect()
+
+        ep = hub.get_snapshot("calendar")["data"]["episodes"][0]
+        assert ep["series"] == "Severance"
+        assert sonarr.get_series.await_count == 2
+
+    async def test_entries_dedupe_across_buckets(self, hub: ConnectionHub) -> None:
+        radarr = AsyncMock()
+        radarr.get_calendar = AsyncMock(return_value=[
+            {"id": 5, "title": "Arrival", "inCinemas": _day(1)},
+            {"id": 5, "title": "Arrival", "inCinemas": _day(1)},
+        ])
+        collector = CalendarCollector(hub=hub, clients={"radarr": radarr}, interval=60.0)
+        await collector.collect()
+
+        movies = hub.get_snapshot("calendar")["data"]["movies"]
+        assert [m["id"] for m in movies] == [5]
+
+
+class TestCalendarStore:
+    async def test_far_entries_are_queryable_but_not_broadcast(
+        self, hub: ConnectionHub
+    ) -> None:
+        radarr = AsyncMock()
+        radarr.get_calendar = AsyncMock(return_value=[
+            {"id": 1, "title": "Soon", "inCinemas": f"{_day(2)}T00:00:00Z"},
+            {"id": 2, "title": "Later", "inCinemas": f"{_day(12)}T00:00:00Z"},
+        ])
+        collector = CalendarCollector(hub=hub, clients={"radarr": radarr}, interval=60.0)
+        await collector.collect()
+
+        movies = hub.get_snapshot("calendar")["data"]["movies"]
+        assert [m["id"] for m in movies] == [1]
+
+        start = midnight(date.fromisoformat(_day(0)))
+        wide = collector.store.range("movies", start, start + 30 * DAY_SECONDS)
+        assert [m["id"] for m in wide] == [1, 2]
+
+    async def test_refetch_replaces_days(self, hub: ConnectionHub) -> None:
+        radarr = AsyncMock()
+        radarr.get_calendar = AsyncMock(return_value=[
+            {"id": 1, "title": "Moved", "inCinemas": f"{_day(0)}T20:00:00Z"},
+        ])
+        collector = CalendarCollector(hub=hub, clients={"radarr": radarr}, interval=60.0)
+        await collector.collect()
+        radarr.get_calendar.return_value = []
+        await collector.collect()
+
+        assert hub.get_snapshot("calendar")["data"]["movies"] == []
@@ -6,7 +6,7 @@ from unittest.mock import AsyncMock
 
 import pytest
 
-from app.collectors.downloads import DownloadsCollector
+from app.collectors.downloads import DownloadsCollector, parse_duration, parse_size
 from app.ws.hub import ConnectionHub
 
 
@@ -82,6 +82,140 @@ class TestDownloadsCollector:
         data = snapshot["data"]
 
         assert data["sabnzbd"]["speed"] == ""
+        assert data["sabnzbd"]["speed_bps"] == 0
         assert data["sabnzbd"]["items"] == []
         assert data["sonarr_queue"] == []
         assert data["radarr_queue"] == []
+
+    async def test_numeric_normalization(self, hub: ConnectionHub) -> None:
+        """Sizes, speeds and times are parsed into bytes, bytes/s and seconds."""
+        sabnzbd = AsyncMock()
+        sabnzbd.get_queue = AsyncMock(return_value={"queue": {
+            "speed": "10.0 M",
+            "kbpersec": "10240.00",
+            "sizeleft": "1.0 GB",
+            "mbleft": "1024.00",
+            "timeleft": "0:01:42",
+            "noofslots_total": 120,
+            "slots": [{
+                "filename": "a.mkv",
+                "mb": "2048.00",
+                "mbleft": "512.00",
+                "sizeleft": "512 MB",
+                "timeleft": "1:00:00:05",
+            }],
+        }})
+        collector = DownloadsCollector(hub=hub, clients={"sabnzbd": sabnzbd}, interval=5.0)
+        await collector.collect()
+
+        sab = hub.get_snapshot("downloads")["data"]["sabnzbd"]
+        assert sab["speed_bps"] == 10 * 1024 * 1024
+        assert sab["sizeleft_bytes"] == 1024**3
+        assert sab["timeleft_s"] == 102
+        assert sab["total_items"] == 120
+        assert sab["speed_ewma_bps"] == sab["speed_bps"]
+        assert sab["eta_ewma_s"] == 102
+        item = sab["items"][0]
+        assert item["size_bytes"] == 2 * 1024**3
+        assert item["sizeleft_bytes"] == 512 * 1024**2
+        assert item["timeleft_s"] == 86405
+        sabnzbd.get_queue.assert_any_await(start=0, limit=50)
+        # 120 slots: the rest of the queue is fetched for the list index.
+        sabnzbd.get_queue.assert_awaited_with(start=50, hedge=False)
+
+    async def test_speed_ewma_smooths_across_cycles(self, hub: ConnectionHub) -> None:
+        """A sudden speed drop moves the EWMA only part of the way."""
+        speeds = iter(["1000.0", "0.0"])
+        sabnzbd = AsyncMock()
+        sabnzbd.get_queue = AsyncMock(side_effect=lambda **_: {"queue": {
+            "kbpersec": next(speeds), "mbleft": "100.0", "slots": [],
+        }})
+        collector = DownloadsCollector(hub=hub, clients={"sabnzbd": sabnzbd}, interval=5.0)
+        await collector.collect()
+        collector._speed_at["sabnzbd"] -= 5  # pretend one 5s interval passed
+        await collector.collect()
+
+        sab = hub.get_snapshot("downloads")["data"]["sabnzbd"]
+        assert sab["speed_bps"] == 0
+        assert 0 < sab["speed_ewma_bps"] < 1000 * 1024
+        assert sab["eta_ewma_s"] is not None
+
+    async def test_aggregates_only_when_limit_zero(self, hub: ConnectionHub) -> None:
+        sabnzbd = AsyncMock()
+        sabnzbd.get_queue = AsyncMock(return_value={"queue": {"noofslots": 3, "slots": []}})
+        collector = DownloadsCollector(hub=hub, clients={"sabnzbd": sabnzbd}, interval=5.0)
+        collector.sab_item_limit = 0
+        await collector.collect()
+
+        sabnzbd.get_queue.assert_awaited_with(aggregates_only=True)
+        assert hub.get_snapshot("downloads")["data"]["sabnzbd"]["total_items"] == 3
+
+
+    async def test_backlog_past_first_page_is_indexed(self, hub: ConnectionHub) -> None:
+        """Listings page through the whole queue; the snapshot keeps one page."""
+        slots = [{"nzo_id": f"n{i}", "filename": f"f{i}.nzb"} for i in range(5)]
+
+        async def get_queue(start: int = 0, limit: int | None = None, **_):
+            page = slots[start:] if limit is None else slots[start:start + limit]
+            return {"queue": {"noofslots_total": len(slots), "slots": page}}
+
+        sabnzbd = AsyncMock()
+        sabnzbd.get_queue = AsyncMock(side_effect=get_queue)
+        collector = DownloadsCollector(hub=hub, clients={"sabnzbd": sabnzbd}, interval=5.0)
+        collector.sab_item_limit = 2
+        await collector.collect()
+
+        assert len(hub.get_snapshot("downloads")["data"]["sabnzbd"]["items"]) == 2
+        page = hub.get_index("downloads").query({"service": ["sabnzbd"]}, offset=2)
+        assert page["total"] == 5
+        assert [item["id"] for item in page["items"]] == ["n2", "n3", "n4"]
+
+        # Once the queue fits the first page, the stale backlog is ignored.
+        del slots[2:]
+        await collector.collect()
+        assert hub.get_index("downloads").query({"service": ["sabnzbd"]})["total"] == 2
+        assert sabnzbd.get_queue.await_count == 3
+
+
+class TestParsers:
+    def test_parse_size(self) -> None:
+        assert parse_size("1.5 GB") == int(1.5 * 1024**3)
+        assert parse_size("800 MB") == 800 * 1024**2
+        assert parse_size("10.5 M") == int(10.5 * 1024**2)
+        assert parse_size("10.5 MB/s") == int(10.5 * 1024**2)
+        assert parse_size("0 B") == 0
+        assert parse_size(42) == 42
+        assert parse_size("unknown") is None
+
+    def test_parse_duration(self) -> None:
+        assert parse_duration("0:05:30") == 330
+        assert parse_duration("00:05:30") == 330
+        assert parse_duration("2:00:00:00") == 172800
+        assert parse_duration("unknown") is None
+        assert parse_duration("") is None
+
+
+class TestDownloadInstances:
+    async def test_instances_are_merged_and_keyed(self, hub: ConnectionHub) -> None:
+        def arr(title: str) -> AsyncMock:
+            client = AsyncMock()
+            client.get_queue = AsyncMock(return_value={"records": [{"title": title}]})
+            return client
+
+        sab_4k = AsyncMock()
+        sab_4k.get_queue = AsyncMock(return_value={"queue": {"kbpersec": "1.0", "slots": []}})
+        collector = DownloadsCollector(
+            hub=hub,
+            clients={
+                "sonarr": arr("HD"), "sonarr:4k": arr("UHD"), "sabnzbd:4k": sab_4k,
+            },
+            interval=5.0,
+        )
+        await collector.collect()
+
+        data = hub.get_snapshot("downloads")["data"]
+        assert [(r["title"], r["instance"]) for r in data["sonarr_queue"]] == [
+            ("HD", "sonarr"), ("UHD", "sonarr:4k"),
+        ]
+        assert list(data["sabnzbd_instances"]) == ["sabnzbd:4k"]
+        assert data["sabnzbd"]["speed_bps"] == 1024
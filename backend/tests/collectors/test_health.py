@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import time
 from unittest.mock import AsyncMock
 
 import pytest
@@ -73,3 +74,98 @@ class TestHealthCollector:
         assert by_name["sonarr"]["status"] == "online"
         assert by_name["plex"]["status"] == "offline"
         assert by_name["plex"]["version"] == ""
+
+
+class TestTieredHealth:
+    def _client(self) -> AsyncMock:
+        client = AsyncMock()
+        client.get_system_status = AsyncMock(return_value={"version": "4.0.0"})
+        client.ping = AsyncMock(return_value=None)
+        client.last_success = None
+        client.last_failure = None
+        client.last_latency = None
+        return client
+
+    async def test_status_then_ping(self, hub: ConnectionHub) -> None:
+        """The full status call runs once per STATUS_INTERVAL; ping in between."""
+        sonarr = self._client()
+        collector = HealthCollector(hub=hub, clients={"sonarr": sonarr}, interval=30.0)
+        await collector.collect()
+        await collector.collect()
+
+        assert sonarr.get_system_status.await_count == 1
+        assert sonarr.ping.await_count == 1
+        service = hub.get_snapshot("health")["data"]["services"][0]
+        assert service["source"] == "probe"
+        assert service["version"] == "4.0.0"
+
+    async def test_recent_data_path_success_skips_probe(
+        self, hub: ConnectionHub
+    ) -> None:
+        sonarr = self._client()
+        collector = HealthCollector(hub=hub, clients={"sonarr": sonarr}, interval=30.0)
+        await collector.collect()
+
+        sonarr.last_success = time.monotonic()
+        sonarr.last_latency = 0.012
+        await collector.collect()
+
+        assert sonarr.ping.await_count == 0
+        service = hub.get_snapshot("health")["data"]["services"][0]
+        assert service["source"] == "passive"
+        assert service["status"] == "online"
+        assert service["response_ms"] == 12
+
+    async def test_failure_after_success_forces_probe(self, hub: ConnectionHub) -> None:
+        sonarr = self._client()
+        collector = HealthCollector(hub=hub, clients={"sonarr": sonarr}, interval=30.0)
+        await collector.collect()
+
+        sonarr.last_success = time.monotonic() - 5
+        sonarr.last_failure = time.monotonic()
+        sonarr.ping.side_effect = ConnectionError("down")
+        await collector.collect()
+
+        service = hub.get_snapshot("health")["data"]["services"][0]
+        assert service["status"] == "offline"
+        assert service["source"] == "probe"
+
+
+class TestStreamingHealth:
+    async def test_fast_services_publish_before_slow_ones(
+        self, hub: ConnectionHub, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        import asyncio
+
+        import app.collectors.health as health_module
+
+        monkeypatch.setattr(health_module, "CHECK_TIMEOUT", 0.2)
+        fast = AsyncMock()
+        fast.get_system_status = AsyncMock(return_value={"version": "1"})
+        hung = AsyncMock()
+
+        async def never() -> None:
+            await asyncio.sleep(10)
+
+        hung.get_system_status = AsyncMock(side_effect=never)
+
+        seen: list[list[str]] = []
+        original = hub.broadcast
+
+        async def spy(msg_type: str, data: dict) -> None:
+            seen.append([s["name"] for s in data["services"]])
+            await original(msg_type, data)
+
+        monkeypatch.setattr(hub, "broadcast", spy)
+        collector = HealthCollector(
+            hub=hub, clients={"hung": hung, "fast": fast}, interval=30.0
+        )
+        await collector.collect()
+
+        # The fast result went out alone, before the hung check timed out.
+        assert seen == [["fast"], ["hung", "fast"]]
+        services = {s["name"]: s for s in hub.get_snapshot("health")["data"]["services"]}
+        assert services["fast"]["status"] == "online"
+        assert services["hung"]["status"] == "offline"
+        assert services["hung"]["response_ms"] == 200
+        assert "checked_at" in services["fast"]
@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 from unittest.mock import AsyncMock
 
 import pytest
 
 from app.collectors.streaming import StreamingCollector
+from app.services.plex import PlexClient
+from app.session_history import SessionHistory
 from app.ws.hub import ConnectionHub
+from websockets.asyncio.server import serve
 
 
 @pytest.fixture
@@ -81,3 +86,129 @@ class TestStreamingCollector:
         assert data["stream_count"] == 0
         assert data["transcode_count"] == 0
         assert data["sessions"] == []
+
+
+def _session(key: str, title: str, state: str = "playing") -> dict:
+    return {
+        "sessionKey": key,
+        "User": {"title": "alice"},
+        "title": title,
+        "Player": {"state": state},
+        "Media": [{"Part": [{"decision": "directplay"}]}],
+    }
+
+
+def _playing(key: str, state: str) -> dict:
+    return {
+        "type": "playing",
+        "PlaySessionStateNotification": [{"sessionKey": key, "state": state}],
+    }
+
+
+class TestStreamingNotifications:
+    async def _collector(self, hub: ConnectionHub) -> StreamingCollector:
+        plex = AsyncMock()
+        plex.get_sessions = AsyncMock(return_value=[
+            _session("1", "Pilot"), _session("2", "Ozymandias"),
+        ])
+        collector = StreamingCollector(hub=hub, clients={"plex": plex}, interval=5.0)
+        await collector.collect()
+        return collector
+
+    async def test_state_change_updates_in_place(self, hub: ConnectionHub) -> None:
+        collector = await self._collector(hub)
+        before = hub.get_snapshot("streaming")["data"]["sessions"]
+
+        await collector.handle_notification(_playing("1", "paused"))
+
+        sessions = hub.get_snapshot("streaming")["data"]["sessions"]
+        assert sessions[0]["state"] == "paused"
+        assert collector.clients["plex"].get_sessions.await_count == 1
+        # The previous snapshot is left alone, so the index sees the change.
+        assert before[0]["state"] == "playing"
+        assert hub.get_index("streaming").query({"status": ["paused"]})["total"] == 1
+
+    async def test_stop_removes_session(self, hub: ConnectionHub) -> None:
+        collector = await self._collector(hub)
+
+        await collector.handle_notification(_playing("2", "stopped"))
+
+        data = hub.get_snapshot("streaming")["data"]
+        assert data["stream_count"] == 1
+        assert [s["title"] for s in data["sessions"]] == ["Pilot"]
+
+    async def test_published_sessions_feed_history(self, hub: ConnectionHub) -> None:
+        history = SessionHistory(":memory:")
+        plex = AsyncMock()
+        plex.get_sessions = AsyncMock(return_value=[_session("1", "Pilot")])
+        collector = StreamingCollector(
+            hub=hub, clients={"plex": plex}, interval=5.0, history=history
+        )
+        await collector.collect()
+
+        assert list(history._open) == [("plex", "1")]
+        await history.close()
+
+    async def test_unknown_session_requests_refresh(self, hub: ConnectionHub) -> None:
+        collector = await self._collector(hub)
+
+        await collector.handle_notification(_playing("99", "playing"))
+
+        assert collector._wake.is_set()
+
+    async def test_push_triggers_refresh_end_to_end(self, hub: ConnectionHub) -> None:
+        """A new stream pushed over the fake socket appears without waiting a poll."""
+        release = asyncio.Event()
+
+        async def handler(ws) -> None:
+            await release.wait()
+            await ws.send(json.dumps({"NotificationContainer": _playing("3", "playing")}))
+            await ws.wait_closed()
+
+        async with serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            plex = PlexClient(f"http://127.0.0.1:{port}", token="tok")
+            sessions = [[_session("1", "Pilot")], [_session("1", "Pilot"), _session("3", "New")]]
+            plex.get_sessions = AsyncMock(side_effect=lambda: sessions[0])
+            collector = StreamingCollector(
+                hub=hub, clients={"plex": plex}, interval=30.0, push_interval=300.0,
+            )
+            collector.refresh_debounce = 0.01
+            collector.start()
+            for _ in range(100):
+                if collector.current_interval == 300.0:
+                    break
+                await asyncio.sleep(0.01)
+            assert collector.current_interval == 300.0
+
+            sessions.pop(0)
+            release.set()
+            for _ in range(200):
+                snapshot = hub.get_snapshot("streaming")
+                if snapshot and snapshot["data"]["stream_count"] == 2:
+                    break
+                await asyncio.sleep(0.01)
+            await collector.stop()
+
+        assert hub.get_snapshot("streaming")["data"]["stream_count"] == 2
+
+
+class TestStreamingInstances:
+    async def test_sessions_per_instance(self, hub: ConnectionHub) -> None:
+        home, office = AsyncMock(), AsyncMock()
+        home.get_sessions = AsyncMock(return_value=[_session("1", "Pilot")])
+        office.get_sessions = AsyncMock(return_value=[_session("1", "Finale")])
+        collector = StreamingCollector(
+            hub=hub, clients={"plex": home, "plex:office": office}, interval=5.0
+        )
+        await collector.collect()
+
+        # Same sessionKey on two servers: stopping one leaves the other.
+        await collector.handle_notification(_playing("1", "stopped"), "plex:office")
+
+        data = hub.get_snapshot("streaming")["data"]
+        assert [(s["title"], s["instance"]) for s in data["sessions"]] == [
+            ("Pilot", "plex"),
+        ]
+        assert data["instances"]["plex:office"]["stream_count"] == 0
+        assert data["stream_count"] == 1
@@ -6,7 +6,7 @@ from unittest.mock import AsyncMock
 
 import pytest
 
-from app.collectors.transcoding import TranscodingCollector
+from app.collectors.transcoding import NodeThroughput, TranscodingCollector
 from app.ws.hub import ConnectionHub
 
 
@@ -22,7 +22,19 @@ class TestTranscodingCollector:
         tdarr.get_nodes = AsyncMock(return_value={
             "node1": {
                 "nodeName": "Server-Node",
-                "workers": {"transcoderWorkers": 2},
+                "workers": {
+                    "w1": {
+                        "file": "/media/a.mkv",
+                        "percentage": "42.5",
+                        "fps": 88,
+                        "ETA": "0:10:05",
+                        "workerType": "transcodegpu",
+                        "status": "Processing",
+                        "sourcefileSizeInGbytes": 2,
+                        "job": {"huge": "payload"},
+                    },
+                    "stale": None,
+                },
             },
         })
         tdarr.get_staged_files = AsyncMock(return_value=[
@@ -50,7 +62,21 @@ class TestTranscodingCollector:
         assert len(data["nodes"]) == 1
         assert data["nodes"][0]["id"] == "node1"
         assert data["nodes"][0]["name"] == "Server-Node"
-        assert data["nodes"][0]["workers"] == {"transcoderWorkers": 2}
+        assert data["nodes"][0]["workers"] == [{
+            "id": "w1",
+            "file": "/media/a.mkv",
+            "status": "Processing",
+            "type": "transcodegpu",
+            "percentage": 42.5,
+            "fps": 88.0,
+            "eta": "0:10:05",
+            "eta_s": 605,
+            "size_bytes": 2 * 1024**3,
+        }]
+        assert data["nodes"][0]["throughput"] == {
+            "files_per_hour": 0.0, "bytes_per_hour": 0.0, "fps": 0.0,
+        }
+        assert data["throughput"]["files_per_hour"] == 0.0
 
         assert data["queue_size"] == 3
         assert data["total_files"] == 1500
@@ -75,3 +101,121 @@ class TestTranscodingCollector:
         assert data["total_files"] == 0
         assert data["total_transcodes"] == 0
         assert data["size_diff_bytes"] == 0
+        assert data["throughput"]["fps"] == 0.0
+
+
+def _tdarr(workers: dict) -> AsyncMock:
+    tdarr = AsyncMock()
+    tdarr.get_nodes = AsyncMock(return_value={
+        "node1": {"nodeName": "Server-Node", "workers": workers},
+    })
+    tdarr.get_staged_files = AsyncMock(return_value=[{"_id": "file1"}])
+    tdarr.get_statistics = AsyncMock(return_value={"totalFileCount": 10})
+    return tdarr
+
+
+class TestSubResourceCadence:
+    async def test_only_due_resources_are_refetched(self, hub: ConnectionHub) -> None:
+        tdarr = _tdarr({})
+        collector = TranscodingCollector(hub=hub, clients={"tdarr": tdarr}, interval=10.0)
+        await collector.collect()
+        await collector.collect()
+
+        assert tdarr.get_nodes.await_count == 1
+        assert tdarr.get_staged_files.await_count == 1
+        assert tdarr.get_statistics.await_count == 1
+
+        # Nodes fall due first, then staged; statistics stay cached.
+        collector.resources["tdarr.nodes"].fetched_at -= 10
+        collector.resources["tdarr.staged"].fetched_at -= 30
+        await collector.collect()
+        assert tdarr.get_nodes.await_count == 2
+        assert tdarr.get_staged_files.await_count == 2
+        assert tdarr.get_statistics.await_count == 1
+
+        data = hub.get_snapshot("transcoding")["data"]
+        assert data["total_files"] == 10
+        assert set(data["ages"]) == {
+            "nodes", "queue_size", "total_files", "total_transcodes", "size_diff_bytes",
+        }
+        assert data["ages"]["total_files"] >= 0
+
+    async def test_nodes_poll_faster_while_transcoding(self, hub: ConnectionHub) -> None:
+        idle = TranscodingCollector(hub=hub, clients={"tdarr": _tdarr({})}, interval=10.0)
+        busy = TranscodingCollector(
+            hub=hub, clients={"tdarr": _tdarr({"w1": {"percentage": 40}})}, interval=10.0
+        )
+        await idle.collect()
+        await busy.collect()
+
+        assert idle.resources["tdarr.nodes"].period == 10.0
+        assert busy.resources["tdarr.nodes"].period == 3
+        assert 2.5 < busy._next_wait() <= 3
+
+    async def test_failed_resource_keeps_last_value(self, hub: ConnectionHub) -> None:
+        tdarr = _tdarr({})
+        collector = TranscodingCollector(hub=hub, clients={"tdarr": tdarr}, interval=10.0)
+        await collector.collect()
+
+        tdarr.get_staged_files.side_effect = RuntimeError("boom")
+        collector.request_refresh()
+        await collector.collect()
+
+        data = hub.get_snapshot("transcoding")["data"]
+        assert data["queue_size"] == 1
+        assert tdarr.get_statistics.await_count == 2
+
+
+def _worker(file: str, pct: float, fps: float = 0.0, size: int | None = 100) -> dict:
+    return {"id": "w1", "file": file, "percentage": pct, "fps": fps, "size_bytes": size}
+
+
+class TestNodeThroughput:
+    def test_credits_progress_between_updates(self) -> None:
+        tracker = NodeThroughput(window=900)
+        # Progress made before the first look is not credited.
+        tracker.update([_worker("/a", 50, fps=30)], now=0)
+        assert tracker.summary()["files_per_hour"] == 0.0
+
+        tracker.update([_worker("/a", 100, fps=30)], now=60)
+        tracker.update([_worker("/b", 50, fps=60)], now=120)
+        summary = tracker.summary()
+        # 0.5 of /a and 0.5 of /b in two minutes.
+        assert summary["files_per_hour"] == pytest.approx(30.0)
+        assert summary["bytes_per_hour"] == pytest.approx(3000.0)
+        assert summary["fps"] == pytest.approx(45.0)
+
+    def test_old_samples_leave_the_window(self) -> None:
+        tracker = NodeThroughput(window=100)
+        tracker.update([_worker("/a", 0, fps=10)], now=0)
+        tracker.update([_worker("/a", 100, fps=10)], now=50)
+        assert tracker.summary()["files_per_hour"] == pytest.approx(72.0)
+
+        tracker.update([], now=200)
+        assert tracker.summary() == {
+            "files_per_hour": 0.0, "bytes_per_hour": 0.0, "fps": 0.0,
+        }
+
+    async def test_collector_tracks_nodes_across_fetches(self, hub: ConnectionHub) -> None:
+        tdarr = _tdarr({"w1": {"file": "/a.mkv", "percentage": 10, "fps": 25}})
+        collector = TranscodingCollector(hub=hub, clients={"tdarr": tdarr}, interval=10.0)
+        await collector.collect()
+
+        tdarr.get_nodes.return_value = {
+            "node1": {"nodeName": "Server-Node", "workers": {
+                "w1": {"file": "/a.mkv", "percentage": 60, "fps": 25},
+            }},
+        }
+        collector.resources["tdarr.nodes"].fetched_at -= 10
+        await collector.collect()
+
+        data = hub.get_snapshot("transcoding")["data"]
+        node = data["nodes"][0]
+        assert node["throughput"]["files_per_hour"] > 0
+        assert node["throughput"]["fps"] == pytest.approx(25.0)
+        assert data["throughput"] == node["throughput"]
+
+        tdarr.get_nodes.return_value = {}
+        collector.resources["tdarr.nodes"].fetched_at -= 10
+        await collector.collect()
+        assert collector._throughput == {}
@@ -59,6 +59,44 @@ class TestSonarrClient:
         request = route.calls[0].request
         assert request.url.params["start"] == "2026-01-01"
         assert request.url.params["end"] == "2026-01-31"
+        assert request.url.params["includeSeries"] == "true"
+
+        await client.close()
+
+    @respx.mock
+    async def test_get_calendar_without_series(self, client: SonarrClient) -> None:
+        route = respx.get("http://localhost:8989/api/v3/calendar").mock(
+            return_value=httpx.Response(200, json=[])
+        )
+
+        await client.get_calendar(include_series=False)
+
+        assert route.calls[0].request.url.params["includeSeries"] == "false"
+
+        await client.close()
+
+    @respx.mock
+    async def test_get_series(self, client: SonarrClient) -> None:
+        route = respx.get("http://localhost:8989/api/v3/series").mock(
+            return_value=httpx.Response(200, json=[{"id": 3, "title": "Andor"}])
+        )
+
+        result = await client.get_series()
+
+        assert result == [{"id": 3, "title": "Andor"}]
+        assert route.called
+
+        await client.close()
+
+    @respx.mock
+    async def test_ping_uses_root_endpoint(self, client: SonarrClient) -> None:
+        route = respx.get("http://localhost:8989/ping").mock(
+            return_value=httpx.Response(200, json={"status": "OK"})
+        )
+
+        await client.ping()
+
+        assert route.called
 
         await client.close()
 
@@ -2,11 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
+import time
+
 import httpx
 import pytest
 import respx
 
+import app.services.base as base_module
+from app.perf import perf_stats
 from app.services.base import BaseClient
+from app.services.budget import RatioBudget
+from app.services.deadline import DeadlineExceeded, deadline
+from app.services.schema import Fields, Schema
 
 
 class ConcreteClient(BaseClient):
@@ -18,6 +26,13 @@ class ConcreteClient(BaseClient):
         return f"{self._base_url}/api/{endpoint}"
 
 
+@pytest.fixture(autouse=True)
+def fresh_retry_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        base_module, "retry_budget", RatioBudget(base_module.RETRY_RATIO, reserve=10)
+    )
+
+
 @pytest.fixture
 def client():
     return ConcreteClient(
@@ -95,3 +110,322 @@ class TestBaseClient:
         assert result is False
 
         await client.close()
+
+    @respx.mock
+    async def test_request_records_latency(self, client: ConcreteClient) -> None:
+        """Each attempt is recorded under the service:endpoint key."""
+        respx.get("http://localhost:8989/api/latency-probe").mock(
+            side_effect=[
+                httpx.ConnectError("Connection refused"),
+                httpx.Response(200, json={"ok": True}),
+            ]
+        )
+
+        await client.get("latency-probe")
+
+        window = perf_stats.get("upstream_seconds", "test-service:latency-probe")
+        assert window is not None
+        assert window.count == 2
+        # Only the successful attempt counts towards the hedge delay.
+        assert perf_stats.get("upstream_ok_seconds", "test-service:latency-probe").count == 1
+
+        await client.close()
+
+    @respx.mock
+    async def test_tracks_last_success_and_failure(
+        self, client: ConcreteClient
+    ) -> None:
+        respx.get("http://localhost:8989/api/ok").mock(
+            return_value=httpx.Response(200, json={})
+        )
+        respx.get("http://localhost:8989/api/broken").mock(
+            return_value=httpx.Response(500)
+        )
+        assert client.last_success is None
+
+        await client.get("ok")
+        assert client.last_success is not None
+        assert client.last_latency is not None
+        assert client.last_failure is None
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get("broken")
+        assert client.last_failure >= client.last_success
+
+        await client.close()
+
+
+class TestHedging:
+    @pytest.fixture(autouse=True)
+    def fresh_budget(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(base_module, "hedge_budget", RatioBudget(0.05))
+
+    def _seed(self, label: str, seconds: float = 0.01) -> None:
+        for _ in range(base_module.HEDGE_MIN_SAMPLES):
+            perf_stats.observe("upstream_ok_seconds", f"test-service:{label}", seconds)
+
+    @respx.mock
+    async def test_slow_primary_is_hedged(self, client: ConcreteClient) -> None:
+        self._seed("hedge-slow")
+        calls = 0
+
+        async def respond(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(5)
+            return httpx.Response(200, json={"call": calls})
+
+        respx.get("http://localhost:8989/api/hedge-slow").mock(side_effect=respond)
+
+        start = time.perf_counter()
+        result = await client.get("hedge-slow", hedge=True)
+
+        assert result == {"call": 2}
+        assert time.perf_counter() - start < 1
+        assert calls == 2
+
+        await client.close()
+
+    @respx.mock
+    async def test_no_hedge_without_budget(
+        self, client: ConcreteClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(base_module, "hedge_budget", RatioBudget(0.05, reserve=0))
+        self._seed("hedge-broke")
+        calls = 0
+
+        async def respond(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={})
+
+        respx.get("http://localhost:8989/api/hedge-broke").mock(side_effect=respond)
+
+        await client.get("hedge-broke", hedge=True)
+
+        assert calls == 1
+
+        await client.close()
+
+    @respx.mock
+    async def test_no_hedge_until_enough_samples(self, client: ConcreteClient) -> None:
+        calls = 0
+
+        async def respond(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={})
+
+        respx.get("http://localhost:8989/api/hedge-cold").mock(side_effect=respond)
+
+        await client.get("hedge-cold", hedge=True)
+
+        assert calls == 1
+
+        await client.close()
+
+
+    @respx.mock
+    async def test_cancelled_caller_cancels_the_request(self, client: ConcreteClient) -> None:
+        self._seed("hedge-cancel", seconds=5)
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def respond(request: httpx.Request) -> httpx.Response:
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return httpx.Response(200, json={})
+
+        respx.get("http://localhost:8989/api/hedge-cancel").mock(side_effect=respond)
+
+        caller = asyncio.ensure_future(client.get("hedge-cancel", hedge=True))
+        await started.wait()
+        caller.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert caller.cancelled()
+        await client.close()
+
+
+class TestRateLimiting:
+    @respx.mock
+    async def test_429_honours_retry_after(self, client: ConcreteClient) -> None:
+        route = respx.get("http://localhost:8989/api/series").mock(
+            side_effect=[
+                httpx.Response(429, headers={"Retry-After": "0.05"}),
+                httpx.Response(200, json={"ok": True}),
+            ]
+        )
+
+        start = time.monotonic()
+        result = await client.get("series")
+
+        assert result == {"ok": True}
+        assert route.call_count == 2
+        assert time.monotonic() - start >= 0.05
+        # Halved by the 429, then nudged back up by the success.
+        assert client._bucket.rate < base_module.DEFAULT_RATE
+        await client.close()
+
+    @respx.mock
+    async def test_persistent_429_raises(self, client: ConcreteClient) -> None:
+        respx.get("http://localhost:8989/api/series").mock(
+            return_value=httpx.Response(429, headers={"Retry-After": "0"})
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get("series")
+        await client.close()
+
+    @respx.mock
+    async def test_long_retry_after_is_not_waited_out(self) -> None:
+        client = ConcreteClient("http://localhost:8989", retry_base_delay=0.01)
+        route = respx.get("http://localhost:8989/api/series").mock(
+            return_value=httpx.Response(429, headers={"Retry-After": "3600"})
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await asyncio.wait_for(client.get("series"), timeout=1)
+        assert route.call_count == 1
+        await client.close()
+
+
+class TestRetryPolicy:
+    @respx.mock
+    async def test_gets_retry_5xx_and_timeouts(self, client: ConcreteClient) -> None:
+        route = respx.get("http://localhost:8989/api/flaky").mock(
+            side_effect=[
+                httpx.Response(503),
+                httpx.ReadTimeout("slow"),
+                httpx.Response(200, json={"ok": True}),
+            ]
+        )
+
+        assert await client.get("flaky") == {"ok": True}
+        assert route.call_count == 3
+        await client.close()
+
+    @respx.mock
+    async def test_posts_do_not_retry_5xx(self, client: ConcreteClient) -> None:
+        route = respx.post("http://localhost:8989/api/command").mock(
+            return_value=httpx.Response(503)
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.post("command", json={})
+        assert route.call_count == 1
+        await client.close()
+
+    @respx.mock
+    async def test_retry_budget_caps_retries(
+        self, client: ConcreteClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(base_module, "retry_budget", RatioBudget(0.1, reserve=0))
+        route = respx.get("http://localhost:8989/api/down").mock(
+            return_value=httpx.Response(502)
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get("down")
+        assert route.call_count == 1
+        await client.close()
+
+
+class TestDeadlines:
+    @respx.mock
+    async def test_attempt_timeout_follows_deadline(self, client: ConcreteClient) -> None:
+        route = respx.get("http://localhost:8989/api/series").mock(
+            return_value=httpx.Response(200, json=[])
+        )
+
+        with deadline(2.0):
+            await client.get("series")
+
+        timeout = route.calls[0].request.extensions["timeout"]
+        assert 0 < timeout["read"] <= 2.0
+        await client.close()
+
+    @respx.mock
+    async def test_expired_deadline_sends_nothing(self, client: ConcreteClient) -> None:
+        route = respx.get("http://localhost:8989/api/series").mock(
+            return_value=httpx.Response(200, json=[])
+        )
+
+        with deadline(0), pytest.raises(DeadlineExceeded):
+            await client.get("series")
+        assert not route.called
+        await client.close()
+
+    @respx.mock
+    async def test_no_retry_past_deadline(self) -> None:
+        client = ConcreteClient("http://localhost:8989", retry_base_delay=10)
+        route = respx.get("http://localhost:8989/api/series").mock(
+            side_effect=httpx.ConnectError("refused")
+        )
+
+        start = time.monotonic()
+        with deadline(0.5), pytest.raises(httpx.ConnectError):
+            await client.get("series")
+        # A retry would only fit if the jittered backoff came out tiny.
+        assert route.call_count <= 2
+        assert time.monotonic() - start < 0.5
+        await client.close()
+
+    @respx.mock
+    async def test_retry_after_past_deadline_is_not_retried(
+        self, client: ConcreteClient
+    ) -> None:
+        route = respx.get("http://localhost:8989/api/series").mock(
+            return_value=httpx.Response(429, headers={"Retry-After": "5"})
+        )
+
+        start = time.monotonic()
+        with deadline(0.5), pytest.raises(httpx.HTTPStatusError):
+            await client.get("series")
+        assert route.call_count == 1
+        assert time.monotonic() - start < 0.5
+        await client.close()
+
+    @respx.mock
+    async def test_bucket_wait_is_capped_by_deadline(self, client: ConcreteClient) -> None:
+        route = respx.get("http://localhost:8989/api/series").mock(
+            return_value=httpx.Response(200, json=[])
+        )
+        client._bucket.throttle(5)
+
+        start = time.monotonic()
+        with deadline(0.2), pytest.raises(DeadlineExceeded):
+            await client.get("series")
+        assert not route.called
+        assert time.monotonic() - start < 0.2
+        await client.close()
+
+
+
+
+class TestFieldSpecs:
+    @respx.mock
+    async def test_declared_endpoint_is_decoded_slim(self) -> None:
+        class SlimClient(ConcreteClient):
+            field_specs = {"series": Schema([Fields("id", "title")])}
+
+        client = SlimClient(base_url="http://localhost:8989")
+        body = [{"id": 1, "title": "Andor", "overview": "z" * 100}]
+        respx.get("http://localhost:8989/api/series").mock(
+            return_value=httpx.Response(200, json=body)
+        )
+        respx.get("http://localhost:8989/api/episode").mock(
+            return_value=httpx.Response(200, json=body)
+        )
+
+        assert await client.get("series") == [{"id": 1, "title": "Andor"}]
+        # Endpoints without a spec are decoded in full.
+        assert await client.get("episode") == body
+        await client.close()
@@ -0,0 +1,27 @@
+"""Tests for RatioBudget."""
+
+from __future__ import annotations
+
+from app.services.budget import RatioBudget
+
+
+class TestRatioBudget:
+    def test_extras_limited_to_ratio(self) -> None:
+        budget = RatioBudget(0.05, reserve=0)
+        allowed = 0
+        for _ in range(200):
+            budget.deposit()
+            if budget.try_withdraw():
+                allowed += 1
+        assert allowed == 10
+
+    def test_reserve_allows_an_early_extra(self) -> None:
+        budget = RatioBudget(0.05)
+        assert budget.try_withdraw() is True
+        assert budget.try_withdraw() is False
+
+    def test_balance_is_capped(self) -> None:
+        budget = RatioBudget(0.5, reserve=0, cap=2)
+        for _ in range(100):
+            budget.deposit()
+        assert budget.balance == 2
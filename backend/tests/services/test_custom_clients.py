@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
 import httpx
 import pytest
 import respx
+from websockets.asyncio.server import serve
 
 from app.services.plex import PlexClient
 from app.services.sabnzbd import SABnzbdClient
@@ -69,6 +74,33 @@ class TestPlexClient:
 
         await client.close()
 
+    async def test_listen_notifications(self) -> None:
+        """Notification containers from the fake socket are yielded in order."""
+        seen_paths: list[str] = []
+
+        async def handler(ws) -> None:
+            seen_paths.append(ws.request.path)
+            await ws.send(json.dumps({"NotificationContainer": {
+                "type": "playing",
+                "PlaySessionStateNotification": [{"sessionKey": "1", "state": "paused"}],
+            }}))
+            await ws.send("not json")
+            await ws.send(json.dumps({"NotificationContainer": {
+                "type": "transcodeSession.end",
+            }}))
+
+        async with serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            client = PlexClient(f"http://127.0.0.1:{port}", token="tok")
+            connected = asyncio.Event()
+            received = [
+                c async for c in client.listen_notifications(on_connect=connected.set)
+            ]
+
+        assert connected.is_set()
+        assert [c["type"] for c in received] == ["playing", "transcodeSession.end"]
+        assert seen_paths[0] == "/:/websockets/notifications?X-Plex-Token=tok"
+
 
 # ---------------------------------------------------------------------------
 # SABnzbd
@@ -100,6 +132,45 @@ class TestSABnzbdClient:
 
         await client.close()
 
+    @respx.mock
+    async def test_get_queue_paginated(self, client: SABnzbdClient) -> None:
+        """start/limit are passed through as query params."""
+        route = respx.get("http://localhost:8080/api").mock(
+            return_value=httpx.Response(200, json={"queue": {"slots": []}})
+        )
+
+        await client.get_queue(start=10, limit=25)
+
+        params = route.calls[0].request.url.params
+        assert params["start"] == "10"
+        assert params["limit"] == "25"
+
+        await client.close()
+
+    async def test_get_queue_hedging_is_optional(self, client: SABnzbdClient) -> None:
+        client.get = AsyncMock(return_value={"queue": {"slots": []}})
+
+        await client.get_queue()
+        assert client.get.await_args.kwargs["hedge"] is True
+        await client.get_queue(start=50, hedge=False)
+        assert client.get.await_args.kwargs["hedge"] is False
+
+    @respx.mock
+    async def test_get_queue_aggregates_only(self, client: SABnzbdClient) -> None:
+        """Aggregates-only asks for the smallest page and drops the slots."""
+        route = respx.get("http://localhost:8080/api").mock(
+            return_value=httpx.Response(200, json={
+                "queue": {"mbleft": "10.0", "slots": [{"nzo_id": "a"}]},
+            })
+        )
+
+        result = await client.get_queue(aggregates_only=True)
+
+        assert route.calls[0].request.url.params["limit"] == "1"
+        assert result == {"queue": {"mbleft": "10.0", "slots": []}}
+
+        await client.close()
+
     @respx.mock
     async def test_api_key_in_params(self, client: SABnzbdClient) -> None:
         """Every SABnzbd call must include apikey and output=json in query params."""
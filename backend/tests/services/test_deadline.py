@@ -0,0 +1,21 @@
+"""Tests for per-cycle request deadlines."""
+
+from __future__ import annotations
+
+from app.services.deadline import deadline, remaining, request_deadline
+
+
+class TestDeadline:
+    def test_no_deadline_by_default(self) -> None:
+        assert remaining() is None
+
+    def test_nested_scope_cannot_extend(self) -> None:
+        with deadline(1.0):
+            outer = request_deadline.get()
+            with deadline(60.0):
+                assert request_deadline.get() == outer
+            with deadline(0.5):
+                left = remaining()
+                assert left is not None and left <= 0.5
+            assert request_deadline.get() == outer
+        assert request_deadline.get() is None
@@ -0,0 +1,66 @@
+"""Tests for the priority-aware upstream limiter."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.services.limiter import Priority, PriorityLimiter
+
+
+class TestPriorityLimiter:
+    async def test_limits_concurrency(self) -> None:
+        limiter = PriorityLimiter(2)
+        running = peak = 0
+
+        async def work() -> None:
+            nonlocal running, peak
+            async with limiter.slot(Priority.REALTIME):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(work() for _ in range(6)))
+
+        assert peak == 2
+        assert limiter.active == 0
+
+    async def test_waiters_admitted_by_priority(self) -> None:
+        limiter = PriorityLimiter(1)
+        order: list[str] = []
+        await limiter.acquire(Priority.REALTIME)
+
+        async def wait(name: str, priority: Priority) -> None:
+            async with limiter.slot(priority):
+                order.append(name)
+
+        tasks = [
+            asyncio.create_task(wait("calendar", Priority.BACKGROUND)),
+            asyncio.create_task(wait("health", Priority.HEALTH)),
+            asyncio.create_task(wait("rest", Priority.INTERACTIVE)),
+            asyncio.create_task(wait("calendar-2", Priority.BACKGROUND)),
+        ]
+        await asyncio.sleep(0)
+        assert limiter.waiting == 4
+
+        limiter.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["rest", "health", "calendar", "calendar-2"]
+        assert limiter.active == 0
+
+    async def test_cancelled_waiter_gives_up_its_place(self) -> None:
+        limiter = PriorityLimiter(1)
+        await limiter.acquire(Priority.REALTIME)
+        waiter = asyncio.create_task(limiter.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+
+        assert limiter.active == 0
+        assert limiter.waiting == 0
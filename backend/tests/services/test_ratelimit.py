@@ -0,0 +1,73 @@
+"""Tests for the adaptive TokenBucket."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+from app.services.ratelimit import TokenBucket, parse_retry_after
+
+
+class TestTokenBucket:
+    async def test_burst_then_paced(self) -> None:
+        bucket = TokenBucket(rate=50, burst=3)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        # Three free tokens, then two refills at 50/s.
+        assert 0.03 <= elapsed < 0.2
+
+    async def test_throttle_pauses_and_halves_rate(self) -> None:
+        bucket = TokenBucket(rate=100, burst=10)
+        bucket.throttle(0.05)
+
+        assert bucket.rate == 50
+        assert 0 < bucket.blocked_for <= 0.05
+        start = time.monotonic()
+        await bucket.acquire()
+        assert time.monotonic() - start >= 0.05
+
+    async def test_relax_recovers_towards_limit(self) -> None:
+        bucket = TokenBucket(rate=100, burst=10)
+        for _ in range(10):
+            bucket.throttle(0)
+        assert bucket.rate == 100 / 16
+
+        for _ in range(100):
+            bucket.relax()
+        assert bucket.rate == 100
+
+    async def test_waiting_does_not_block_other_buckets(self) -> None:
+        slow = TokenBucket(rate=100, burst=1)
+        slow.throttle(1.0)
+        fast = TokenBucket(rate=100, burst=1)
+        waiter = asyncio.ensure_future(slow.acquire())
+
+        await asyncio.wait_for(fast.acquire(), timeout=0.1)
+        assert not waiter.done()
+        waiter.cancel()
+
+    async def test_acquire_gives_up_past_max_wait(self) -> None:
+        bucket = TokenBucket(rate=100, burst=1)
+        bucket.throttle(1.0)
+
+        start = time.monotonic()
+        assert await bucket.acquire(max_wait=0.1) is False
+        assert time.monotonic() - start < 0.1
+        assert await bucket.acquire(max_wait=2.0) is True
+
+
+class TestParseRetryAfter:
+    def test_seconds(self) -> None:
+        assert parse_retry_after("7") == 7.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+    def test_http_date(self) -> None:
+        when = datetime.now(timezone.utc) + timedelta(seconds=30)
+        delay = parse_retry_after(format_datetime(when, usegmt=True))
+        assert delay is not None and 25 < delay <= 30
@@ -0,0 +1,68 @@
+"""Tests for declarative field-spec decoding."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import app.services.schema as schema_module
+from app.services.schema import Each, Fields, Schema, project
+
+SPEC = Fields(
+    "id",
+    User=Fields("title"),
+    Media=[Fields(Part=[Fields("decision")])],
+    workers=Each(Fields("fps")),
+)
+
+PAYLOAD = {
+    "id": 7,
+    "summary": "x" * 100,
+    "User": {"title": "alice", "thumb": "https://plex.tv/u"},
+    "Media": [{"bitrate": 8000, "Part": [{"decision": "transcode", "Stream": [{"id": 1}]}]}],
+    "workers": {"w1": {"fps": 42.0, "file": "/a.mkv"}},
+}
+
+EXPECTED = {
+    "id": 7,
+    "User": {"title": "alice"},
+    "Media": [{"Part": [{"decision": "transcode"}]}],
+    "workers": {"w1": {"fps": 42.0}},
+}
+
+
+@pytest.fixture(params=["msgspec", "fallback"])
+def decoder_mode(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run each test with and without msgspec."""
+    if request.param == "msgspec":
+        pytest.importorskip("msgspec")
+    else:
+        monkeypatch.setattr(schema_module, "msgspec", None)
+    return request.param
+
+
+class TestSchema:
+    def test_keeps_only_named_fields(self, decoder_mode: str) -> None:
+        assert Schema(SPEC).decode(json.dumps(PAYLOAD).encode()) == EXPECTED
+
+    def test_missing_and_null_fields(self, decoder_mode: str) -> None:
+        body = b'{"id": null, "Media": []}'
+        assert Schema(SPEC).decode(body) == {"id": None, "Media": []}
+
+    def test_unexpected_shape_is_kept(self, decoder_mode: str) -> None:
+        """A subtree of the wrong type passes through instead of failing."""
+        body = b'{"id": 1, "User": "alice"}'
+        assert Schema(SPEC).decode(body) == {"id": 1, "User": "alice"}
+
+    def test_list_root(self, decoder_mode: str) -> None:
+        body = b'[{"_id": "a", "probe": {}}, {"_id": "b"}]'
+        assert Schema([Fields("_id")]).decode(body) == [{"_id": "a"}, {"_id": "b"}]
+
+    def test_invalid_json_raises_value_error(self, decoder_mode: str) -> None:
+        with pytest.raises(ValueError):
+            Schema(SPEC).decode(b"<html>")
+
+
+def test_project_matches_decode() -> None:
+    assert project(PAYLOAD, SPEC) == EXPECTED
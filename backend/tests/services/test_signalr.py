@@ -0,0 +1,153 @@
+"""Tests for the SignalR listener against a local stand-in hub."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket
+
+from app.collectors.push import ArrPushListener, arr_event_targets
+from app.services.radarr import RadarrClient
+from app.services.signalr import RECORD_SEPARATOR
+from app.services.sonarr import SonarrClient
+
+RS = RECORD_SEPARATOR
+
+
+def _invocation(name: str, body: dict[str, Any]) -> str:
+    return json.dumps({
+        "type": 1,
+        "target": "receiveMessage",
+        "arguments": [{"name": name, "body": body}],
+    }) + RS
+
+
+class StandInHub:
+    """Starlette app speaking just enough SignalR for the client."""
+
+    def __init__(self, messages: list[str]) -> None:
+        self.messages = messages
+        self.negotiate_keys: list[str] = []
+        self.ws_queries: list[dict[str, str]] = []
+        self.pongs = 0
+        self.app = Starlette(routes=[
+            Route("/signalr/messages/negotiate", self.negotiate, methods=["POST"]),
+            WebSocketRoute("/signalr/messages", self.ws),
+        ])
+
+    async def negotiate(self, request: Request) -> JSONResponse:
+        self.negotiate_keys.append(request.headers.get("x-api-key", ""))
+        return JSONResponse({"connectionToken": "tok-1", "negotiateVersion": 1})
+
+    async def ws(self, websocket: WebSocket) -> None:
+        await websocket.accept()
+        self.ws_queries.append(dict(websocket.query_params))
+        handshake = await websocket.receive_text()
+        assert json.loads(handshake.rstrip(RS)) == {"protocol": "json", "version": 1}
+        # Handshake reply and a ping bundled into one websocket message.
+        await websocket.send_text("{}" + RS + json.dumps({"type": 6}) + RS)
+        if json.loads((await websocket.receive_text()).rstrip(RS))["type"] == 6:
+            self.pongs += 1
+        for msg in self.messages:
+            await websocket.send_text(msg)
+        await websocket.send_text(json.dumps({"type": 7}) + RS)
+        await websocket.close()
+
+
+@pytest.fixture
+async def serve_hub():
+    servers: list[tuple[uvicorn.Server, asyncio.Task]] = []
+
+    async def start(hub: StandInHub) -> str:
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        server = uvicorn.Server(uvicorn.Config(hub.app, log_level="warning"))
+        task = asyncio.create_task(server.serve(sockets=[sock]))
+        while not server.started:
+            await asyncio.sleep(0.01)
+        servers.append((server, task))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    yield start
+    for server, task in servers:
+        server.should_exit = True
+        await task
+
+
+class TestSignalRClient:
+    @pytest.mark.parametrize("client_cls", [SonarrClient, RadarrClient])
+    async def test_listen_events(self, serve_hub, client_cls) -> None:
+        """Negotiate, handshake, answer pings and yield receiveMessage payloads."""
+        hub = StandInHub([
+            _invocation("queue", {"action": "sync"}),
+            json.dumps({"type": 1, "target": "other", "arguments": []}) + RS,
+            _invocation("episode", {"action": "updated", "resource": {"id": 5}}),
+        ])
+        base = await serve_hub(hub)
+        client = client_cls(base, "key-1")
+        connected = []
+
+        events = [
+            e async for e in client.listen_events(on_connect=lambda: connected.append(1))
+        ]
+        await client.close()
+
+        assert [e["name"] for e in events] == ["queue", "episode"]
+        assert events[1]["body"]["resource"]["id"] == 5
+        assert connected == [1]
+        assert hub.negotiate_keys == ["key-1"]
+        assert hub.ws_queries == [{"id": "tok-1", "access_token": "key-1"}]
+        assert hub.pongs == 1
+
+
+class TestArrPushListener:
+    def test_event_targets(self) -> None:
+        assert arr_event_targets({"name": "queue"}) == ("downloads",)
+        assert arr_event_targets({"name": "movie"}) == ("calendar",)
+        assert arr_event_targets({"name": "health"}) == ()
+        completed = {"name": "command", "body": {"resource": {
+            "name": "DownloadedEpisodesScan", "status": "completed",
+        }}}
+        assert arr_event_targets(completed) == ("downloads",)
+        started = {"name": "command", "body": {"resource": {
+            "name": "DownloadedEpisodesScan", "status": "started",
+        }}}
+        assert arr_event_targets(started) == ()
+
+    async def test_events_refresh_collectors_and_track_connection(
+        self, serve_hub
+    ) -> None:
+        hub = StandInHub([
+            _invocation("queue", {"action": "updated"}),
+            _invocation("series", {"action": "updated"}),
+        ])
+        base = await serve_hub(hub)
+        client = SonarrClient(base, "key-1")
+        downloads, calendar = MagicMock(), MagicMock()
+        listener = ArrPushListener(
+            {"sonarr": client}, {"downloads": downloads, "calendar": calendar}
+        )
+        listener.start()
+        for _ in range(200):
+            if calendar.set_push_connected.call_count >= 2:
+                break
+            await asyncio.sleep(0.01)
+        await listener.stop()
+        await client.close()
+
+        # Connected, then the hub closed the connection.
+        assert calendar.set_push_connected.call_args_list[0].args == ("sonarr", True)
+        assert calendar.set_push_connected.call_args_list[1].args == ("sonarr", False)
+        # One catch-up refresh on connect plus one per relevant event.
+        assert downloads.request_refresh.call_count == 2
+        assert calendar.request_refresh.call_count == 2
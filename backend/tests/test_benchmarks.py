@@ -0,0 +1,54 @@
+"""Smoke tests for the benchmark suite's simulated upstreams."""
+
+from __future__ import annotations
+
+from app.ws.hub import ConnectionHub
+from benchmarks.decode import bench_decode, fixtures
+from benchmarks.run import bench_collector
+from benchmarks.upstreams import FakeUpstreams, PayloadSizes, UpstreamProfile
+
+
+def _fakes(**profile: float) -> FakeUpstreams:
+    sizes = PayloadSizes(queue_items=20, staged_files=30, sessions=3)
+    return FakeUpstreams(sizes, {"sabnzbd": UpstreamProfile(latency=0, jitter=0, **profile)})
+
+
+class TestFakeUpstreams:
+    async def test_clients_talk_to_fakes(self) -> None:
+        """Every client reaches its in-process stand-in."""
+        fakes = _fakes()
+        clients = fakes.clients()
+        for name, client in clients.items():
+            assert await client.get_system_status(), name
+        queue = await clients["sabnzbd"].get_queue()
+        assert len(queue["queue"]["slots"]) == 20
+        staged = await clients["tdarr"].get_staged_files()
+        assert len(staged) == 30
+        for client in clients.values():
+            await client.close()
+
+    async def test_error_rate(self) -> None:
+        """An error rate of 1.0 turns every response into a 500."""
+        fakes = _fakes(error_rate=1.0)
+        client = fakes.clients()["sabnzbd"]
+        assert await client.test_connection() is False
+        await client.close()
+
+    async def test_bench_collector_reports(self) -> None:
+        hub = ConnectionHub()
+        result = await bench_collector("downloads", _fakes(), cycles=3, warmup=1, hub=hub)
+        assert result["cycles"] == 3
+        assert result["latency_s"]["count"] == 3
+        assert result["cpu_per_cycle_s"] >= 0
+        assert result["snapshot_bytes"] > 0
+        # Cycles must carry real upstream data, not empty failed polls.
+        assert len(hub.get_snapshot("downloads")["data"]["sabnzbd"]["items"]) == 20
+
+
+def test_bench_decode_reports() -> None:
+    sizes = PayloadSizes(queue_items=20, staged_files=30, sessions=3, calendar_entries=5)
+    body, spec = fixtures(sizes)["plex.sessions"]
+    result = bench_decode(body, spec, iterations=2)
+    for mode in ("full", "projected", "spec"):
+        assert result[mode]["peak_alloc_bytes"] > 0
+    assert result["peak_ratio"] < 1
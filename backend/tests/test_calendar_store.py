@@ -0,0 +1,61 @@
+"""Tests for the sorted CalendarStore."""
+
+from __future__ import annotations
+
+from app.calendar_store import CalendarStore
+
+
+def _entries(*pairs: tuple[float, int]) -> list[tuple[float, dict]]:
+    return [(ts, {"id": id_}) for ts, id_ in pairs]
+
+
+class TestCalendarStore:
+    def test_range_is_sorted_and_half_open(self) -> None:
+        store = CalendarStore()
+        store.replace("episodes", 0, 100, _entries((50, 2), (10, 1), (99, 3)))
+
+        assert [e["id"] for e in store.range("episodes", 10, 99)] == [1, 2]
+        assert [e["id"] for e in store.range("episodes", 0, 100)] == [1, 2, 3]
+        assert store.range("movies", 0, 100) == []
+
+    def test_replace_only_touches_its_span(self) -> None:
+        store = CalendarStore()
+        store.replace("movies", 0, 100, _entries((10, 1)))
+        store.replace("movies", 100, 200, _entries((150, 2)))
+        store.replace("movies", 0, 100, _entries((20, 3)))
+
+        assert [e["id"] for e in store.range("movies", 0, 200)] == [3, 2]
+
+    def test_out_of_span_timestamps_are_clamped(self) -> None:
+        store = CalendarStore()
+        store.replace("movies", 100, 200, _entries((5, 1), (500, 2)))
+
+        assert [e["id"] for e in store.range("movies", 100, 200)] == [1, 2]
+        store.replace("movies", 200, 300, [])
+        assert len(store) == 2
+
+    def test_duplicate_ids_returned_once(self) -> None:
+        store = CalendarStore()
+        store.replace("movies", 0, 100, _entries((10, 1)))
+        store.replace("movies", 100, 200, _entries((150, 1)))
+
+        assert len(store.range("movies", 0, 200)) == 1
+
+    def test_prune(self) -> None:
+        store = CalendarStore()
+        store.replace("episodes", 0, 200, _entries((10, 1), (150, 2)))
+        store.prune(100)
+
+        assert [e["id"] for e in store.query(0, 200)["episodes"]] == [2]
+
+    def test_sources_are_replaced_independently(self) -> None:
+        store = CalendarStore()
+        store.replace("episodes", 0, 100, _entries((10, 1), (30, 3)), source="a")
+        store.replace("episodes", 0, 100, _entries((20, 1)), source="b")
+        store.replace("episodes", 0, 100, _entries((40, 4)), source="a")
+
+        # Merged in time order; the same id from two sources is kept twice.
+        assert [e["id"] for e in store.range("episodes", 0, 100)] == [1, 4]
+        store.replace("episodes", 0, 100, _entries((50, 1)), source="a")
+        assert [e["id"] for e in store.range("episodes", 0, 100)] == [1, 1]
+        assert len(store) == 2
@@ -1,5 +1,7 @@
 """Tests for configuration loading."""
 
+import json
+
 import pytest
 from app.config import Settings
 
@@ -31,3 +33,38 @@ class TestSettings:
         monkeypatch.setenv("TDARR_URL", "http://localhost:8265")
         settings = Settings(_env_file=None)
         assert "tdarr" in settings.configured_services()
+
+    def test_collector_interval_overrides(self, monkeypatch):
+        """Interval overrides are read as JSON from the environment."""
+        monkeypatch.setenv("MCC_COLLECTOR_INTERVALS", '{"calendar": 1800}')
+        settings = Settings(_env_file=None)
+        assert settings.mcc_collector_intervals == {"calendar": 1800.0}
+
+    def test_named_instances(self, monkeypatch):
+        """Extra instances are keyed "service:name" after the default one."""
+        monkeypatch.setenv("SONARR_URL", "http://localhost:8989")
+        monkeypatch.setenv("SONARR_API_KEY", "key")
+        monkeypatch.setenv("MCC_INSTANCES", json.dumps({
+            "sonarr": [{"name": "4k", "url": "http://4k:8989", "api_key": "k4"}],
+            "plex": [
+                {"name": "office", "url": "http://office:32400", "token": "t"},
+                {"name": "nokey", "url": "http://nokey:32400"},
+            ],
+        }))
+        settings = Settings(_env_file=None)
+        assert settings.configured_instances() == [
+            ("sonarr", "sonarr", "http://localhost:8989", "key"),
+            ("sonarr:4k", "sonarr", "http://4k:8989", "k4"),
+            ("plex:office", "plex", "http://office:32400", "t"),
+        ]
+
+    def test_rate_limit_instance_overrides_service(self, monkeypatch):
+        monkeypatch.setenv("MCC_RATE_LIMITS", json.dumps({
+            "plex": {"rate": 5, "burst": 10},
+            "plex:office": {"rate": 1},
+        }))
+        settings = Settings(_env_file=None)
+        assert settings.rate_limit("plex").rate == 5
+        assert settings.rate_limit("plex:home").burst == 10
+        assert settings.rate_limit("plex:office").rate == 1
+        assert settings.rate_limit("sonarr") is None
@@ -0,0 +1,54 @@
+"""Tests for the event-loop lag monitor and stack sampler."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from app.diagnostics import LoopLagMonitor, sample_stacks
+from app.perf import perf_stats
+
+
+class TestLoopLagMonitor:
+    async def test_records_lag_and_names_blocking_task(self, caplog) -> None:
+        """A blocking call shows up as lag and is attributed to its task."""
+        monitor = LoopLagMonitor(interval=0.02, slow_threshold=0.05)
+        monitor.start()
+        before = perf_stats.get("loop_lag_seconds", "main")
+        count_before = before.count if before is not None else 0
+
+        async def hog() -> None:
+            time.sleep(0.2)
+
+        with caplog.at_level(logging.WARNING, logger="app.diagnostics"):
+            await asyncio.sleep(0.05)
+            await asyncio.create_task(hog(), name="hog-task")
+            await asyncio.sleep(0.1)
+        await monitor.stop()
+
+        window = perf_stats.get("loop_lag_seconds", "main")
+        assert window is not None
+        assert window.count > count_before
+        assert window.summary()["max"] >= 0.1
+        assert any("hog-task" in r.getMessage() for r in caplog.records)
+
+
+class TestSampleStacks:
+    async def test_collapsed_output(self) -> None:
+        """Samples are emitted as ``frame;frame count`` lines."""
+
+        async def busy() -> None:
+            deadline = time.monotonic() + 0.1
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(busy())
+        collapsed = await sample_stacks(0.1, interval=0.002)
+        await task
+
+        lines = collapsed.strip().splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) >= 1
+        assert ";" in stack
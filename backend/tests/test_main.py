@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import time
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 
@@ -34,3 +36,277 @@ async def test_metrics_endpoint():
         r = await client.get("/metrics")
     assert r.status_code == 200
     assert b"mcc_" in r.content
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_histograms():
+    """Hot-path histograms are published once they have observations."""
+    application = create_app(settings=_test_settings(), skip_collectors=True)
+    await application.state.hub.broadcast("health", {"services": []})
+    transport = ASGITransport(app=application)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.get("/metrics")
+    assert b"mcc_hub_encode_seconds_bucket" in r.content
+    assert b"mcc_hub_recipients_count" in r.content
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_covers_every_sabnzbd_instance():
+    """Each SABnzbd instance gets its own series; active downloads sum them all."""
+    application = create_app(settings=_test_settings(), skip_collectors=True)
+    await application.state.hub.broadcast("downloads", {
+        "sabnzbd_instances": {
+            "sabnzbd": {"total_items": 3, "speed_bps": 100, "sizeleft_bytes": 10},
+            "sabnzbd:nas": {"total_items": 4, "speed_bps": 200, "sizeleft_bytes": 20},
+        },
+        "sonarr_queue": [{}],
+        "radarr_queue": [],
+    })
+    transport = ASGITransport(app=application)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.get("/metrics")
+    assert b"mcc_downloads_active 8.0" in r.content
+    assert b'mcc_sabnzbd_remaining_bytes{instance="sabnzbd:nas"} 20.0' in r.content
+    assert (
+        b'mcc_sabnzbd_speed_bytes{instance="sabnzbd",smoothing="raw"} 100.0' in r.content
+    )
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_tdarr_node_throughput():
+    """Per-node throughput from the transcoding snapshot becomes labelled gauges."""
+    application = create_app(settings=_test_settings(), skip_collectors=True)
+    await application.state.hub.broadcast("transcoding", {"nodes": [{
+        "id": "n1", "name": "Node-1", "instance": "tdarr", "workers": [],
+        "throughput": {"files_per_hour": 4.0, "bytes_per_hour": 8e9, "fps": 120.0},
+    }]})
+    transport = ASGITransport(app=application)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.get("/metrics")
+    assert b'mcc_tdarr_node_files_per_hour{instance="tdarr",node="Node-1"} 4.0' in r.content
+    assert b'mcc_tdarr_node_fps{instance="tdarr",node="Node-1"} 120.0' in r.content
+
+
+@pytest.mark.asyncio
+async def test_debug_perf_endpoint():
+    """GET /api/debug/perf returns percentile summaries per metric."""
+    application = create_app(settings=_test_settings(), skip_collectors=True)
+    await application.state.hub.broadcast("downloads", {"sabnzbd": {}})
+    transport = ASGITransport(app=application)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.get("/api/debug/perf")
+    assert r.status_code == 200
+    summary = r.json()["hub_encode_seconds"]["downloads"]
+    assert summary["count"] >= 1
+    assert {"p50", "p95", "p99"} <= summary.keys()
+
+
+@pytest.mark.asyncio
+async def test_debug_profile_requires_token():
+    """Profiling is disabled without a token and rejects a wrong one."""
+    application = create_app(settings=_test_settings(), skip_collectors=True)
+    transport = ASGITransport(app=application)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.get("/api/debug/profile?seconds=0.01")
+    assert r.status_code == 404
+
+    settings = Settings(_env_file=None, mcc_debug_token="s3cret")  # type: ignore[call-arg]
+    application = create_app(settings=settings, skip_collectors=True)
+    transport = ASGITransport(app=application)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.get("/api/debug/profile?seconds=0.01&token=nope")
+        assert r.status_code == 403
+        r = await client.get(
+            "/api/debug/profile?seconds=0.05",
+            headers={"X-Debug-Token": "s3cret"},
+        )
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+
+
+def _filled_calendar(application) -> None:
+    from datetime import datetime, timezone
+
+    def ts(value: str) -> float:
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+    store = application.state.calendar_store
+    store.replace("episodes", ts("2030-01-01"), ts("2030-04-01"), [
+        (ts("2030-01-05T02:00:00"), {"id": 1, "title": "Early"}),
+        (ts("2030-03-01T02:00:00"), {"id": 2, "title": "Late"}),
+    ])
+    store.replace("movies", ts("2030-01-01"), ts("2030-04-01"), [
+        (ts("2030-01-06"), {"id": 9, "title": "Film"}),
+    ])
+
+
+@pytest.mark.asyncio
+async def test_calendar_range_query():
+    """GET /api/calendar?from=&to=&type= answers from the calendar store."""
+    application = create_app(settings=_test_settings(), skip_collectors=True)
+    _filled_calendar(application)
+    transport = ASGITransport(app=application)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        month = await client.get("/api/calendar?from=2030-01-01&to=2030-01-31")
+        quarter = await client.get(
+            "/api/calendar?from=2030-01-01&to=2030-03-31&type=episodes"
+        )
+        bad = await client.get("/api/calendar?from=2030-02-01&to=2030-01-01")
+
+    assert [e["id"] for e in month.json()["episodes"]] == [1]
+    assert [m["id"] for m in month.json()["movies"]] == [9]
+    assert [e["id"] for e in quarter.json()["episodes"]] == [1, 2]
+    assert "movies" not in quarter.json()
+    assert bad.status_code == 422
+
+
+def test_calendar_ws_view():
+    """A WS client can narrow its calendar pushes to one range."""
+    from fastapi.testclient import TestClient
+
+    application = create_app(settings=_test_settings(), skip_collectors=True)
+    _filled_calendar(application)
+    with TestClient(application) as client:
+        with client.websocket_connect("/ws") as ws:
+            ws.send_json({
+                "action": "view", "type": "calendar",
+                "from": "2030-03-01", "to": "2030-03-31", "kind": "episodes",
+            })
+            message = ws.receive_json()
+            assert message["type"] == "calendar"
+            assert [e["id"] for e in message["data"]["episodes"]] == [2]
+
+            ws.send_json({"action": "view", "type": "calendar", "kind": "films"})
+            assert ws.receive_json()["type"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_snapshot_long_poll():
+    """?since=&wait= parks until a newer snapshot, else answers 304."""
+    import asyncio
+
+    application = create_app(settings=_test_settings(), skip_collectors=True)
+    hub = application.state.hub
+    await hub.broadcast("downloads", {"sabnzbd": {"items": []}})
+    version = hub.get_snapshot("downloads")["version"]
+
+    transport = ASGITransport(app=application)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        stale = await client.get(f"/api/downloads?since={version - 1}")
+        unchanged = await client.get(f"/api/downloads?since={version}&wait=0.01")
+
+        async def publish() -> None:
+            await asyncio.sleep(0.05)
+            await hub.broadcast("downloads", {"sabnzbd": {"items": [1]}})
+
+        task = asyncio.create_task(publish())
+        parked = await client.get(f"/api/downloads?since={version}&wait=5")
+        await task
+
+    assert stale.json()["version"] == version
+    assert unchanged.status_code == 304
+    assert parked.status_code == 200
+    assert parked.json()["version"] > version
+    assert parked.json()["data"]["sabnzbd"]["items"] == [1]
+
+
+@pytest.mark.asyncio
+async def test_stream_events_and_topics():
+    """The SSE generator yields hub frames for the requested topics only."""
+    from app.routers.stream import _events
+
+    application = create_app(settings=_test_settings(), skip_collectors=True)
+    hub = application.state.hub
+    await hub.broadcast("health", {"services": []})
+
+    events = _events(hub, frozenset({"health", "streaming"}), None)
+    assert await events.__anext__() == b"retry: 3000\n\n"
+    assert (await events.__anext__()).startswith(b"id: 1\nevent: health\n")
+
+    await hub.broadcast("downloads", {})
+    await hub.broadcast("streaming", {"sessions": []})
+    assert (await events.__anext__()).startswith(b"id: 3\nevent: streaming\n")
+    await events.aclose()
+    assert not hub._subscribers
+
+    transport = ASGITransport(app=application)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.get("/api/stream?topics=health,bogus")
+    assert r.status_code == 422
+
+
+def test_build_clients_keys_instances():
+    """Named instances get their own client, keyed and labelled by instance."""
+    from app.config import ServiceInstance
+    from app.main import _build_clients
+
+    settings = _test_settings()
+    settings.radarr_url, settings.radarr_api_key = "http://hd:7878", "k"
+    settings.mcc_instances = {
+        "radarr": [ServiceInstance(name="4k", url="http://uhd:7878", api_key="k4")],
+    }
+    clients = _build_clients(settings)
+
+    assert list(clients) == ["radarr", "radarr:4k"]
+    assert clients["radarr:4k"].service_name == "radarr:4k"
+    assert clients["radarr:4k"]._base_url == "http://uhd:7878"
+
+
+@pytest.mark.asyncio
+async def test_downloads_list_query():
+    """Filter/sort/paging parameters answer from the hub's index."""
+    application = create_app(settings=_test_settings(), skip_collectors=True)
+    await application.state.hub.broadcast("downloads", {
+        "sabnzbd_instances": {"sabnzbd": {"items": [
+            {"id": f"nzo_{i}", "name": f"Show.{i}", "status": "Queued" if i else "Downloading"}
+            for i in range(5)
+        ]}},
+        "sonarr_queue": [],
+        "radarr_queue": [],
+    })
+
+    transport = ASGITransport(app=application)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        snapshot = await client.get("/api/downloads")
+        page = await client.get("/api/downloads?status=queued&sort=-name&limit=2")
+        bad = await client.get("/api/downloads?sort=password")
+
+    assert "sabnzbd_instances" in snapshot.json()["data"]
+    body = page.json()
+    assert body["total"] == 4
+    assert [i["id"] for i in body["items"]] == ["nzo_4", "nzo_3"]
+    assert bad.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_streaming_history_endpoints(tmp_path):
+    """History endpoints answer from the session log, or 404 when it's off."""
+    disabled = create_app(settings=_test_settings(), skip_collectors=True)
+    settings = Settings(_env_file=None, mcc_history_path=str(tmp_path / "h.sqlite3"))  # type: ignore[call-arg]
+    application = create_app(settings=settings, skip_collectors=True)
+    history = application.state.session_history
+    history.observe(
+        [{"sessionKey": "1", "user": "alice", "title": "Dune"}], now=time.time() - 3600
+    )
+
+    async with AsyncClient(
+        transport=ASGITransport(app=disabled), base_url="http://test"
+    ) as client:
+        off = await client.get("/api/streaming/history/users")
+    async with AsyncClient(
+        transport=ASGITransport(app=application), base_url="http://test"
+    ) as client:
+        peaks = await client.get("/api/streaming/history/concurrency?bucket=day")
+        users = await client.get("/api/streaming/history/users")
+        empty = await client.get(
+            "/api/streaming/history/users?from=2020-01-01&to=2020-01-31"
+        )
+        bad = await client.get("/api/streaming/history/concurrency?bucket=week")
+    await history.close()
+
+    assert off.status_code == 404
+    assert peaks.json()["peak"] == 1
+    assert len(peaks.json()["buckets"]) == 7
+    assert users.json()["users"][0]["user"] == "alice"
+    assert empty.json()["users"] == []
+    assert bad.status_code == 422
@@ -0,0 +1,64 @@
+"""Tests for rolling latency windows."""
+
+from __future__ import annotations
+
+from app.perf import LatencyWindow, PerfStats
+
+
+class TestLatencyWindow:
+    def test_percentiles(self) -> None:
+        """Nearest-rank percentiles over 1..100."""
+        win = LatencyWindow()
+        for v in range(1, 101):
+            win.add(float(v))
+
+        summary = win.summary()
+        assert summary["count"] == 100
+        assert summary["p50"] == 50.0
+        assert summary["p95"] == 95.0
+        assert summary["p99"] == 99.0
+        assert summary["max"] == 100.0
+        assert win.percentile(95) == 95.0
+
+    def test_window_is_bounded(self) -> None:
+        """Old samples fall out once the window is full; count keeps growing."""
+        win = LatencyWindow(size=10)
+        for v in range(100):
+            win.add(float(v))
+
+        assert len(win) == 10
+        assert win.count == 100
+        assert win.percentile(0) == 90.0
+
+    def test_percentile_matches_sorted_rank_and_is_cached(self) -> None:
+        win = LatencyWindow(size=50)
+        values = [float((v * 37) % 101) for v in range(200)]
+        for v in values:
+            win.add(v)
+        ordered = sorted(values[-50:])
+        for q in (0, 10, 50, 90, 95, 100):
+            assert win.percentile(q) == ordered[max(1, -(-q * 50 // 100)) - 1]
+        assert win._percentiles
+
+        win.add(1000.0)
+        assert not win._percentiles
+        assert win.percentile(100) == 1000.0
+
+    def test_empty(self) -> None:
+        win = LatencyWindow()
+        assert win.percentile(50) is None
+        assert win.summary()["p99"] is None
+
+
+class TestPerfStats:
+    def test_summary_groups_by_metric_and_key(self) -> None:
+        stats = PerfStats()
+        stats.observe("upstream_seconds", "sonarr:queue", 0.1)
+        stats.observe("upstream_seconds", "sonarr:queue", 0.3)
+        stats.observe("collect_seconds", "downloads", 0.5)
+
+        summary = stats.summary()
+        assert summary["upstream_seconds"]["sonarr:queue"]["count"] == 2
+        assert summary["upstream_seconds"]["sonarr:queue"]["max"] == 0.3
+        assert summary["collect_seconds"]["downloads"]["p50"] == 0.5
+        assert stats.get("collect_seconds", "missing") is None
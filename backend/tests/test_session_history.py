@@ -0,0 +1,112 @@
+"""Tests for the Plex session history log."""
+
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from app.session_history import STOP_GRACE, SessionHistory
+
+T0 = 1_700_000_000  # 2023-11-14T22:13:20Z
+
+
+def _session(key: str, user: str = "alice", title: str = "Andor", **extra):
+    return {"sessionKey": key, "user": user, "grandparentTitle": title,
+            "title": "Episode", "decision": "directplay", "instance": "plex", **extra}
+
+
+@pytest.fixture
+async def history(tmp_path):
+    history = SessionHistory(tmp_path / "history.sqlite3")
+    yield history
+    await history.close()
+
+
+class TestRecording:
+    async def test_starts_and_stops_from_snapshots(self, history) -> None:
+        history.observe([_session("1"), _session("2", user="bob")], now=T0)
+        history.observe([_session("2", user="bob")], now=T0 + 60)
+        # Still within the grace period: a missed poll doesn't end the play.
+        assert (await history.concurrency(T0, T0 + 120))["peak"] == 2
+        history.observe([_session("2", user="bob")], now=T0 + 60 + STOP_GRACE + 1)
+
+        users = {u["user"]: u for u in await history.users(T0, T0 + 3600)}
+        # The play ends when alice's session was first missed.
+        assert users["alice"]["watch_seconds"] == 60
+        assert users["alice"]["plays"] == 1
+
+    async def test_session_returning_within_grace_keeps_its_play(self, history) -> None:
+        history.observe([_session("1")], now=T0)
+        history.observe([], now=T0 + 10)
+        history.observe([_session("1")], now=T0 + 20)
+        assert (await history.concurrency(T0, T0 + 60))["plays"] == 1
+
+    async def test_reused_key_and_transcode_flag(self, history) -> None:
+        history.observe([_session("1")], now=T0)
+        history.observe([_session("1", decision="transcode")], now=T0 + 10)
+        history.observe([_session("1", title="Dune")], now=T0 + 20)
+
+        (alice,) = await history.users(T0, T0 + 60)
+        assert alice["plays"] == 2
+        assert alice["transcodes"] == 1
+        assert alice["transcode_ratio"] == 0.5
+
+
+    async def test_failed_flush_is_retried(self, history, monkeypatch) -> None:
+        history.observe([_session("1")], now=T0)
+        write = history._write
+
+        def fail(*args):
+            raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(history, "_write", fail)
+        with pytest.raises(sqlite3.OperationalError):
+            await history.flush()
+        history.observe([_session("1"), _session("2", user="bob")], now=T0 + 60)
+
+        monkeypatch.setattr(history, "_write", write)
+        users = {u["user"] for u in await history.users(T0, T0 + 3600)}
+        assert users == {"alice", "bob"}
+
+
+class TestQueries:
+    async def test_concurrency_peak_and_buckets(self, history) -> None:
+        history.observe([_session("1")], now=T0)
+        history.observe([_session("1"), _session("2")], now=T0 + 1800)
+        history.observe([_session("1"), _session("2"), _session("3")], now=T0 + 3700)
+        history.observe([_session("3")], now=T0 + 3800)
+        history.observe([_session("3")], now=T0 + 3800 + STOP_GRACE + 1)
+
+        result = await history.concurrency(T0, T0 + 3 * 3600, "hour")
+        assert result["peak"] == 3
+        assert result["peak_at"] == T0 + 3700
+        assert [b["peak"] for b in result["buckets"]] == [2, 3, 1]
+        with pytest.raises(ValueError):
+            await history.concurrency(T0, T0 + 60, "week")
+
+    async def test_range_clips_watch_time(self, history) -> None:
+        history.observe([_session("1")], now=T0)
+        history.observe([], now=T0 + 600)
+        history.observe([], now=T0 + 600 + STOP_GRACE + 1)
+
+        (alice,) = await history.users(T0 + 300, T0 + 3600)
+        assert alice["watch_seconds"] == 300
+        assert await history.users(T0 + 900, T0 + 3600) == []
+
+
+async def test_history_survives_restart(tmp_path) -> None:
+    path = tmp_path / "history.sqlite3"
+    history = SessionHistory(path)
+    history.observe([_session("1")], now=T0)
+    await history.close()
+
+    reopened = SessionHistory(path)
+    try:
+        (alice,) = await reopened.users(T0, T0 + 10**10)
+        # The open play was closed at the previous run's last flush.
+        assert alice["plays"] == 1
+        reopened.observe([_session("9", user="alice")], now=T0 + 100)
+        assert (await reopened.users(T0, T0 + 10**10))[0]["plays"] == 2
+    finally:
+        await reopened.close()
@@ -0,0 +1,99 @@
+"""Tests for the inbound webhook endpoints."""
+
+from __future__ import annotations
+
+import json
+from datetime import date
+from unittest.mock import MagicMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config import Settings
+from app.main import create_app
+
+
+def _app(**settings):
+    application = create_app(
+        settings=Settings(_env_file=None, **settings),  # type: ignore[call-arg]
+        skip_collectors=True,
+    )
+    collectors = {
+        name: MagicMock()
+        for name in ("health", "downloads", "streaming", "transcoding", "calendar")
+    }
+    application.state.collectors = collectors
+    return application, collectors
+
+
+async def _post(application, url: str, **kwargs):
+    transport = ASGITransport(app=application)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(url, **kwargs)
+
+
+class TestWebhooks:
+    async def test_sonarr_download_refreshes_downloads_and_calendar(self) -> None:
+        application, collectors = _app()
+        r = await _post(application, "/api/webhooks/sonarr", json={
+            "eventType": "Download", "series": {"title": "Show"},
+        })
+        assert r.status_code == 202
+        assert r.json()["refreshed"] == ["downloads", "calendar"]
+        collectors["downloads"].request_refresh.assert_called_once()
+        collectors["calendar"].request_refresh.assert_called_once()
+        collectors["streaming"].request_refresh.assert_not_called()
+
+    async def test_arr_event_refreshes_only_its_calendar_days(self) -> None:
+        application, collectors = _app()
+        await _post(application, "/api/webhooks/radarr?instance=4k", json={
+            "eventType": "MovieAdded",
+            "movie": {"id": 3, "title": "Dune", "digitalRelease": "2026-05-01"},
+        })
+        collectors["calendar"].request_refresh.assert_called_once_with(
+            days=[date(2026, 5, 1)], instance="radarr:4k"
+        )
+
+    async def test_plex_multipart_payload(self) -> None:
+        application, collectors = _app()
+        r = await _post(
+            application,
+            "/api/webhooks/plex",
+            data={"payload": json.dumps({"event": "media.play"})},
+            files={"thumb": ("thumb.jpg", b"\xff\xd8", "image/jpeg")},
+        )
+        assert r.status_code == 202
+        assert r.json() == {"service": "plex", "event": "media.play", "refreshed": ["streaming"]}
+        collectors["streaming"].request_refresh.assert_called_once()
+
+    @pytest.mark.parametrize("service,body,expected", [
+        ("radarr", {"eventType": "Grab"}, ["downloads"]),
+        ("radarr", {"eventType": "Test"}, []),
+        ("overseerr", {"notification_type": "MEDIA_AVAILABLE"}, ["calendar"]),
+        ("tdarr", {"file": "/media/a.mkv"}, ["transcoding"]),
+    ])
+    async def test_event_mapping(self, service, body, expected) -> None:
+        application, _ = _app()
+        r = await _post(application, f"/api/webhooks/{service}", json=body)
+        assert r.status_code == 202
+        assert r.json()["refreshed"] == expected
+
+    async def test_invalid_payloads(self) -> None:
+        application, collectors = _app()
+        r = await _post(application, "/api/webhooks/sonarr", json={"nope": 1})
+        assert r.status_code == 422
+        r = await _post(application, "/api/webhooks/sonarr", content=b"{not json")
+        assert r.status_code == 400
+        r = await _post(application, "/api/webhooks/lidarr", json={"eventType": "Grab"})
+        assert r.status_code == 404
+        collectors["downloads"].request_refresh.assert_not_called()
+
+    async def test_token_required_when_configured(self) -> None:
+        application, collectors = _app(mcc_webhook_token="hook")
+        r = await _post(application, "/api/webhooks/radarr", json={"eventType": "Grab"})
+        assert r.status_code == 403
+        r = await _post(
+            application, "/api/webhooks/radarr?token=hook", json={"eventType": "Grab"}
+        )
+        assert r.status_code == 202
+        collectors["downloads"].request_refresh.assert_called_once()
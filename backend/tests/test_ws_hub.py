@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 from unittest.mock import AsyncMock
 
@@ -11,8 +12,11 @@ from app.ws.hub import ConnectionHub
 
 
 @pytest.fixture
-def hub() -> ConnectionHub:
-    return ConnectionHub()
+async def hub():
+    hub = ConnectionHub()
+    yield hub
+    for ws in list(hub.connections):
+        hub.disconnect(ws)
 
 
 def _make_ws() -> AsyncMock:
@@ -22,6 +26,12 @@ def _make_ws() -> AsyncMock:
     return ws
 
 
+async def _delivered() -> None:
+    """Let the connections' writer tasks drain their mailboxes."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
 class TestConnectionHub:
     async def test_connect_disconnect(self, hub: ConnectionHub) -> None:
         """Verify the connections list grows on connect and shrinks on disconnect."""
@@ -49,6 +59,7 @@ class TestConnectionHub:
         hub.connect(ws2)
 
         await hub.broadcast("health", {"services": []})
+        await _delivered()
 
         # Both websockets should have received the message
         assert ws1.send_text.call_count == 1
@@ -73,6 +84,7 @@ class TestConnectionHub:
         assert len(hub.connections) == 2
 
         await hub.broadcast("health", {"services": []})
+        await _delivered()
 
         # Dead connection should be removed
         assert len(hub.connections) == 1
@@ -81,6 +93,40 @@ class TestConnectionHub:
         # Alive connection should have received the message
         assert alive_ws.send_text.call_count == 1
 
+    async def test_stalled_socket_does_not_delay_others(self, hub: ConnectionHub) -> None:
+        """Broadcast only queues; a stuck client keeps just the latest message."""
+        stalled = _make_ws()
+        unblock = asyncio.Event()
+
+        async def stall(text: str) -> None:
+            await unblock.wait()
+
+        stalled.send_text.side_effect = stall
+        fast = _make_ws()
+        hub.connect(stalled)
+        hub.connect(fast)
+
+        for n in range(3):
+            await asyncio.wait_for(hub.broadcast("health", {"n": n}), timeout=0.1)
+        await _delivered()
+
+        assert json.loads(fast.send_text.call_args[0][0])["data"] == {"n": 2}
+        unblock.set()
+        await _delivered()
+        # First frame was in flight; the two behind it collapsed into the latest.
+        sent = [json.loads(c.args[0])["data"] for c in stalled.send_text.call_args_list]
+        assert sent == [{"n": 0}, {"n": 2}]
+
+    async def test_connect_replays_current_snapshots(self, hub: ConnectionHub) -> None:
+        await hub.broadcast("downloads", {})
+        await hub.broadcast("health", {})
+        ws = _make_ws()
+        hub.connect(ws)
+        await _delivered()
+
+        types = [json.loads(c.args[0])["type"] for c in ws.send_text.call_args_list]
+        assert types == ["health", "downloads"]
+
     async def test_get_snapshot(self, hub: ConnectionHub) -> None:
         """After broadcast, snapshot returns the data."""
         await hub.broadcast("health", {"services": ["sonarr"]})
@@ -95,3 +141,106 @@ class TestConnectionHub:
         """Returns None for unknown type."""
         result = hub.get_snapshot("nonexistent")
         assert result is None
+
+    async def test_views_receive_their_own_slice(self, hub: ConnectionHub) -> None:
+        """Connections with a view get render() output, rendered once per key."""
+        plain = _make_ws()
+        view_a = _make_ws()
+        view_b = _make_ws()
+        for ws in (plain, view_a, view_b):
+            hub.connect(ws)
+        renders = []
+
+        def render() -> dict:
+            renders.append(1)
+            return {"movies": []}
+
+        hub.set_view(view_a, "calendar", ("week",), render)
+        hub.set_view(view_b, "calendar", ("week",), render)
+
+        await hub.broadcast("calendar", {"movies": [1, 2, 3]})
+        await _delivered()
+
+        assert json.loads(plain.send_text.call_args[0][0])["data"] == {"movies": [1, 2, 3]}
+        assert json.loads(view_a.send_text.call_args[0][0])["data"] == {"movies": []}
+        assert view_b.send_text.call_args == view_a.send_text.call_args
+        assert len(renders) == 1
+        # The stored snapshot is always the full payload.
+        assert hub.get_snapshot("calendar")["data"] == {"movies": [1, 2, 3]}
+
+        hub.clear_view(view_a, "calendar")
+        await hub.broadcast("calendar", {"movies": [4]})
+        await _delivered()
+        assert json.loads(view_a.send_text.call_args[0][0])["data"] == {"movies": [4]}
+
+    async def test_versions_increase(self, hub: ConnectionHub) -> None:
+        await hub.broadcast("health", {})
+        await hub.broadcast("downloads", {})
+        await hub.broadcast("health", {})
+
+        assert hub.get_snapshot("downloads")["version"] == 2
+        assert hub.get_snapshot("health")["version"] == 3
+
+    async def test_wait_for_snapshot(self, hub: ConnectionHub) -> None:
+        import asyncio
+
+        await hub.broadcast("health", {"n": 1})
+        version = hub.get_snapshot("health")["version"]
+
+        # Already newer: immediate.
+        assert (await hub.wait_for_snapshot("health", 0, 0))["data"] == {"n": 1}
+        # Nothing newer within the timeout.
+        assert await hub.wait_for_snapshot("health", version, 0.01) is None
+
+        waiter = asyncio.create_task(hub.wait_for_snapshot("health", version, 5))
+        await asyncio.sleep(0.01)
+        await hub.broadcast("downloads", {})
+        assert not waiter.done()
+        await hub.broadcast("health", {"n": 2})
+        snapshot = await asyncio.wait_for(waiter, 1)
+        assert snapshot["data"] == {"n": 2}
+
+
+class TestSubscriptions:
+    async def test_frames_encoded_once_and_shared(self, hub: ConnectionHub) -> None:
+        a = hub.subscribe(frozenset({"health"}))
+        b = hub.subscribe(frozenset({"health", "downloads"}))
+
+        await hub.broadcast("health", {"services": []})
+        await hub.broadcast("downloads", {})
+
+        (frame_a,) = await a.next()
+        frames_b = await b.next()
+        assert frames_b[0] is frame_a
+        assert len(frames_b) == 2
+        assert frame_a.startswith(b"id: 1\nevent: health\ndata: {")
+        assert frame_a.endswith(b"\n\n")
+
+    async def test_mailbox_keeps_latest_per_topic(self, hub: ConnectionHub) -> None:
+        sub = hub.subscribe(frozenset({"health", "downloads"}))
+        await hub.broadcast("health", {"n": 1})
+        await hub.broadcast("downloads", {})
+        await hub.broadcast("health", {"n": 2})
+
+        frames = await sub.next()
+
+        assert [f.split(b"\n")[1] for f in frames] == [
+            b"event: downloads", b"event: health",
+        ]
+        assert b'"n": 2' in frames[1]
+
+    async def test_subscribe_replays_newer_snapshots(self, hub: ConnectionHub) -> None:
+        await hub.broadcast("health", {})
+        await hub.broadcast("downloads", {})
+
+        fresh = hub.subscribe(frozenset({"health", "downloads"}))
+        assert len(await fresh.next()) == 2
+
+        resumed = hub.subscribe(frozenset({"health", "downloads"}), last_event_id=1)
+        frames = await resumed.next()
+        assert [f.split(b"\n")[0] for f in frames] == [b"id: 2"]
+
+        hub.unsubscribe(fresh)
+        hub.unsubscribe(resumed)
+        await hub.broadcast("health", {})
+        assert not fresh._pending
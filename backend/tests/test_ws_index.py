@@ -0,0 +1,84 @@
+"""Tests for snapshot record indexes."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.ws.index import default_indexes
+
+DOWNLOADS = {
+    "sabnzbd_instances": {
+        "sabnzbd": {"items": [
+            {"id": "nzo_1", "name": "Andor.S01E01", "status": "Downloading", "size_bytes": 300},
+            {"id": "nzo_2", "name": "Dune.2021", "status": "Queued", "size_bytes": 100},
+        ]},
+    },
+    "sonarr_queue": [
+        {"id": 7, "title": "Andor.S01E02", "status": "downloading", "size": 200,
+         "instance": "sonarr:4k"},
+    ],
+    "radarr_queue": [],
+}
+
+
+@pytest.fixture
+def index():
+    index = default_indexes()["downloads"]
+    index.update(DOWNLOADS, 1)
+    return index
+
+
+class TestSnapshotIndex:
+    def test_unfiltered_page_keeps_snapshot_order(self, index) -> None:
+        page = index.query(limit=2)
+        assert page["total"] == 3
+        assert [i["id"] for i in page["items"]] == ["nzo_1", "nzo_2"]
+        assert index.query(offset=2)["items"][0]["service"] == "sonarr"
+
+    def test_filters_are_case_insensitive_and_combine(self, index) -> None:
+        downloading = index.query({"status": ["downloading"]})
+        assert [i["id"] for i in downloading["items"]] == ["nzo_1", 7]
+        both = index.query({"status": ["downloading"], "service": ["sonarr"]})
+        assert [i["id"] for i in both["items"]] == [7]
+        # service= also matches an instance key; values are alternatives.
+        either = index.query({"service": ["sonarr:4k", "missing"]})
+        assert either["total"] == 1
+
+    def test_search_and_sort(self, index) -> None:
+        page = index.query(q="andor", sort="-size_bytes")
+        assert [i["id"] for i in page["items"]] == ["nzo_1", 7]
+        assert [i["id"] for i in index.query(sort="name")["items"]] == [
+            "nzo_1", "nzo_2", 7,
+        ]
+        with pytest.raises(ValueError):
+            index.query(sort="password")
+
+    def test_update_touches_only_changed_records(self, index) -> None:
+        changed = {
+            **DOWNLOADS,
+            "sabnzbd_instances": {"sabnzbd": {"items": [
+                {**DOWNLOADS["sabnzbd_instances"]["sabnzbd"]["items"][0],
+                 "status": "Paused"},
+            ]}},
+        }
+        assert index.update(changed, 2) == 2  # nzo_1 changed, nzo_2 removed
+        assert index.query({"status": ["queued"]})["total"] == 0
+        assert index.query({"status": ["paused"]})["version"] == 2
+        assert index.update(changed, 3) == 0
+
+
+def test_worker_and_session_records() -> None:
+    indexes = default_indexes()
+    indexes["transcoding"].update({"nodes": [{
+        "id": "n1", "name": "Node-1", "instance": "tdarr",
+        "workers": [{"id": "w1", "file": "/a.mkv", "fps": 50}, {"id": "w2", "file": "/b.mkv", "fps": 90}],
+    }]}, 1)
+    page = indexes["transcoding"].query({"node": ["node-1"]}, sort="-fps")
+    assert [w["id"] for w in page["items"]] == ["w2", "w1"]
+
+    indexes["streaming"].update({"sessions": [
+        {"sessionKey": "1", "user": "alice", "state": "playing", "instance": "plex"},
+        {"sessionKey": "2", "user": "bob", "state": "paused", "instance": "plex:office"},
+    ]}, 1)
+    assert indexes["streaming"].query({"user": ["Alice"]})["items"][0]["sessionKey"] == "1"
+    assert indexes["streaming"].query({"service": ["plex"]})["total"] == 2
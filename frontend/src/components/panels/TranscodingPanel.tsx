@@ -23,7 +23,8 @@ export function TranscodingPanel() {
       <div className="glass-card p-4 glow-info">
         {nodes.length === 0 && <p className="text-text-muted text-sm text-center py-4">No Tdarr nodes connected</p>}
         {nodes.map((node) => {
-          const workerCount = Object.keys(node.workers).length
+          const workerCount = node.workers.length
+          const filesPerHour = node.throughput?.files_per_hour ?? 0
           return (
             <div key={node.id} className="flex items-center justify-between py-2">
               <div className="flex items-center gap-2">
@@ -32,6 +33,7 @@ export function TranscodingPanel() {
               </div>
               <span className="text-xs font-mono text-text-muted">
                 {workerCount} worker{workerCount !== 1 ? 's' : ''}
+                {filesPerHour > 0 && ` · ${filesPerHour.toFixed(1)} files/h`}
               </span>
             </div>
           )
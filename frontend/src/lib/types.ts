@@ -2,6 +2,8 @@
 
 export interface WsMessage<T = unknown> {
   type: 'health' | 'downloads' | 'streaming' | 'transcoding' | 'calendar'
+  /** Increases with every broadcast; pass as ?since= to long-poll REST. */
+  version: number
   timestamp: string
   data: T
 }
@@ -11,6 +13,19 @@ export interface ServiceHealth {
   status: 'online' | 'offline'
   version: string
   response_ms: number
+  /** How liveness was established: data-path traffic, ping, or full status. */
+  source?: 'passive' | 'probe' | 'status'
+  /** ISO timestamp of the check that produced this entry. */
+  checked_at?: string
+}
+
+/** One page of a filtered list query (``/api/downloads?status=...``). */
+export interface ListPage<T> {
+  version: number
+  total: number
+  offset: number
+  limit: number
+  items: T[]
 }
 
 export interface HealthData {
@@ -18,22 +33,47 @@ export interface HealthData {
 }
 
 export interface SabItem {
+  /** SABnzbd nzo_id. */
+  id?: string | null
   name: string
   percentage: string
   sizeleft: string
   status: string
   timeleft: string
+  sizeleft_bytes: number | null
+  size_bytes: number | null
+  timeleft_s: number | null
+}
+
+export interface SabnzbdData {
+  speed: string
+  sizeleft: string
+  timeleft: string
+  speed_bps: number
+  sizeleft_bytes: number
+  timeleft_s: number | null
+  speed_ewma_bps: number
+  eta_ewma_s: number | null
+  total_items: number
+  items: SabItem[]
+}
+
+export interface ArrQueueItem {
+  id?: number | null
+  title: string
+  status: string
+  sizeleft: number
+  size: number
+  /** Instance key, e.g. "sonarr" or "sonarr:4k". */
+  instance: string
 }
 
 export interface DownloadsData {
-  sabnzbd: {
-    speed: string
-    sizeleft: string
-    timeleft: string
-    items: SabItem[]
-  }
-  sonarr_queue: { title: string; status: string; sizeleft: number; size: number }[]
-  radarr_queue: { title: string; status: string; sizeleft: number; size: number }[]
+  /** First SABnzbd instance. */
+  sabnzbd: SabnzbdData
+  sabnzbd_instances?: Record<string, SabnzbdData>
+  sonarr_queue: ArrQueueItem[]
+  radarr_queue: ArrQueueItem[]
 }
 
 export interface PlexSession {
@@ -43,18 +83,42 @@ export interface PlexSession {
   grandparentTitle: string
   parentIndex: string
   index: string
+  instance?: string
 }
 
 export interface StreamingData {
   stream_count: number
   transcode_count: number
   sessions: PlexSession[]
+  /** Per-instance counts, keyed by instance ("plex", "plex:office"). */
+  instances?: Record<string, { stream_count: number; transcode_count: number }>
+}
+
+export interface TdarrWorker {
+  id: string
+  file: string
+  status: string
+  type: string
+  percentage: number
+  fps: number
+  eta: string
+  eta_s: number | null
+  size_bytes: number | null
+}
+
+/** Rolling rates over the collector's throughput window. */
+export interface TdarrThroughput {
+  files_per_hour: number
+  bytes_per_hour: number
+  fps: number
 }
 
 export interface TdarrNode {
   id: string
   name: string
-  workers: Record<string, unknown>
+  workers: TdarrWorker[]
+  instance?: string
+  throughput?: TdarrThroughput
 }
 
 export interface TranscodingData {
@@ -63,24 +127,41 @@ export interface TranscodingData {
   total_files: number
   total_transcodes: number
   size_diff_bytes: number
+  /** Sum of the nodes' throughput. */
+  throughput?: TdarrThroughput
+  /** Seconds since each field's source was last fetched (null = never). */
+  ages?: Record<string, number | null>
+  /** Per-instance counts, keyed by instance. */
+  instances?: Record<
+    string,
+    { queue_size: number; total_files: number; total_transcodes: number; size_diff_bytes: number }
+  >
 }
 
 export interface CalendarEpisode {
+  id: number | null
+  seriesId: number | null
   series: string
   title: string
   airDate: string
   season: number
   episode: number
   hasFile: boolean
+  instance?: string
 }
 
 export interface CalendarMovie {
+  id: number | null
   title: string
   releaseDate: string
   hasFile: boolean
+  instance?: string
 }
 
 export interface CalendarData {
   episodes: CalendarEpisode[]
   movies: CalendarMovie[]
+  /** Range covered, present on range queries and per-view pushes. */
+  from?: string
+  to?: string
 }